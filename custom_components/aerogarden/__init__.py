@@ -1,28 +1,62 @@
 import logging
 from datetime import timedelta
+from typing import Any
 
 import async_timeout
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
 from .aerogarden import Aerogarden
+from .client import (
+    MAX_REQUEST_DURATION,
+    AerogardenApiAuthError,
+    AerogardenApiCircuitOpenError,
+    AerogardenApiConnectError,
+)
 from .const import (
+    CONF_IDLE_POLLING_INTERVAL,
+    CONF_MAX_POLLING_INTERVAL,
     CONF_POLLING_INTERVAL,
+    DEFAULT_IDLE_POLLING_INTERVAL,
+    DEFAULT_MAX_POLLING_INTERVAL,
     DEFAULT_POLLING_INTERVAL,
     DOMAIN,
     HOST,
     PLATFORMS,
 )
+from .hub import (
+    STAGGER_WINDOW,
+    RefreshSlot,
+    async_get_hub,
+    async_pop_validated_login,
+    async_release_hub,
+)
+from .models import GardenState
+from .schedule import (
+    TRANSITION_MARGIN,
+    PollingTier,
+    get_adaptive_polling_interval,
+    get_polling_tier,
+)
+from .services import async_setup_services, async_unload_services
+from .storage import AerogardenStore
+from .writer import AerogardenWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
 
+# A refresh can log in, query, then log in again and query once more if the session was rejected. It outlasts
+# all of them retrying, so the client gives up with its own error before the refresh is cut short.
+UPDATE_TIMEOUT = 4 * MAX_REQUEST_DURATION
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the aerogarden platform from a config entry."""
@@ -34,32 +68,114 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if CONF_POLLING_INTERVAL in entry.data
         else DEFAULT_POLLING_INTERVAL
     )
+    max_polling_interval = (
+        int(entry.data[CONF_MAX_POLLING_INTERVAL])
+        if CONF_MAX_POLLING_INTERVAL in entry.data
+        else DEFAULT_MAX_POLLING_INTERVAL
+    )
+    idle_polling_interval = (
+        int(entry.data[CONF_IDLE_POLLING_INTERVAL])
+        if CONF_IDLE_POLLING_INTERVAL in entry.data
+        else DEFAULT_IDLE_POLLING_INTERVAL
+    )
 
-    ag_service = Aerogarden(HOST, entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD])
-    coordinator = AerogardenDataUpdateCoordinator(hass, ag_service, polling_interval)
+    hub = async_get_hub(hass, HOST)
+    ag_service = Aerogarden(
+        HOST,
+        entry.data[CONF_EMAIL],
+        entry.data[CONF_PASSWORD],
+        hub.session,
+        AerogardenStore(hass, entry.entry_id),
+        hub,
+    )
+    await ag_service.async_restore()
+    validated_login = async_pop_validated_login(hass, entry.unique_id)
+    if validated_login is not None:
+        # the config flow just logged in and fetched the gardens; use those instead of doing it again
+        await ag_service.async_seed(*validated_login)
+    refresh_slot = hub.register(entry.entry_id, ag_service.user_id)
+    coordinator = AerogardenDataUpdateCoordinator(
+        hass,
+        ag_service,
+        polling_interval,
+        max_polling_interval,
+        refresh_slot,
+        idle_polling_interval,
+    )
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    await coordinator.async_config_entry_first_refresh()
+    if validated_login is not None:
+        # already current, so the next refresh is left to the polling schedule
+        coordinator.async_set_updated_data(ag_service)
+    elif ag_service.get_garden_config_ids():
+        # Entities are created from the restored snapshot; the live refresh happens in the background
+        coordinator.async_set_updated_data(ag_service)
+        entry.async_create_background_task(
+            hass,
+            async_refresh_and_register(hass, entry, coordinator),
+            f"{DOMAIN}-refresh-{entry.entry_id}",
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # setup failed, so the entry won't be unloaded; release what it holds before Home Assistant retries
+            hass.data[DOMAIN].pop(entry.entry_id, None)
+            await ag_service.close()
+            async_release_hub(hass, HOST, entry.entry_id)
+            raise
+        # the first refresh logged in, so the entry can now poll alongside others on the same account
+        hub.register(entry.entry_id, ag_service.user_id)
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
     return True
 
 
+async def async_refresh_and_register(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: "AerogardenDataUpdateCoordinator",
+):
+    """Refresh an entry set up from its snapshot, then register it with the hub again in case the snapshot had
+    no session and the refresh was its first login"""
+    await coordinator.async_refresh()
+    async_get_hub(hass, HOST).register(entry.entry_id, coordinator.aerogarden.user_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading aerogarden platform for %s", entry.entry_id)
 
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN].pop(
+            entry.entry_id
+        )
+        await coordinator.write_queue.async_flush()
+        await coordinator.aerogarden.close()
+        async_release_hub(hass, HOST, entry.entry_id)
+        async_unload_services(hass)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data when a config entry is deleted."""
+    await AerogardenStore(hass, entry.entry_id).async_remove()
+
+
 class AerogardenDataUpdateCoordinator(DataUpdateCoordinator[Aerogarden]):
     """Handles updating data for the integration"""
 
     def __init__(
-        self, hass: HomeAssistant, ag_service: Aerogarden, polling_interval: int
+        self,
+        hass: HomeAssistant,
+        ag_service: Aerogarden,
+        polling_interval: int,
+        max_polling_interval: int = DEFAULT_MAX_POLLING_INTERVAL,
+        refresh_slot: RefreshSlot | None = None,
+        idle_polling_interval: int = DEFAULT_IDLE_POLLING_INTERVAL,
     ) -> None:
         """Constructor"""
         super().__init__(
@@ -70,33 +186,205 @@ class AerogardenDataUpdateCoordinator(DataUpdateCoordinator[Aerogarden]):
         )
 
         self._aerogarden = ag_service
+        self._min_polling_interval = polling_interval
+        self._max_polling_interval = max(polling_interval, max_polling_interval)
+        self._idle_polling_interval = max(
+            self._max_polling_interval, idle_polling_interval
+        )
+        # gardens are polled according to how active they are, and only idle ones can back off further
+        self._polling_tiers: dict[int, PollingTier] = {}
+        # staggers this entry's polls against other entries, applied once to shift its phase and again after
+        # every predicted transition, which other entries are likely to be polling for at the same time
+        self._refresh_slot = refresh_slot
+        self._applied_offset = 0
+
+        # listeners are only notified when a refresh changed something, or a change was just written and
+        # entities need the refresh to confirm their optimistic state
+        self._skip_notify = False
+        self._notify_next = False
+        self._notified_success = True
+        # entities reporting on the refreshes themselves, notified even when no garden changed
+        self._diagnostic_listeners: list[CALLBACK_TYPE] = []
+
+        # config changes made in quick succession are written together, then picked up by a single refresh
+        self.write_queue = AerogardenWriteQueue(
+            hass, ag_service, self.__async_refresh_after_write
+        )
+
+    def set_polling_bounds(
+        self,
+        polling_interval: int,
+        max_polling_interval: int,
+        idle_polling_interval: int | None = None,
+    ):
+        """Change how often the coordinator is allowed to poll, and poll at the lower bound until the next refresh"""
+        self._min_polling_interval = polling_interval
+        self._max_polling_interval = max(polling_interval, max_polling_interval)
+        self._idle_polling_interval = max(
+            self._max_polling_interval,
+            idle_polling_interval or self._idle_polling_interval,
+        )
+        self.update_interval = timedelta(seconds=polling_interval)
+
+    async def async_update_password(self, password: str):
+        """Swap in a new password without reloading, then refresh using the session it logged into"""
+        await self._aerogarden.async_update_password(password)
+        await self.async_request_refresh()
 
     async def _async_update_data(self):
         """Fetch data from the Aerogarden API"""
         _LOGGER.debug("Refreshing data from data update coordinator")
         try:
-            async with async_timeout.timeout(10):
-                await self._aerogarden.update()
-                return self._aerogarden
+            if self._refresh_slot is None:
+                await self.__async_update()
+            else:
+                # the timeout only starts once the hub lets this refresh run, so queueing doesn't cause timeouts
+                async with self._refresh_slot.async_acquire():
+                    await self.__async_update()
+                _LOGGER.debug(
+                    "Refresh waited %.3fs and took %.3fs",
+                    self._refresh_slot.last_wait,
+                    self._refresh_slot.last_latency,
+                )
         except Exception as e:
+            cause = e.__cause__
+            if isinstance(cause, AerogardenApiCircuitOpenError):
+                # requests are withheld while the api is down; check back once the breaker lets a trial through
+                retry_after = max(
+                    self._min_polling_interval, self._aerogarden.retry_after
+                )
+                self.update_interval = timedelta(seconds=retry_after)
+
+            if (
+                isinstance(cause, AerogardenApiAuthError)
+                and self._aerogarden.credentials_rejected
+            ):
+                # stops polling and starts the reauth flow; the rejected credentials aren't tried again
+                raise ConfigEntryAuthFailed(str(cause)) from e
+
+            if isinstance(cause, (AerogardenApiConnectError, AerogardenApiAuthError)):
+                # an outage, or a login that failed without rejecting the credentials, isn't a bug, so leave
+                # logging to the coordinator instead of dumping a stack trace
+                raise UpdateFailed(str(cause)) from e
+
             _LOGGER.error("Unable to refresh from data update coordinator", exc_info=e)
             raise UpdateFailed from e
 
+        self._skip_notify = not self._aerogarden.last_update_changed
+        self.__schedule_next_refresh()
+        return self._aerogarden
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities of a refresh, unless it returned nothing new and availability didn't change"""
+        skip = (
+            self._skip_notify
+            and not self._notify_next
+            and self.last_update_success
+            and self._notified_success
+        )
+        self._skip_notify = False
+        if skip:
+            _LOGGER.debug("Gardens unchanged, skipping entity updates")
+            for update_callback in list(self._diagnostic_listeners):
+                update_callback()
+            return
+
+        self._notify_next = False
+        self._notified_success = self.last_update_success
+        super().async_update_listeners()
+
+    @callback
+    def async_add_diagnostic_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for the refreshes that entities aren't notified of because no garden changed. Returns a
+        function removing the listener."""
+        self._diagnostic_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._diagnostic_listeners.remove(update_callback)
+
+        return remove_listener
+
+    async def __async_refresh_after_write(self):
+        self._notify_next = True
+        await self.async_request_refresh()
+
+    async def __async_update(self):
+        async with async_timeout.timeout(UPDATE_TIMEOUT):
+            await self._aerogarden.update()
+
+    def __schedule_next_refresh(self):
+        now = dt_util.utcnow()
+        gardens = self._aerogarden.get_gardens()
+        poll_offset = (
+            self._refresh_slot.poll_offset if self._refresh_slot is not None else 0
+        )
+        self._polling_tiers = {
+            garden.config_id: get_polling_tier(
+                garden, self._aerogarden.get_seconds_since_change(garden.config_id)
+            )
+            for garden in gardens
+        }
+        interval = get_adaptive_polling_interval(
+            gardens,
+            self._min_polling_interval,
+            self._max_polling_interval,
+            now,
+            TRANSITION_MARGIN + poll_offset,
+            self._polling_tiers,
+            self._idle_polling_interval,
+        )
+        if poll_offset != self._applied_offset:
+            # the hub may move the entry to another offset once it knows its account, so the phase shifts again
+            interval += (poll_offset - self._applied_offset) % STAGGER_WINDOW
+            self._applied_offset = poll_offset
+
+        _LOGGER.debug("Next refresh scheduled in %s seconds", interval)
+        self.update_interval = timedelta(seconds=interval)
+
     @property
     def aerogarden(self) -> Aerogarden:
         return self._aerogarden
 
+    @property
+    def refresh_slot(self) -> RefreshSlot | None:
+        return self._refresh_slot
+
+    @property
+    def polling_tiers(self) -> dict[int, PollingTier]:
+        """How often each garden needed polling as of the last refresh"""
+        return self._polling_tiers
+
 
 class AerogardenEntity(CoordinatorEntity[AerogardenDataUpdateCoordinator]):
     def __init__(
-        self, coordinator: AerogardenDataUpdateCoordinator, config_id: int, key: str
+        self,
+        coordinator: "AerogardenDataUpdateCoordinator",
+        config_id: int,
+        key: str,
+        data_keys: tuple[str, ...],
     ) -> None:
         super().__init__(coordinator)
         self._config_id = config_id
         self._key = key
+        self._data_keys = data_keys
+        self._last_available = True
 
     _attr_has_entity_name = True
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state if availability or the garden fields backing this entity changed"""
+        available = self.available
+        if available != self._last_available or self.aerogarden.has_changed(
+            self._config_id, self._data_keys
+        ):
+            self._last_available = available
+            self.async_write_ha_state()
+
     @property
     def unique_id(self) -> str:
         """Return the unique ID for this entity."""
@@ -111,3 +399,68 @@ class AerogardenEntity(CoordinatorEntity[AerogardenDataUpdateCoordinator]):
     def aerogarden(self) -> Aerogarden:
         """Returns the underlying aerogarden api object from the assigned coordinator"""
         return self.coordinator.aerogarden
+
+    @property
+    def garden(self) -> GardenState | None:
+        """Returns the current state of the garden this entity belongs to"""
+        return self.coordinator.aerogarden.get_garden(self._config_id)
+
+
+class AerogardenControlEntity(AerogardenEntity):
+    """Base for entities that change garden settings. Changes are shown immediately, then either confirmed by the
+    next refresh or rolled back if they could not be written."""
+
+    def __init__(
+        self,
+        coordinator: "AerogardenDataUpdateCoordinator",
+        config_id: int,
+        key: str,
+        data_keys: tuple[str, ...],
+    ) -> None:
+        super().__init__(coordinator, config_id, key, data_keys)
+        # values shown ahead of the api, and whether the write carrying each has completed
+        self._optimistic: dict[str, Any] = {}
+        self._written: set[str] = set()
+
+    def _get_value(self, field: str):
+        """Returns the optimistic value of a field if one is pending, otherwise the value last polled from the api"""
+        if field in self._optimistic:
+            return self._optimistic[field]
+
+        return self.aerogarden.get_garden_property(self._config_id, field)
+
+    async def _async_write(self, patch: dict[str, Any]):
+        """Show the given plant config fields immediately, then write them to the garden"""
+        garden = self.garden
+        if garden is None:
+            raise HomeAssistantError("Garden is no longer available.")
+
+        self._optimistic.update(patch)
+        self._written.difference_update(patch)
+        self.async_write_ha_state()
+
+        try:
+            await self.coordinator.write_queue.async_update(
+                garden.air_guid, garden.choose_garden, patch
+            )
+        except Exception as ex:
+            # roll back, unless a later change to the same field has superseded this one
+            for field, value in patch.items():
+                if self._optimistic.get(field) == value:
+                    del self._optimistic[field]
+            self.async_write_ha_state()
+            raise HomeAssistantError(f"Unable to update {self.entity_id}: {ex}") from ex
+
+        self._written.update(field for field in patch if field in self._optimistic)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Once a change has been written, the next refresh is authoritative and replaces the optimistic value"""
+        if self._written:
+            for field in self._written:
+                self._optimistic.pop(field, None)
+            self._written.clear()
+            self.async_write_ha_state()
+            return
+
+        super()._handle_coordinator_update()
@@ -1,108 +1,412 @@
-import base64
+import asyncio
+import json
 import logging
+import time
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
+from itertools import islice
+from typing import TypeVar
 
+import aiohttp
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
-from .client import AerogardenClient
-from .const import (
-    DOMAIN,
-    GARDEN_KEY_AIR_GUID,
-    GARDEN_KEY_CHOOSE_GARDEN,
-    GARDEN_KEY_CONFIG_ID,
-    GARDEN_KEY_GARDEN_TYPE,
-    GARDEN_KEY_HW_VERSION,
-    GARDEN_KEY_PLANTED_NAME,
-    GARDEN_KEY_SW_VERSION,
-    MANUFACTURER,
+from .breaker import CircuitState
+from .client import (
+    AerogardenApiAuthError,
+    AerogardenApiCredentialsError,
+    AerogardenApiError,
+    AerogardenClient,
 )
+from .const import DOMAIN, GARDEN_KEY_CONFIG_ID, MANUFACTURER
+from .hub import AerogardenHub
+from .metrics import ApiMetrics
+from .models import (
+    GARDEN_STATE_FIELDS,
+    GardenNameCache,
+    GardenState,
+    get_device_fingerprint,
+)
+from .storage import AerogardenStore
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Caps on the per-refresh debug summary, so it stays a single short line for large accounts
+MAX_LOGGED_GARDENS = 10
+MAX_LOGGED_FIELDS = 10
+
 
 class Aerogarden:
     MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=30)
 
-    def __init__(self, host: str, email: str, password: str) -> None:
-        self._client = AerogardenClient(host, email, password)
-        self._data: dict = {}
+    def __init__(
+        self,
+        host: str,
+        email: str,
+        password: str,
+        session: aiohttp.ClientSession | None = None,
+        store: AerogardenStore | None = None,
+        hub: AerogardenHub | None = None,
+    ) -> None:
+        self._client = AerogardenClient(
+            host,
+            email,
+            password,
+            session,
+            rate_limiter=hub.rate_limiter if hub is not None else None,
+        )
+        self._store = store
+        self._hub = hub
+        # logins are single-flight; the generation tells a caller whether someone else logged in meanwhile
+        self._login_lock = asyncio.Lock()
+        self._login_generation = 0
+        # set once the api rejects the credentials, so they aren't tried again until new ones are provided
+        self._credentials_rejected = False
+        self._data: dict[int, GardenState] = {}
+        self._garden_halves: dict[str, list[int]] = {}
+        self._name_cache = GardenNameCache()
+        self._changed_fields: dict[int, set[str]] = {}
+        self._changed_at: dict[int, float] = {}
+        self._updated_at: float | None = None
+        self._fingerprints: dict[int, int] = {}
+        self._last_update_changed = True
+        self.refreshes_processed = 0
+        self.refreshes_skipped = 0
 
     def get_garden_config_ids(self):
         return self._data.keys()
 
+    @property
+    def user_id(self) -> int:
+        """User id of the logged in or restored session, or 0 if there is none"""
+        return self._client.user_id
+
+    @property
+    def credentials_rejected(self) -> bool:
+        """True if the api rejected the credentials, and no requests are sent until new ones are provided"""
+        return self._credentials_rejected
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        """State of the circuit breaker guarding requests to the api"""
+        return self._client.circuit_state
+
+    @property
+    def api_metrics(self) -> ApiMetrics:
+        """Latency, status and error statistics for requests made to the api"""
+        return self._client.metrics
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until requests are attempted again while the api is considered unavailable"""
+        return self._client.retry_after
+
+    @property
+    def last_update_changed(self) -> bool:
+        """False if the last update returned the same gardens as the one before, so entities have nothing to write"""
+        return self._last_update_changed
+
+    @property
+    def seconds_since_update(self) -> float | None:
+        """Seconds elapsed since garden data was last fetched from the api, or None if it hasn't been yet"""
+        if self._updated_at is None:
+            return None
+
+        return time.monotonic() - self._updated_at
+
+    def get_gardens(self):
+        return self._data.values()
+
+    def get_garden(self, config_id: int) -> GardenState | None:
+        return self._data.get(config_id)
+
     def get_garden_name(self, config_id: int):
-        planted_name_decoded = self.__get_decoded_garden_name(config_id)
+        garden = self._data[config_id]
 
-        is_multi_garden = self.__is_multi_garden(config_id)
+        is_multi_garden = self.__is_multi_garden(garden)
         if not is_multi_garden:
-            return planted_name_decoded
+            return garden.name
 
-        multi_garden_label = (
-            "Left"
-            if self.get_garden_property(config_id, GARDEN_KEY_CHOOSE_GARDEN) == 0
-            else "Right"
-        )
-        return f"{planted_name_decoded} ({multi_garden_label})"
+        multi_garden_label = "Left" if garden.choose_garden == 0 else "Right"
+        return f"{garden.name} ({multi_garden_label})"
 
     def get_garden_property(self, config_id: int, field: str):
-        if config_id not in self._data or field not in self._data[config_id]:
+        garden = self._data.get(config_id)
+        if garden is None:
+            return None
+
+        return garden.get(field)
+
+    def get_seconds_since_change(self, config_id: int) -> float | None:
+        """Seconds elapsed since a garden last changed meaningfully, or None if it hasn't been seen"""
+        changed_at = self._changed_at.get(config_id)
+        if changed_at is None:
             return None
 
-        return self._data[config_id][field]
+        return time.monotonic() - changed_at
+
+    def has_changed(self, config_id: int, fields: tuple[str, ...]) -> bool:
+        """Returns true if any of the given fields changed for a garden during the last update"""
+        changed_fields = self._changed_fields.get(config_id)
+        return changed_fields is not None and not changed_fields.isdisjoint(fields)
 
     def get_device_info(self, config_id: int):
+        garden = self._data[config_id]
         return DeviceInfo(
             identifiers={
-                (DOMAIN, self.get_garden_property(config_id, GARDEN_KEY_AIR_GUID)),
+                (DOMAIN, garden.air_guid),
             },
-            name=self.__get_decoded_garden_name(config_id),
-            hw_version=self.get_garden_property(config_id, GARDEN_KEY_HW_VERSION),
-            sw_version=self.get_garden_property(config_id, GARDEN_KEY_SW_VERSION),
-            model=self.__get_device_model_by_device_type(
-                self.get_garden_property(config_id, GARDEN_KEY_GARDEN_TYPE)
-            ),
+            name=garden.name,
+            hw_version=garden.hw_version,
+            sw_version=garden.sw_version,
+            model=garden.model,
             manufacturer=MANUFACTURER,
         )
 
+    def get_diagnostics(self) -> dict:
+        """Returns runtime statistics to include in config entry diagnostics"""
+        return {
+            "garden_count": len(self._data),
+            "circuit_state": self._client.circuit_state,
+            "refreshes": {
+                "processed": self.refreshes_processed,
+                "skipped": self.refreshes_skipped,
+            },
+            "name_cache": {
+                "hits": self._name_cache.hits,
+                "misses": self._name_cache.misses,
+            },
+            "api": self._client.metrics.get_diagnostics(),
+        }
+
+    async def async_restore(self):
+        """Restore state persisted by a previous run, so startup can skip the login round-trip"""
+        if self._store is None:
+            return
+
+        await self._store.async_load()
+        user_id = self._store.get_user_id()
+        if user_id > 0:
+            _LOGGER.debug("Restoring persisted session for user %s", user_id)
+            self._client.restore_session(user_id)
+
+        devices = self._store.get_devices()
+        if devices:
+            _LOGGER.debug("Restoring %s gardens from snapshot", len(devices))
+            self._set_devices(devices)
+
+    async def async_seed(self, user_id: int, devices: list[dict]):
+        """Adopt a session and device list fetched moments ago, e.g. by the config flow, in place of the first
+        login and refresh"""
+        self._client.restore_session(user_id)
+        self._updated_at = time.monotonic()
+        self._last_update_changed = self._set_devices(devices)
+
+        if self._store is not None:
+            await self._store.async_save_session(user_id)
+            self._store.save_devices(devices)
+
     async def update(self):
         try:
-            if not self._client.is_logged_in():
-                await self._client.login()
+            started_at = time.monotonic()
+            devices = await self.__get_user_devices()
+            self._updated_at = time.monotonic()
+            self._last_update_changed = self._set_devices(devices)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                self.__log_summary(len(devices), self._updated_at - started_at)
 
-            data = {}
-            devices = await self._client.get_user_devices()
-            for garden in devices:
-                config_id = garden[GARDEN_KEY_CONFIG_ID]
-                data[config_id] = garden
+            if not self._last_update_changed:
+                self.refreshes_skipped += 1
+                return
 
-            self._data = data
-            _LOGGER.debug("data set to %s", data)
+            self.refreshes_processed += 1
+            if self._store is not None:
+                self._store.save_devices(devices)
         except Exception as ex:
             raise UpdateFailed from ex
 
-    def __get_decoded_garden_name(self, config_id: int) -> str:
-        return base64.b64decode(
-            self.get_garden_property(config_id, GARDEN_KEY_PLANTED_NAME)
-        ).decode("utf-8")
+    async def get_raw_devices(self) -> list[dict]:
+        """Fetch the complete device list as returned by the api, including fields the integration doesn't read"""
+        return await self.__get_user_devices(project=False)
 
-    def __is_multi_garden(self, config_id: int) -> bool:
-        choose_garden = self.get_garden_property(config_id, GARDEN_KEY_CHOOSE_GARDEN)
-        if choose_garden > 0:
+    def __log_summary(self, device_count: int, latency: float):
+        # field names only, never values, so the line stays short regardless of payload size
+        gardens = islice(self._changed_fields.items(), MAX_LOGGED_GARDENS)
+        changed = {
+            config_id: sorted(fields)[:MAX_LOGGED_FIELDS]
+            for config_id, fields in gardens
+        }
+        _LOGGER.debug(
+            "Refreshed %s gardens in %.3fs, changed fields: %s",
+            device_count,
+            latency,
+            changed or "none",
+        )
+
+    async def update_device_config(
+        self, air_guid: str, choose_garden: int, plant_config: dict
+    ):
+        """Patch the config of a garden with the given plant config fields, logging in first if needed"""
+        plant_config_json = json.dumps(plant_config)
+        # the api answers a write from an expired session the same way as a failed write, so a failed write
+        # is retried once after logging in again
+        await self.__call_with_session(
+            lambda: self._client.update_device_config(
+                air_guid, choose_garden, plant_config_json
+            ),
+            AerogardenApiError,
+        )
+        if self._hub is not None:
+            self._hub.invalidate_user_devices(self._client.user_id)
+
+    def _set_devices(self, devices: list[dict]) -> bool:
+        """Parse a device list returned by the api into the garden states read by entities.
+        Returns false, leaving the current states in place, if no garden changed meaningfully.
+        """
+        fingerprints = {
+            device[GARDEN_KEY_CONFIG_ID]: get_device_fingerprint(device)
+            for device in devices
+        }
+        if fingerprints == self._fingerprints:
+            for device in devices:
+                self._data[device[GARDEN_KEY_CONFIG_ID]].update_volatile(device)
+            self._changed_fields = {}
+            return False
+
+        # gardens whose fingerprint is unchanged keep their parsed state
+        data: dict[int, GardenState] = {}
+        for device in devices:
+            config_id = device[GARDEN_KEY_CONFIG_ID]
+            previous = self._data.get(config_id)
+            unchanged = self._fingerprints.get(config_id) == fingerprints[config_id]
+            if previous is not None and unchanged:
+                previous.update_volatile(device)
+                data[config_id] = previous
+            else:
+                data[config_id] = GardenState(device, self._name_cache)
+        self._name_cache.retain(data.keys())
+
+        # index each airGuid to the config ids sharing it, so multi-garden halves can be found without a scan
+        garden_halves: dict[str, list[int]] = {}
+        for garden in data.values():
+            garden_halves.setdefault(garden.air_guid, []).append(garden.config_id)
+
+        # diff against the previous state so only entities backed by changed fields need to be written
+        changed_fields: dict[int, set[str]] = {}
+        changed_at = {
+            config_id: self._changed_at[config_id]
+            for config_id in data
+            if config_id in self._changed_at
+        }
+        now = time.monotonic()
+        for config_id, garden in data.items():
+            previous = self._data.get(config_id)
+            if previous is garden:
+                continue
+
+            fields = (
+                set(GARDEN_STATE_FIELDS) if previous is None else garden.diff(previous)
+            )
+            if fields:
+                changed_fields[config_id] = fields
+                changed_at[config_id] = now
+
+        self._data = data
+        self._fingerprints = fingerprints
+        self._garden_halves = garden_halves
+        self._changed_fields = changed_fields
+        self._changed_at = changed_at
+        return True
+
+    async def __get_user_devices(self, project: bool = True):
+        return await self.__call_with_session(
+            lambda: self.__fetch_user_devices(project), AerogardenApiAuthError
+        )
+
+    async def __call_with_session(
+        self, request: Callable[[], Awaitable[_T]], rejected: type[Exception]
+    ) -> _T:
+        """Send a request that needs a session, logging in first if there is none. If the session is
+        rejected, log in again and retry the request once."""
+        await self.__ensure_session()
+        generation = self._login_generation
+        try:
+            return await request()
+        except rejected:
+            _LOGGER.info("Session was rejected, logging in again")
+            await self.__ensure_session(generation)
+            return await request()
+
+    async def __fetch_user_devices(self, project: bool):
+        if not project:
+            return await self._client.get_user_devices(project=False)
+
+        if self._hub is None:
+            return await self._client.get_user_devices()
+
+        # entries logged into the same account share one fetch through the hub
+        return await self._hub.async_get_user_devices(
+            self._client.user_id, self._client.get_user_devices
+        )
+
+    async def async_update_password(self, password: str):
+        """Log in with a new password and use it from now on. The current password and session are kept
+        if the login fails."""
+        async with self._login_lock:
+            await self.__login(password)
+
+        if self._hub is not None:
+            # the refresh that follows shouldn't be served a device list another entry fetched before the login
+            self._hub.invalidate_user_devices(self._client.user_id)
+
+    async def __ensure_session(self, rejected_generation: int | None = None):
+        """Log in if there is no session, or if the session of the given login generation was rejected.
+        Concurrent callers wait on a single login instead of each sending their own."""
+        async with self._login_lock:
+            if self._credentials_rejected:
+                raise AerogardenApiCredentialsError(
+                    "Credentials were rejected, reauthentication is required."
+                )
+
+            if rejected_generation is None:
+                if self._client.is_logged_in():
+                    return
+            elif rejected_generation != self._login_generation:
+                # another caller already logged in again after this session was rejected
+                return
+            elif self._store is not None:
+                # the persisted session is no longer accepted either, so it mustn't be restored if logging in fails
+                await self._store.async_clear_session()
+
+            try:
+                await self.__login()
+            except AerogardenApiCredentialsError:
+                _LOGGER.warning(
+                    "Credentials were rejected, polling stopped until reauthenticated"
+                )
+                self._credentials_rejected = True
+                raise
+
+    async def __login(self, password: str | None = None):
+        await self._client.login(password)
+        self._login_generation += 1
+        self._credentials_rejected = False
+
+        if self._store is not None:
+            await self._store.async_save_session(self._client.user_id)
+
+    async def close(self):
+        """Release any network resources held by the underlying client"""
+        await self._client.close()
+
+    def __is_multi_garden(self, garden: GardenState) -> bool:
+        if garden.choose_garden > 0:
             return True  # if choose_garden is greater than 0, this is the right half of a multi-garden
 
         # if another garden exists with the same airGuid and a non-zero chooseGarden, this is the left half of a multi-garden
-        air_guid = self.get_garden_property(config_id, GARDEN_KEY_AIR_GUID)
         return any(
-            garden[GARDEN_KEY_AIR_GUID] == air_guid
-            and garden[GARDEN_KEY_CHOOSE_GARDEN] > 0
-            for garden in self._data.values()
+            self._data[config_id].choose_garden > 0
+            for config_id in self._garden_halves.get(garden.air_guid, ())
         )
-
-    @staticmethod
-    def __get_device_model_by_device_type(device_type: int):
-        match device_type:
-            case 5:
-                return "Aerogarden Bounty"
-            case _:
-                return f"Aerogarden Type {device_type}"
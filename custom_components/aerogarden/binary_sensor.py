@@ -1,5 +1,8 @@
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -7,15 +10,18 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
 from custom_components.aerogarden import (
     AerogardenDataUpdateCoordinator,
     AerogardenEntity,
 )
-from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.models import GardenState
+from custom_components.aerogarden.schedule import GardenSchedule
 
 from .const import (
     DOMAIN,
@@ -26,12 +32,18 @@ from .const import (
     GARDEN_KEY_PUMP_STAT,
 )
 
+# How long a predicted state is trusted while the api still reports the previous one
+PREDICTION_TIMEOUT = 120
+
 
 @dataclass
 class AerogardenBinarySensorDescriptionMixin:
     """Mixin for adding required values to entity descriptions"""
 
-    value_fn: Callable[[Aerogarden, int], StateType]
+    value_fn: Callable[[GardenState], StateType]
+    data_keys: tuple[str, ...]
+    # Predicts the next scheduled transition as (seconds, new state), for sensors that follow a garden schedule
+    transition_fn: Callable[[GardenSchedule, float], tuple[float, bool] | None] | None
 
 
 @dataclass
@@ -47,9 +59,9 @@ SENSOR_DESCRIPTIONS: list[AerogardenBinarySensorDescription] = [
         device_class=BinarySensorDeviceClass.RUNNING,
         icon="mdi:water-pump",
         translation_key="pump_status",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_PUMP_STAT)
-        ),
+        value_fn=lambda garden: garden.pump_stat,
+        data_keys=(GARDEN_KEY_PUMP_STAT,),
+        transition_fn=GardenSchedule.next_pump_transition,
     ),
     AerogardenBinarySensorDescription(
         # Old data key that turned out incorrect. Logic uses a new key, but retained as entity key for backwards compatibility.
@@ -57,18 +69,20 @@ SENSOR_DESCRIPTIONS: list[AerogardenBinarySensorDescription] = [
         device_class=BinarySensorDeviceClass.PROBLEM,
         icon="mdi:cup-water",
         translation_key="needs_nutrients",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_NUTRI_REMIND_DAY) < 1
-        ),
+        value_fn=lambda garden: garden.nutri_remind_day < 1
+        if garden.nutri_remind_day is not None
+        else None,
+        data_keys=(GARDEN_KEY_NUTRI_REMIND_DAY,),
+        transition_fn=None,
     ),
     AerogardenBinarySensorDescription(
         key=GARDEN_KEY_PUMP_HYDRO,
         device_class=BinarySensorDeviceClass.PROBLEM,
         icon="mdi:water",
         translation_key="needs_water",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_PUMP_HYDRO)
-        ),
+        value_fn=lambda garden: garden.pump_hydro,
+        data_keys=(GARDEN_KEY_PUMP_HYDRO,),
+        transition_fn=None,
     ),
     AerogardenBinarySensorDescription(
         key=GARDEN_KEY_LIGHT_STAT,
@@ -76,9 +90,9 @@ SENSOR_DESCRIPTIONS: list[AerogardenBinarySensorDescription] = [
         device_class=None,
         icon="mdi:lightbulb",
         translation_key="light_status",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_LIGHT_STAT)
-        ),
+        value_fn=lambda garden: garden.light_stat,
+        data_keys=(GARDEN_KEY_LIGHT_STAT,),
+        transition_fn=GardenSchedule.next_light_transition,
     ),
 ]
 
@@ -92,12 +106,115 @@ class AerogardenBinarySensor(AerogardenEntity, BinarySensorEntity):
         description: AerogardenBinarySensorDescription,
         config_id: int,
     ) -> None:
-        super().__init__(coordinator, config_id, description.key)
+        super().__init__(coordinator, config_id, description.key, description.data_keys)
         self.entity_description = description
+        self._predicted_state: bool | None = None
+        self._predicted_at = 0.0
+        self._cancel_transition: CALLBACK_TYPE | None = None
+        self._cancel_expiry: CALLBACK_TYPE | None = None
 
     @property
     def is_on(self) -> bool | None:
-        return self.entity_description.value_fn(self.aerogarden, self._config_id)
+        if self._predicted_state is not None:
+            return self._predicted_state
+
+        return self.__get_polled_state()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.__schedule_transition()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.__cancel_transition()
+        self.__cancel_expiry()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reconcile any predicted state against freshly polled data, then predict the next transition"""
+        predicted_state = self._predicted_state
+        if predicted_state is not None and (
+            bool(self.__get_polled_state()) == predicted_state
+            or time.monotonic() - self._predicted_at > PREDICTION_TIMEOUT
+        ):
+            self._predicted_state = None
+            self.__cancel_expiry()
+
+        self.__schedule_transition()
+
+        # the api disagreed with the prediction for too long, so revert to the polled state
+        if predicted_state is not None and self._predicted_state is None:
+            if self.is_on != predicted_state:
+                self.async_write_ha_state()
+                return
+
+        super()._handle_coordinator_update()
+
+    def __get_polled_state(self) -> bool | None:
+        garden = self.garden
+        if garden is None:
+            return None
+
+        return self.entity_description.value_fn(garden)
+
+    def __schedule_transition(self):
+        self.__cancel_transition()
+
+        transition_fn = self.entity_description.transition_fn
+        elapsed = self.aerogarden.seconds_since_update
+        garden = self.garden
+        if self.hass is None or transition_fn is None or elapsed is None or not garden:
+            return
+
+        polled_at = dt_util.utcnow() - timedelta(seconds=elapsed)
+        schedule = GardenSchedule.from_garden(garden, polled_at)
+        # the garden isn't following its schedule, e.g. the light was switched by hand, so it can't be predicted.
+        # the state the schedule gives at poll time is the opposite of what its next transition switches to.
+        at_poll = transition_fn(schedule, 0)
+        if at_poll is None or at_poll[1] == bool(self.__get_polled_state()):
+            return
+
+        transition = transition_fn(schedule, elapsed)
+        if transition is None:
+            return
+
+        (seconds, new_state) = transition
+        self._cancel_transition = async_call_later(
+            self.hass, seconds, partial(self.__handle_transition, new_state)
+        )
+
+    @callback
+    def __handle_transition(self, new_state: bool, _: datetime):
+        self._cancel_transition = None
+        self._predicted_state = new_state
+        self._predicted_at = time.monotonic()
+        self.async_write_ha_state()
+        self.__schedule_transition()
+
+        # unchanged refreshes don't reach entities, so a prediction the api never confirms has to expire on its own
+        self.__cancel_expiry()
+        self._cancel_expiry = async_call_later(
+            self.hass, PREDICTION_TIMEOUT, self.__handle_prediction_expired
+        )
+
+    @callback
+    def __handle_prediction_expired(self, _: datetime):
+        self._cancel_expiry = None
+        if self._predicted_state is None:
+            return
+
+        self._predicted_state = None
+        self.async_write_ha_state()
+
+    def __cancel_transition(self):
+        if self._cancel_transition is not None:
+            self._cancel_transition()
+            self._cancel_transition = None
+
+    def __cancel_expiry(self):
+        if self._cancel_expiry is not None:
+            self._cancel_expiry()
+            self._cancel_expiry = None
 
 
 async def async_setup_entry(
@@ -0,0 +1,144 @@
+"""Circuit breaker, retry budget and rate limiter protecting the Aerogarden cloud api."""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from enum import StrEnum
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def get_backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with equal jitter, so recovering clients don't all retry at the same instant"""
+    delay = min(max_delay, base_delay * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Stops requests to an unavailable api after repeated failures, then lets a single trial request
+    through once a backoff delay has passed"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_delay: float = 30,
+        max_delay: float = 900,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._opened_at = 0.0
+        self._open_delay = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self.retry_after <= 0:
+            return CircuitState.HALF_OPEN
+
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial request through"""
+        if self._state != CircuitState.OPEN:
+            return 0
+
+        return max(0.0, self._opened_at + self._open_delay - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Returns true if a request may be sent to the api"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self):
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """Let another trial request through, after one ended without showing whether the api recovered"""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if (
+            self._state == CircuitState.HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            self.__trip()
+
+    def __trip(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._open_delay = get_backoff_delay(
+            self._trips, self._base_delay, self._max_delay
+        )
+        self._trips += 1
+        self._trial_in_flight = False
+
+
+class RetryBudget:
+    """Caps retries to a fraction of successful requests, so retries can't multiply load on a struggling api"""
+
+    def __init__(self, max_tokens: float = 10, token_ratio: float = 0.1) -> None:
+        self._max_tokens = max_tokens
+        self._token_ratio = token_ratio
+        self._tokens = max_tokens
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def try_spend(self) -> bool:
+        """Consume a token for a retry, returning false if the budget is exhausted"""
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+    def deposit(self):
+        """Earn back part of a token for a successful request"""
+        self._tokens = min(self._max_tokens, self._tokens + self._token_ratio)
+
+
+class RateLimiter:
+    """Spaces requests so no more than the given rate are sent per second, after allowing an initial burst"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self._interval = 1 / rate
+        self._burst = burst
+        self._next_at = 0.0
+
+    def reserve(self) -> float:
+        """Reserve the next request slot, returning the seconds to wait until it may be sent"""
+        now = time.monotonic()
+        # slots left unused while idle build up into a burst, to a limit
+        next_at = max(self._next_at, now - (self._burst - 1) * self._interval)
+        self._next_at = next_at + self._interval
+        return max(0.0, next_at - now)
+
+    async def async_acquire(self):
+        """Wait until a request may be sent"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -1,9 +1,21 @@
+import asyncio
+import json
 import logging
+import time
+from collections.abc import Callable
+from typing import Any
 
 import aiohttp
 import async_timeout
 from homeassistant.exceptions import HomeAssistantError
 
+from .breaker import (
+    CircuitBreaker,
+    CircuitState,
+    RateLimiter,
+    RetryBudget,
+    get_backoff_delay,
+)
 from .const import (
     DOMAIN,
     GARDEN_KEY_AIR_GUID,
@@ -14,6 +26,17 @@ from .const import (
     GARDEN_KEY_USER_ID,
     USER_AGENT_VERSION,
 )
+from .metrics import ApiMetrics
+from .models import GARDEN_KEYS_RETAINED
+
+# orjson is bundled with Home Assistant, but fall back to the standard library if it isn't available
+json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,52 +44,121 @@ API_URL_LOGIN = "/api/Admin/Login"
 API_URL_QUERY_USER_DEVICE = "/api/CustomData/QueryUserDevice"
 API_URL_UPDATE_DEVICE_CONFIG = "/api/Custom/UpdateDeviceConfig"
 
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 2
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 2
+
+# The longest a request can take, through every retry and the backoff between them
+MAX_REQUEST_DURATION = REQUEST_TIMEOUT + MAX_RETRIES * (
+    REQUEST_TIMEOUT + RETRY_MAX_DELAY
+)
+
+# Connections kept open by a session the client creates for itself, e.g. while validating a config flow. Config
+# entries send their requests through Home Assistant's shared session, which manages its own pool.
+OWNED_SESSION_CONNECTION_LIMIT = 4
+
 
 class AerogardenClient:
-    def __init__(self, host: str, email: str, password: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        email: str,
+        password: str,
+        session: aiohttp.ClientSession | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
         self._host = host
         self._email = email
         self._password = password
 
+        # When no session is provided, the client lazily creates and owns a pooled keep-alive session
+        self._session = session
+        self._owns_session = session is None
+
+        self._breaker = CircuitBreaker()
+        self._retry_budget = RetryBudget()
+        # shared between clients, so the request rate is limited across every config entry
+        self._rate_limiter = rate_limiter
+        self._metrics = ApiMetrics()
+
         self._user_id = 0
         self._headers = {
             "User-Agent": f"HA-{DOMAIN}/{USER_AGENT_VERSION}",
             "Content-Type": "application/x-www-form-urlencoded",
         }
 
+    @property
+    def user_id(self) -> int:
+        return self._user_id
+
+    @property
+    def metrics(self) -> ApiMetrics:
+        """Latency, status and error statistics for each endpoint this client has called"""
+        return self._metrics
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        return self._breaker.state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until requests are attempted again while the circuit is open"""
+        return self._breaker.retry_after
+
     def is_logged_in(self):
         return self._user_id > 0
 
-    async def login(self):
-        """Log into the Aerogarden client using the given credentials, then store the resulting userId"""
+    def restore_session(self, user_id: int):
+        """Reuse the userId of a previous login instead of logging in again"""
+        self._user_id = user_id
+
+    async def login(self, password: str | None = None):
+        """Log into the Aerogarden client using the given credentials, then store the resulting userId.
+        When a new password is given, it replaces the current one only if the login succeeds.
+        """
+        password = self._password if password is None else password
         response = await self.__post(
             API_URL_LOGIN,
             {
                 GARDEN_KEY_EMAIL: self._email,
-                GARDEN_KEY_PASSWORD: self._password,
+                GARDEN_KEY_PASSWORD: password,
             },
         )
 
         code = response["code"]
         if code <= 0:
             if code == -4:
-                raise AerogardenApiAuthError("User credentials provided are invalid.")
+                raise AerogardenApiCredentialsError(
+                    "User credentials provided are invalid."
+                )
             elif code == -2:
-                raise AerogardenApiAuthError("User account does not exist.")
+                raise AerogardenApiCredentialsError("User account does not exist.")
             else:
                 raise AerogardenApiAuthError("Login Failed.")
 
+        self._password = password
         self._user_id = code
 
-    async def get_user_devices(self):
-        """Get a list of device configurations. Requires client to be logged in."""
+    async def get_user_devices(self, project: bool = True):
+        """Get a list of device configurations, retaining only the fields read by the integration unless
+        project is false. Requires client to be logged in."""
         if not self.is_logged_in():
             raise AerogardenApiConnectError("Aerogarden client is not logged in.")
 
-        return await self.__post(
+        response = await self.__post(
             API_URL_QUERY_USER_DEVICE, {GARDEN_KEY_USER_ID: self._user_id}
         )
 
+        # A device list is returned on success; an error document with a code means the userId was rejected
+        if isinstance(response, dict) and response.get("code", 0) <= 0:
+            raise AerogardenApiAuthError("User session was rejected.")
+
+        if not project:
+            return response
+
+        return [project_device(device) for device in response]
+
     async def update_device_config(
         self, air_guid: str, choose_garden: int, plant_config: str
     ):
@@ -87,18 +179,112 @@ class AerogardenClient:
         if response["code"] <= 0:
             raise AerogardenApiError("Patching device config was not successful.")
 
+    async def close(self):
+        """Close the underlying http session if it was created by this client. Shared sessions are left open."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=OWNED_SESSION_CONNECTION_LIMIT),
+                raise_for_status=False,
+            )
+            self._owns_session = True
+
+        return self._session
+
     async def __post(self, path, post_data):
-        _LOGGER.debug("POST - %s", f"{self._host}{path}")
+        if not self._breaker.allow_request():
+            raise AerogardenApiCircuitOpenError(
+                f"Aerogarden API is unavailable, retrying in {self._breaker.retry_after:.0f} seconds"
+            )
+
+        try:
+            response = await self.__send_with_retries(path, post_data)
+        except AerogardenApiConnectError:
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            # cancelled, or failed on something other than reaching the api, so whether it recovered is still
+            # unknown. A trial request must not hold the circuit half open forever.
+            self._breaker.release_trial()
+            raise
+
+        self._breaker.record_success()
+        self._retry_budget.deposit()
+        return response
 
-        async with async_timeout.timeout(10), aiohttp.ClientSession(
-            raise_for_status=False, headers=self._headers
-        ) as session, session.post(f"{self._host}{path}", data=post_data) as response:
-            if response.status >= 400:
-                raise AerogardenApiConnectError(
-                    f"HTTP Request was unsuccessful with a status code {response.status}"
+    async def __send_with_retries(self, path, post_data):
+        attempt = 0
+        while True:
+            try:
+                return await self.__send(path, post_data)
+            except AerogardenApiConnectError as ex:
+                if attempt >= MAX_RETRIES or not self._retry_budget.try_spend():
+                    raise
+
+                delay = get_backoff_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+                _LOGGER.debug(
+                    "POST - %s failed, retrying in %.2fs: %s", path, delay, ex
                 )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def __send(self, path, post_data):
+        if self._rate_limiter is not None:
+            await self._rate_limiter.async_acquire()
+
+        _LOGGER.debug("POST - %s", f"{self._host}{path}")
+
+        session = self.__get_session()
+        metrics = self._metrics.get_or_create(get_endpoint_name(path))
+        started_at = time.monotonic()
+        status: int | None = None
+        error: str | None = None
+        try:
+            async with async_timeout.timeout(REQUEST_TIMEOUT), session.post(
+                f"{self._host}{path}", data=post_data, headers=self._headers
+            ) as response:
+                status = response.status
+                if status >= 400:
+                    error = f"HTTP {status}"
+                    raise AerogardenApiConnectError(
+                        f"HTTP Request was unsuccessful with a status code {status}"
+                    )
 
-            return await response.json()
+                body = await response.read()
+                try:
+                    result = json_loads(body)
+                except ValueError as ex:
+                    # e.g. an error page served by a proxy in front of the api
+                    error = type(ex).__name__
+                    raise AerogardenApiConnectError(
+                        f"HTTP Response could not be decoded: {body[:100]!r}"
+                    ) from ex
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            error = type(ex).__name__
+            raise AerogardenApiConnectError(
+                f"HTTP Request could not be completed: {ex!r}"
+            ) from ex
+        finally:
+            metrics.record_request(time.monotonic() - started_at, status, error)
+
+        if isinstance(result, dict) and "code" in result:
+            metrics.record_api_code(result["code"])
+
+        return result
+
+
+def get_endpoint_name(path: str) -> str:
+    """Returns the name an api endpoint is reported under, e.g. QueryUserDevice"""
+    return path.rsplit("/", 1)[-1]
+
+
+def project_device(device: dict) -> dict:
+    """Returns a copy of a device payload retaining only the fields read by the integration"""
+    return {key: device[key] for key in GARDEN_KEYS_RETAINED if key in device}
 
 
 class AerogardenApiError(HomeAssistantError):
@@ -109,5 +295,13 @@ class AerogardenApiConnectError(HomeAssistantError):
     """Error to indicate troubles connecting to the Aerogarden API"""
 
 
+class AerogardenApiCircuitOpenError(AerogardenApiConnectError):
+    """Error to indicate requests are being withheld because the Aerogarden API has been failing"""
+
+
 class AerogardenApiAuthError(HomeAssistantError):
     """Error to indicate authentication or authorization issues with the Aerogarden API"""
+
+
+class AerogardenApiCredentialsError(AerogardenApiAuthError):
+    """Error to indicate the Aerogarden API rejected the email or password, rather than failing a login"""
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -15,12 +15,17 @@ from custom_components.aerogarden import AerogardenDataUpdateCoordinator
 
 from .client import AerogardenApiAuthError, AerogardenApiConnectError, AerogardenClient
 from .const import (
+    CONF_IDLE_POLLING_INTERVAL,
+    CONF_MAX_POLLING_INTERVAL,
     CONF_POLLING_INTERVAL,
     CONF_UPDATE_PASSWORD,
+    DEFAULT_IDLE_POLLING_INTERVAL,
+    DEFAULT_MAX_POLLING_INTERVAL,
     DEFAULT_POLLING_INTERVAL,
     DOMAIN,
     HOST,
 )
+from .hub import async_cache_validated_login
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,12 +36,73 @@ CONFIG_SCHEMA = vol.Schema(
     }
 )
 
+REAUTH_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+    }
+)
+
+
+async def async_validate_credentials(
+    email: str, password: str
+) -> tuple[str | None, tuple[int, list] | None]:
+    """Log in and fetch the account's gardens with the given credentials, returning an error key if it failed,
+    otherwise the user id and device list to set up the entry with"""
+    client = AerogardenClient(HOST, email, password)
+    # noinspection PyBroadException
+    try:
+        await client.login()
+        devices = await client.get_user_devices()
+        return None, (client.user_id, devices)
+    except AerogardenApiConnectError:
+        return "cannot_connect", None
+    except AerogardenApiAuthError:
+        return "invalid_auth", None
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Unexpected exception")
+        return "unknown", None
+    finally:
+        await client.close()
+
+
+def validate_polling_intervals(
+    polling_interval: int, max_polling_interval: int, idle_polling_interval: int
+) -> dict[str, str]:
+    """Check the polling intervals are usable and in order, returning error keys for the fields that aren't"""
+    if polling_interval < 5:
+        return {CONF_POLLING_INTERVAL: "invalid_polling_interval"}
+    if max_polling_interval < polling_interval:
+        return {CONF_MAX_POLLING_INTERVAL: "invalid_max_polling_interval"}
+    if idle_polling_interval < max_polling_interval:
+        return {CONF_IDLE_POLLING_INTERVAL: "invalid_idle_polling_interval"}
+    return {}
+
+
+async def async_update_password(
+    coordinator: AerogardenDataUpdateCoordinator, password: str
+) -> str | None:
+    """Log the running client in with a new password, returning an error key if it failed. The old password is
+    kept if the new one is rejected"""
+    # noinspection PyBroadException
+    try:
+        await coordinator.async_update_password(password)
+        return None
+    except AerogardenApiConnectError:
+        return "cannot_connect"
+    except AerogardenApiAuthError:
+        return "invalid_auth"
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Unexpected exception")
+        return "unknown"
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore
     """Handle a config flow for aerogarden."""
 
     VERSION = 1
 
+    _reauth_entry: config_entries.ConfigEntry | None = None
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -52,26 +118,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore
 
         errors: dict[str, str] = {}
         if user_input is not None:
-            # noinspection PyBroadException
-            try:
-                client = AerogardenClient(
-                    HOST,
-                    user_input[CONF_EMAIL],
-                    user_input[CONF_PASSWORD],
-                )
-                await client.login()
-                _ = await client.get_user_devices()
-            except AerogardenApiConnectError:
-                errors["base"] = "cannot_connect"
-            except AerogardenApiAuthError:
-                errors["base"] = "invalid_auth"
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
+            error, validated_login = await async_validate_credentials(
+                user_input[CONF_EMAIL], user_input[CONF_PASSWORD]
+            )
+            if error is not None:
+                errors["base"] = error
             else:
-                await self.async_set_unique_id(f"aerogarden-{user_input[CONF_EMAIL]}")
+                assert validated_login is not None
+                unique_id = f"aerogarden-{user_input[CONF_EMAIL]}"
+                await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
 
+                # setting up the entry picks up this login and fetch, rather than repeating them
+                async_cache_validated_login(self.hass, unique_id, *validated_login)
+
                 return self.async_create_entry(
                     title=f"Aerogarden ({user_input[CONF_EMAIL]})", data=user_input
                 )
@@ -80,6 +140,51 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore
             step_id="user", data_schema=CONFIG_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle the api rejecting the credentials of an existing entry."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for a new password, then reload the entry with it."""
+
+        assert self._reauth_entry is not None
+        email = self._reauth_entry.data[CONF_EMAIL]
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            error, validated_login = await async_validate_credentials(
+                email, user_input[CONF_PASSWORD]
+            )
+            if error is not None:
+                errors["base"] = error
+            else:
+                assert validated_login is not None
+                if self._reauth_entry.unique_id is not None:
+                    async_cache_validated_login(
+                        self.hass, self._reauth_entry.unique_id, *validated_login
+                    )
+                self.hass.config_entries.async_update_entry(
+                    self._reauth_entry,
+                    data={
+                        **self._reauth_entry.data,
+                        CONF_PASSWORD: user_input[CONF_PASSWORD],
+                    },
+                )
+                await self.hass.config_entries.async_reload(self._reauth_entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            description_placeholders={"email": email},
+            errors=errors,
+        )
+
 
 class OptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
@@ -96,55 +201,63 @@ class OptionsFlow(config_entries.OptionsFlow):
             polling_interval = user_input.get(
                 CONF_POLLING_INTERVAL, DEFAULT_POLLING_INTERVAL
             )
+            # the defaults are raised to the polling interval, so intervals set before there was an upper
+            # bound remain valid
+            max_polling_interval = user_input.get(
+                CONF_MAX_POLLING_INTERVAL,
+                max(polling_interval, DEFAULT_MAX_POLLING_INTERVAL),
+            )
+            idle_polling_interval = user_input.get(
+                CONF_IDLE_POLLING_INTERVAL,
+                max(max_polling_interval, DEFAULT_IDLE_POLLING_INTERVAL),
+            )
             password = user_input.get(CONF_UPDATE_PASSWORD, None)
 
-            if polling_interval < 5:
-                errors[CONF_POLLING_INTERVAL] = "invalid_polling_interval"
-
-            if password:
-                email = self.config_entry.data[CONF_EMAIL]
-                # noinspection PyBroadException
-                try:
-                    client = AerogardenClient(
-                        HOST,
-                        email,
-                        password,
-                    )
-                    await client.login()
-                    _ = await client.get_user_devices()
-                except AerogardenApiConnectError:
-                    errors[CONF_UPDATE_PASSWORD] = "cannot_connect"
-                except AerogardenApiAuthError:
-                    errors[CONF_UPDATE_PASSWORD] = "invalid_auth"
-                except Exception:  # pylint: disable=broad-except
-                    _LOGGER.exception("Unexpected exception")
-                    errors[CONF_UPDATE_PASSWORD] = "unknown"
+            errors = validate_polling_intervals(
+                polling_interval, max_polling_interval, idle_polling_interval
+            )
+
+            coordinator: AerogardenDataUpdateCoordinator = self.hass.data[DOMAIN][
+                self.config_entry.entry_id
+            ]
+            if password and not errors:
+                error = await async_update_password(coordinator, password)
+                if error is not None:
+                    errors[CONF_UPDATE_PASSWORD] = error
 
             if not len(errors):
                 new_data = self.config_entry.data.copy()
                 new_data[CONF_POLLING_INTERVAL] = polling_interval
-                new_data[CONF_PASSWORD] = password
+                new_data[CONF_MAX_POLLING_INTERVAL] = max_polling_interval
+                new_data[CONF_IDLE_POLLING_INTERVAL] = idle_polling_interval
+                if password:
+                    new_data[CONF_PASSWORD] = password
 
                 self.hass.config_entries.async_update_entry(
                     self.config_entry,
                     data=new_data,
                 )
 
-                coordinator: AerogardenDataUpdateCoordinator = self.hass.data[DOMAIN][
-                    self.config_entry.entry_id
-                ]
-                coordinator.update_interval = timedelta(seconds=polling_interval)
+                coordinator.set_polling_bounds(
+                    polling_interval, max_polling_interval, idle_polling_interval
+                )
 
-                _LOGGER.info("Polling Interval changed to %s seconds", polling_interval)
-                if password:
-                    return await self.async_step_notify_restart()
+                _LOGGER.info(
+                    "Polling Interval changed to between %s and %s seconds",
+                    polling_interval,
+                    max_polling_interval,
+                )
                 return self.async_create_entry(title="", data={})
 
-        cur_value = (
-            int(self.config_entry.data[CONF_POLLING_INTERVAL])
-            if CONF_POLLING_INTERVAL in self.config_entry.data
-            and self.config_entry.data[CONF_POLLING_INTERVAL] is not None
-            else DEFAULT_POLLING_INTERVAL
+        cur_value = self.__get_current_interval(
+            CONF_POLLING_INTERVAL, DEFAULT_POLLING_INTERVAL
+        )
+        cur_max_value = self.__get_current_interval(
+            CONF_MAX_POLLING_INTERVAL, max(cur_value, DEFAULT_MAX_POLLING_INTERVAL)
+        )
+        cur_idle_value = self.__get_current_interval(
+            CONF_IDLE_POLLING_INTERVAL,
+            max(cur_max_value, DEFAULT_IDLE_POLLING_INTERVAL),
         )
 
         return self.async_show_form(
@@ -152,20 +265,18 @@ class OptionsFlow(config_entries.OptionsFlow):
             data_schema=vol.Schema(
                 {
                     vol.Optional(CONF_POLLING_INTERVAL, default=cur_value): int,
+                    vol.Optional(CONF_MAX_POLLING_INTERVAL, default=cur_max_value): int,
+                    vol.Optional(
+                        CONF_IDLE_POLLING_INTERVAL, default=cur_idle_value
+                    ): int,
                     vol.Optional(CONF_UPDATE_PASSWORD): str,
                 }
             ),
             errors=errors,
         )
 
-    async def async_step_notify_restart(self):
-        return self.async_show_menu(
-            step_id="notify_restart", menu_options=["restart_yes", "restart_no"]
-        )
-
-    async def async_step_restart_yes(self, _):
-        await self.hass.services.async_call("homeassistant", "restart")
-        return self.async_create_entry(title="", data={})
+    def __get_current_interval(self, key: str, default: int) -> int:
+        if self.config_entry.data.get(key) is None:
+            return default
 
-    async def async_step_restart_no(self, _):
-        return self.async_create_entry(title="", data={})
+        return int(self.config_entry.data[key])
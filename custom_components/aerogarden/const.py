@@ -3,14 +3,24 @@ from homeassistant.const import Platform
 
 MANUFACTURER = "Aerogarden"
 DOMAIN = "aerogarden"
-PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR]
+PLATFORMS = [
+    Platform.SENSOR,
+    Platform.BINARY_SENSOR,
+    Platform.LIGHT,
+    Platform.NUMBER,
+    Platform.SWITCH,
+]
 USER_AGENT_VERSION = "1.0.0"
 HOST = "https://app4.aerogarden.com"
 
 CONF_POLLING_INTERVAL = "polling_interval"
+CONF_MAX_POLLING_INTERVAL = "max_polling_interval"
+CONF_IDLE_POLLING_INTERVAL = "idle_polling_interval"
 CONF_UPDATE_PASSWORD = "update_password"
 
 DEFAULT_POLLING_INTERVAL = 30
+DEFAULT_MAX_POLLING_INTERVAL = 300
+DEFAULT_IDLE_POLLING_INTERVAL = 1800
 
 GARDEN_KEY_USER_ID = "userID"
 GARDEN_KEY_CONFIG_ID = "configID"
@@ -21,6 +31,7 @@ GARDEN_KEY_LIGHT_TEMP = "lightTemp"
 GARDEN_KEY_LIGHT_STAT = "lightStat"
 GARDEN_KEY_PLANT_CONFIG = "plantConfig"
 GARDEN_KEY_PLANTED_DAY = "plantedDay"
+GARDEN_KEY_TOTAL_DAY = "totalDay"
 GARDEN_KEY_NUTRI_REMIND_DAY = "nutriRemindDay"
 GARDEN_KEY_PUMP_LEVEL = "pumpLevel"
 GARDEN_KEY_PUMP_STAT = "pumpStat"
@@ -29,6 +40,26 @@ GARDEN_KEY_NUTRI_STATUS = "nutriStatus"
 GARDEN_KEY_HW_VERSION = "hwVersion"
 GARDEN_KEY_SW_VERSION = "swVersion"
 GARDEN_KEY_GARDEN_TYPE = "gardenType"
+GARDEN_KEY_LIGHT_CYCLE = "lightCycle"
+GARDEN_KEY_PUMP_CYCLE = "pumpCycle"
+GARDEN_KEY_CLOCK = "clock"
+GARDEN_KEY_TIMEZONE = "timezone"
+GARDEN_KEY_LIGHT_DIMMING = "lightDimming"
+GARDEN_KEY_VACATION_MODE = "vacationMode"
+GARDEN_KEY_PUMP_SAFETY_MODE = "pumpSafetyMode"
 
 GARDEN_KEY_EMAIL = "mail"
 GARDEN_KEY_PASSWORD = "userPwd"
+GARDEN_KEY_CLIENT_IP = "clientIP"
+GARDEN_KEY_SSID = "bwConnectedSsid"
+
+# Fields redacted from payloads before they are written to the log
+GARDEN_KEYS_REDACTED = {
+    GARDEN_KEY_EMAIL,
+    GARDEN_KEY_PASSWORD,
+    GARDEN_KEY_CLIENT_IP,
+    GARDEN_KEY_SSID,
+}
+
+SERVICE_DUMP_PAYLOAD = "dump_payload"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
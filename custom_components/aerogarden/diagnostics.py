@@ -0,0 +1,42 @@
+"""Diagnostics support for the Aerogarden integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.aerogarden import AerogardenDataUpdateCoordinator
+
+from .const import DOMAIN, HOST
+from .hub import DATA_HUBS
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    hub = hass.data[DOMAIN].get(DATA_HUBS, {}).get(HOST)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "aerogarden": coordinator.aerogarden.get_diagnostics(),
+        "hub": hub.get_diagnostics() if hub is not None else None,
+        "refresh": coordinator.refresh_slot.get_diagnostics()
+        if coordinator.refresh_slot is not None
+        else None,
+        "polling": {
+            "interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None,
+            "tiers": {
+                str(config_id): tier
+                for config_id, tier in coordinator.polling_tiers.items()
+            },
+        },
+    }
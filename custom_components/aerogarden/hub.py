@@ -0,0 +1,269 @@
+"""Resources shared between config entries connecting to the same Aerogarden host."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .breaker import RateLimiter
+from .client import AerogardenApiConnectError
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HUBS = "hubs"
+DATA_VALIDATED_LOGINS = "validated_logins"
+
+# Seconds between the polls of entries on different accounts, so they don't all hit the api at once
+STAGGER_STEP = 5
+STAGGER_WINDOW = 30
+
+# How long a fetched device list is shared with other entries logged into the same account
+SHARED_FETCH_MAX_AGE = 10
+
+# How long the login and device list fetched while validating a config flow may be used to set up its entry
+VALIDATED_LOGIN_MAX_AGE = 60
+
+# Limits applied across every entry for a host, so a large number of accounts can't burst the api into rate limiting
+MAX_CONCURRENT_REFRESHES = 4
+MAX_REQUESTS_PER_SECOND = 2
+REQUEST_BURST = 4
+
+
+class RefreshSlot:
+    """An entry's place in the hub's refresh schedule, recording how long its refreshes wait and take"""
+
+    def __init__(self, semaphore: asyncio.Semaphore, poll_offset: int) -> None:
+        self._semaphore = semaphore
+        self.poll_offset = poll_offset
+
+        self.refreshes = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    @asynccontextmanager
+    async def async_acquire(self) -> AsyncIterator[None]:
+        """Wait for a refresh to be allowed to run alongside those of other entries"""
+        queued_at = time.monotonic()
+        async with self._semaphore:
+            started_at = time.monotonic()
+            try:
+                yield
+            finally:
+                self.__record(started_at - queued_at, time.monotonic() - started_at)
+
+    def __record(self, wait: float, latency: float):
+        self.refreshes += 1
+        self.last_wait = wait
+        self.max_wait = max(self.max_wait, wait)
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    def get_diagnostics(self) -> dict:
+        """Returns refresh timings to include in config entry diagnostics"""
+        return {
+            "poll_offset": self.poll_offset,
+            "refreshes": self.refreshes,
+            "last_wait": round(self.last_wait, 3),
+            "max_wait": round(self.max_wait, 3),
+            "last_latency": round(self.last_latency, 3),
+            "max_latency": round(self.max_latency, 3),
+            "average_latency": round(self._total_latency / self.refreshes, 3)
+            if self.refreshes
+            else None,
+        }
+
+
+class AerogardenHub:
+    """Shares a connection pool between all config entries for a host, staggers their polls, limits how many
+    refresh at once and how fast requests are sent, and shares device fetches between entries logged into the
+    same account"""
+
+    def __init__(self, hass: HomeAssistant, host: str) -> None:
+        self._hass = hass
+        self._host = host
+        self._session = async_get_clientsession(hass)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REFRESHES)
+        self._rate_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND, REQUEST_BURST)
+
+        # entries are grouped by account, so entries sharing an account poll together and can share a fetch
+        self._entry_groups: dict[str, int | str] = {}
+        self._group_slots: dict[int | str, int] = {}
+        self._refresh_slots: dict[str, RefreshSlot] = {}
+
+        self._in_flight: dict[int, asyncio.Future[list]] = {}
+        self._fetched: dict[int, tuple[float, list]] = {}
+        # bumped by every write to an account, so a fetch that started before a write isn't shared after it
+        self._writes: dict[int, int] = {}
+        self.fetches = 0
+        self.shared_fetches = 0
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._entry_groups)
+
+    def register(self, entry_id: str, user_id: int) -> RefreshSlot:
+        """Register a config entry with the hub, returning its place in the refresh schedule. An entry registered
+        before its first login is registered again once it knows its account, moving its existing place in the
+        schedule to the one shared by that account's entries"""
+        group = user_id if user_id > 0 else entry_id
+        refresh_slot = self._refresh_slots.get(entry_id)
+        if self._entry_groups.get(entry_id, group) != group:
+            self.unregister(entry_id)
+        self._entry_groups[entry_id] = group
+
+        slot = self._group_slots.get(group)
+        if slot is None:
+            used = set(self._group_slots.values())
+            slot = next(index for index in range(len(used) + 1) if index not in used)
+            self._group_slots[group] = slot
+
+        poll_offset = (slot * STAGGER_STEP) % STAGGER_WINDOW
+        if refresh_slot is None:
+            refresh_slot = RefreshSlot(self._semaphore, poll_offset)
+        else:
+            refresh_slot.poll_offset = poll_offset
+        self._refresh_slots[entry_id] = refresh_slot
+        return refresh_slot
+
+    def unregister(self, entry_id: str):
+        """Remove a config entry from the hub, freeing its poll slot if no other entry shares it"""
+        self._refresh_slots.pop(entry_id, None)
+        group = self._entry_groups.pop(entry_id, None)
+        if group is not None and group not in self._entry_groups.values():
+            self._group_slots.pop(group, None)
+            if isinstance(group, int):
+                self._fetched.pop(group, None)
+                self._writes.pop(group, None)
+
+    def invalidate_user_devices(self, user_id: int):
+        """Forget the device list fetched for an account once one of its gardens was written to, so the refresh
+        that follows the write fetches the written state instead of sharing one fetched before it
+        """
+        self._fetched.pop(user_id, None)
+        self._in_flight.pop(user_id, None)
+        self._writes[user_id] = self._writes.get(user_id, 0) + 1
+
+    async def async_get_user_devices(
+        self, user_id: int, fetch: Callable[[], Awaitable[list]]
+    ) -> list:
+        """Returns the device list for an account, joining a fetch already in flight or reusing one that just
+        completed for another entry logged into the same account"""
+        fetched = self._fetched.get(user_id)
+        if fetched is not None and time.monotonic() - fetched[0] < SHARED_FETCH_MAX_AGE:
+            self.shared_fetches += 1
+            return fetched[1]
+
+        in_flight = self._in_flight.get(user_id)
+        if in_flight is not None:
+            self.shared_fetches += 1
+            return await asyncio.shield(in_flight)
+
+        future: asyncio.Future[list] = self._hass.loop.create_future()
+        self._in_flight[user_id] = future
+        writes = self._writes.get(user_id, 0)
+        self.fetches += 1
+        try:
+            devices = await fetch()
+        except (Exception, asyncio.CancelledError) as ex:
+            if isinstance(ex, asyncio.CancelledError):
+                # entries that joined this fetch shouldn't be cancelled along with the one that started it
+                ex = AerogardenApiConnectError("Shared device fetch was cancelled.")
+            future.set_exception(ex)
+            # retrieved here so a fetch nobody else joined doesn't log an unhandled exception
+            future.exception()
+            raise
+        else:
+            future.set_result(devices)
+            if self._writes.get(user_id, 0) == writes:
+                self._fetched[user_id] = (time.monotonic(), devices)
+            return devices
+        finally:
+            # a write may have replaced this fetch with a newer one
+            if self._in_flight.get(user_id) is future:
+                del self._in_flight[user_id]
+
+    def get_diagnostics(self) -> dict:
+        """Returns runtime statistics to include in config entry diagnostics"""
+        return {
+            "entry_count": self.entry_count,
+            "fetches": self.fetches,
+            "shared_fetches": self.shared_fetches,
+        }
+
+
+def async_get_hub(hass: HomeAssistant, host: str) -> AerogardenHub:
+    """Returns the hub for the given host, creating it if this is the first entry to use it"""
+    hubs: dict[str, AerogardenHub] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_HUBS, {}
+    )
+    hub = hubs.get(host)
+    if hub is None:
+        _LOGGER.debug("Creating hub for %s", host)
+        hub = hubs[host] = AerogardenHub(hass, host)
+
+    return hub
+
+
+def async_cache_validated_login(
+    hass: HomeAssistant, unique_id: str, user_id: int, devices: list
+):
+    """Hold on to the session and device list a config flow validated with, so setting up its entry doesn't
+    log in and fetch again"""
+    logins: dict[str, tuple[float, int, list]] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_VALIDATED_LOGINS, {})
+    now = time.monotonic()
+    for key, login in list(logins.items()):
+        if now - login[0] >= VALIDATED_LOGIN_MAX_AGE:
+            del logins[key]
+
+    logins[unique_id] = (now, user_id, devices)
+
+
+def async_pop_validated_login(
+    hass: HomeAssistant, unique_id: str | None
+) -> tuple[int, list] | None:
+    """Returns the user id and device list cached for an entry by its config flow, if they are still fresh"""
+    logins: dict[str, tuple[float, int, list]] = hass.data.get(DOMAIN, {}).get(
+        DATA_VALIDATED_LOGINS, {}
+    )
+    login = logins.pop(unique_id, None) if unique_id is not None else None
+    if login is None or time.monotonic() - login[0] >= VALIDATED_LOGIN_MAX_AGE:
+        return None
+
+    return login[1], login[2]
+
+
+def async_release_hub(hass: HomeAssistant, host: str, entry_id: str):
+    """Unregister a config entry from the hub for the given host, discarding the hub once no entries use it"""
+    hubs: dict[str, AerogardenHub] = hass.data.get(DOMAIN, {}).get(DATA_HUBS, {})
+    hub = hubs.get(host)
+    if hub is None:
+        return
+
+    hub.unregister(entry_id)
+    if hub.entry_count == 0:
+        del hubs[host]
@@ -0,0 +1,67 @@
+from typing import Any
+
+from homeassistant.components.light import (
+    ColorMode,
+    LightEntity,
+    LightEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from custom_components.aerogarden import (
+    AerogardenControlEntity,
+    AerogardenDataUpdateCoordinator,
+)
+
+from .const import DOMAIN, GARDEN_KEY_LIGHT_STAT
+
+LIGHT_DESCRIPTION = LightEntityDescription(
+    key=GARDEN_KEY_LIGHT_STAT,
+    icon="mdi:lightbulb",
+    translation_key="grow_light",
+)
+
+
+class AerogardenLight(AerogardenControlEntity, LightEntity):
+    """Grow light of a garden. Brightness is controlled separately, by the light dimming number entity."""
+
+    _attr_color_mode = ColorMode.ONOFF
+    _attr_supported_color_modes = {ColorMode.ONOFF}
+
+    def __init__(
+        self,
+        coordinator: AerogardenDataUpdateCoordinator,
+        description: LightEntityDescription,
+        config_id: int,
+    ) -> None:
+        super().__init__(
+            coordinator, config_id, description.key, (GARDEN_KEY_LIGHT_STAT,)
+        )
+        self.entity_description = description
+
+    @property
+    def is_on(self) -> bool | None:
+        value = self._get_value(GARDEN_KEY_LIGHT_STAT)
+        if value is None:
+            return None
+
+        return bool(value)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self._async_write({GARDEN_KEY_LIGHT_STAT: 1})
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_write({GARDEN_KEY_LIGHT_STAT: 0})
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config: ConfigEntry, add_entities_callback: AddEntitiesCallback
+) -> None:
+    coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][config.entry_id]
+
+    lights = []
+    for config_id in coordinator.aerogarden.get_garden_config_ids():
+        lights.append(AerogardenLight(coordinator, LIGHT_DESCRIPTION, config_id))
+
+    add_entities_callback(lights)
@@ -0,0 +1,92 @@
+"""Request instrumentation for the Aerogarden cloud api."""
+from __future__ import annotations
+
+import math
+from collections import Counter, deque
+
+# Number of recent requests per endpoint that latency percentiles are calculated from
+LATENCY_SAMPLES = 100
+
+
+class EndpointMetrics:
+    """Latency, status and error statistics for requests to a single api endpoint"""
+
+    def __init__(self) -> None:
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Counter[int] = Counter()
+        self.error_types: Counter[str] = Counter()
+        self.api_codes: Counter[int] = Counter()
+
+    def record_request(
+        self, latency: float, status: int | None, error: str | None = None
+    ):
+        """Record a request attempt, with the http status if a response was received and the error if it failed"""
+        self.requests += 1
+        self._latencies.append(latency)
+        if status is not None:
+            self.status_codes[status] += 1
+        if error is not None:
+            self.errors += 1
+            self.error_types[error] += 1
+
+    def record_api_code(self, code: int):
+        """Record the code returned in an api response document"""
+        self.api_codes[code] += 1
+
+    def get_percentile(self, percentile: float) -> float | None:
+        """Returns the given percentile of recent latencies in seconds, or None if there are none yet"""
+        if not self._latencies:
+            return None
+
+        latencies = sorted(self._latencies)
+        rank = math.ceil(percentile / 100 * len(latencies))
+        return latencies[max(0, rank - 1)]
+
+    def get_max(self) -> float | None:
+        """Returns the highest recent latency in seconds, or None if there are none yet"""
+        return max(self._latencies, default=None)
+
+    def get_diagnostics(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency": {
+                "p50": self.get_percentile(50),
+                "p95": self.get_percentile(95),
+                "max": self.get_max(),
+            },
+            "status_codes": {str(k): v for k, v in self.status_codes.items()},
+            "error_types": dict(self.error_types),
+            "api_codes": {str(k): v for k, v in self.api_codes.items()},
+        }
+
+
+class ApiMetrics:
+    """Request statistics for each api endpoint called by a client"""
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, EndpointMetrics] = {}
+
+    def get(self, endpoint: str) -> EndpointMetrics | None:
+        """Returns the statistics for an endpoint, or None if it hasn't been called yet"""
+        return self._endpoints.get(endpoint)
+
+    def get_or_create(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics()
+
+        return metrics
+
+    @property
+    def errors(self) -> int:
+        """Total failed requests across every endpoint"""
+        return sum(metrics.errors for metrics in self._endpoints.values())
+
+    def get_diagnostics(self) -> dict:
+        return {
+            endpoint: metrics.get_diagnostics()
+            for endpoint, metrics in self._endpoints.items()
+        }
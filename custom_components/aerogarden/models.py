@@ -0,0 +1,176 @@
+"""Data models for the Aerogarden integration."""
+from __future__ import annotations
+
+import base64
+
+from .const import (
+    GARDEN_KEY_AIR_GUID,
+    GARDEN_KEY_CHOOSE_GARDEN,
+    GARDEN_KEY_CLOCK,
+    GARDEN_KEY_CONFIG_ID,
+    GARDEN_KEY_GARDEN_TYPE,
+    GARDEN_KEY_HW_VERSION,
+    GARDEN_KEY_LIGHT_CYCLE,
+    GARDEN_KEY_LIGHT_DIMMING,
+    GARDEN_KEY_LIGHT_STAT,
+    GARDEN_KEY_LIGHT_TEMP,
+    GARDEN_KEY_NUTRI_REMIND_DAY,
+    GARDEN_KEY_NUTRI_STATUS,
+    GARDEN_KEY_PLANTED_DAY,
+    GARDEN_KEY_PLANTED_NAME,
+    GARDEN_KEY_PUMP_CYCLE,
+    GARDEN_KEY_PUMP_HYDRO,
+    GARDEN_KEY_PUMP_LEVEL,
+    GARDEN_KEY_PUMP_SAFETY_MODE,
+    GARDEN_KEY_PUMP_STAT,
+    GARDEN_KEY_SW_VERSION,
+    GARDEN_KEY_TIMEZONE,
+    GARDEN_KEY_TOTAL_DAY,
+    GARDEN_KEY_VACATION_MODE,
+)
+
+# Maps api payload keys to the GardenState attribute they are parsed into
+GARDEN_STATE_FIELDS = {
+    GARDEN_KEY_CONFIG_ID: "config_id",
+    GARDEN_KEY_AIR_GUID: "air_guid",
+    GARDEN_KEY_CHOOSE_GARDEN: "choose_garden",
+    GARDEN_KEY_PLANTED_NAME: "planted_name",
+    GARDEN_KEY_GARDEN_TYPE: "garden_type",
+    GARDEN_KEY_HW_VERSION: "hw_version",
+    GARDEN_KEY_SW_VERSION: "sw_version",
+    GARDEN_KEY_LIGHT_TEMP: "light_temp",
+    GARDEN_KEY_LIGHT_STAT: "light_stat",
+    GARDEN_KEY_PLANTED_DAY: "planted_day",
+    GARDEN_KEY_TOTAL_DAY: "total_day",
+    GARDEN_KEY_NUTRI_REMIND_DAY: "nutri_remind_day",
+    GARDEN_KEY_NUTRI_STATUS: "nutri_status",
+    GARDEN_KEY_PUMP_LEVEL: "pump_level",
+    GARDEN_KEY_PUMP_STAT: "pump_stat",
+    GARDEN_KEY_PUMP_HYDRO: "pump_hydro",
+    GARDEN_KEY_LIGHT_CYCLE: "light_cycle",
+    GARDEN_KEY_PUMP_CYCLE: "pump_cycle",
+    GARDEN_KEY_CLOCK: "clock",
+    GARDEN_KEY_TIMEZONE: "timezone",
+    GARDEN_KEY_LIGHT_DIMMING: "light_dimming",
+    GARDEN_KEY_VACATION_MODE: "vacation_mode",
+    GARDEN_KEY_PUMP_SAFETY_MODE: "pump_safety_mode",
+}
+
+# Fields read by the integration; everything else in a device payload is discarded before it is persisted
+GARDEN_KEYS_RETAINED = tuple(GARDEN_STATE_FIELDS)
+
+# Fields that change on every poll without the garden changing; they are updated in place rather than treated as a change
+VOLATILE_FIELDS = {GARDEN_KEY_CLOCK}
+FINGERPRINT_FIELDS = tuple(
+    key for key in GARDEN_STATE_FIELDS if key not in VOLATILE_FIELDS
+)
+
+
+def get_device_fingerprint(device: dict) -> int:
+    """Returns a cheap hash of the meaningful fields of a device payload, to detect if a garden changed"""
+    return hash(tuple(device.get(key) for key in FINGERPRINT_FIELDS))
+
+
+class GardenState:
+    """Parsed state of a single garden, retaining only the fields read by the integration"""
+
+    __slots__ = (*GARDEN_STATE_FIELDS.values(), "name", "model")
+
+    config_id: int
+    air_guid: str
+    choose_garden: int
+    planted_name: str | None
+    garden_type: int | None
+    hw_version: str | None
+    sw_version: str | None
+    light_temp: int | None
+    light_stat: int | None
+    planted_day: int | None
+    total_day: int | None
+    nutri_remind_day: int | None
+    nutri_status: int | None
+    pump_level: int | None
+    pump_stat: int | None
+    pump_hydro: int | None
+    light_cycle: str | None
+    pump_cycle: str | None
+    clock: str | None
+    timezone: str | None
+    light_dimming: int | None
+    vacation_mode: int | None
+    pump_safety_mode: int | None
+    name: str | None
+    model: str
+
+    def __init__(self, device: dict, name_cache: GardenNameCache | None = None) -> None:
+        for key, attribute in GARDEN_STATE_FIELDS.items():
+            setattr(self, attribute, device.get(key))
+
+        self.name = (
+            name_cache.get(self.config_id, self.planted_name)
+            if name_cache is not None
+            else decode_garden_name(self.planted_name)
+        )
+        self.model = get_device_model_by_garden_type(self.garden_type)
+
+    def diff(self, other: GardenState) -> set[str]:
+        """Returns the api payload keys whose values differ between this and another state of the same garden"""
+        return {
+            key
+            for key, attribute in GARDEN_STATE_FIELDS.items()
+            if getattr(self, attribute) != getattr(other, attribute)
+        }
+
+    def update_volatile(self, device: dict):
+        """Update the fields that change on every poll, from a payload that is otherwise unchanged"""
+        for key in VOLATILE_FIELDS:
+            setattr(self, GARDEN_STATE_FIELDS[key], device.get(key))
+
+    def get(self, field: str):
+        """Returns the value parsed from the given api payload key, or None if it isn't retained"""
+        attribute = GARDEN_STATE_FIELDS.get(field)
+        if attribute is None:
+            return None
+
+        return getattr(self, attribute)
+
+
+class GardenNameCache:
+    """Memoizes decoded planted names per garden, so a name is only decoded again when the garden is renamed"""
+
+    def __init__(self) -> None:
+        self._names: dict[int, tuple[str | None, str | None]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, config_id: int, planted_name: str | None) -> str | None:
+        """Returns the decoded name for the given garden, decoding only if the raw name has changed"""
+        cached = self._names.get(config_id)
+        if cached is not None and cached[0] == planted_name:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        name = decode_garden_name(planted_name)
+        self._names[config_id] = (planted_name, name)
+        return name
+
+    def retain(self, config_ids):
+        """Forget cached names for gardens that are no longer on the account"""
+        for config_id in self._names.keys() - set(config_ids):
+            del self._names[config_id]
+
+
+def decode_garden_name(planted_name: str | None) -> str | None:
+    if planted_name is None:
+        return None
+
+    return base64.b64decode(planted_name).decode("utf-8")
+
+
+def get_device_model_by_garden_type(garden_type: int | None) -> str:
+    match garden_type:
+        case 5:
+            return "Aerogarden Bounty"
+        case _:
+            return f"Aerogarden Type {garden_type}"
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+
+from homeassistant.components.number import (
+    NumberEntity,
+    NumberEntityDescription,
+    NumberMode,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from custom_components.aerogarden import (
+    AerogardenControlEntity,
+    AerogardenDataUpdateCoordinator,
+)
+
+from .const import DOMAIN, GARDEN_KEY_LIGHT_DIMMING
+
+
+@dataclass
+class AerogardenNumberDescriptionMixin:
+    """Mixin for adding required values to entity descriptions"""
+
+    data_key: str
+
+
+@dataclass
+class AerogardenNumberDescription(
+    NumberEntityDescription, AerogardenNumberDescriptionMixin
+):
+    """Describes Aerogarden Number Entities."""
+
+
+NUMBER_DESCRIPTIONS: list[AerogardenNumberDescription] = [
+    AerogardenNumberDescription(
+        key=GARDEN_KEY_LIGHT_DIMMING,
+        icon="mdi:brightness-6",
+        translation_key="light_dimming",
+        native_min_value=0,
+        native_max_value=100,
+        native_step=1,
+        native_unit_of_measurement=PERCENTAGE,
+        mode=NumberMode.SLIDER,
+        data_key=GARDEN_KEY_LIGHT_DIMMING,
+    ),
+]
+
+
+class AerogardenNumber(AerogardenControlEntity, NumberEntity):
+    entity_description: AerogardenNumberDescription
+
+    def __init__(
+        self,
+        coordinator: AerogardenDataUpdateCoordinator,
+        description: AerogardenNumberDescription,
+        config_id: int,
+    ) -> None:
+        super().__init__(
+            coordinator, config_id, description.key, (description.data_key,)
+        )
+        self.entity_description = description
+
+    @property
+    def native_value(self) -> float | None:
+        return self._get_value(self.entity_description.data_key)
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self._async_write({self.entity_description.data_key: int(value)})
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config: ConfigEntry, add_entities_callback: AddEntitiesCallback
+) -> None:
+    coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][config.entry_id]
+
+    numbers = []
+    for config_id in coordinator.aerogarden.get_garden_config_ids():
+        for description in NUMBER_DESCRIPTIONS:
+            numbers.append(AerogardenNumber(coordinator, description, config_id))
+
+    add_entities_callback(numbers)
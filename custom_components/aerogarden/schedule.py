@@ -0,0 +1,202 @@
+"""Light and pump schedules decoded from Aerogarden cycle settings.
+
+The API reports schedules as hex encoded strings:
+  lightCycle  "08000801" -> light on at 08:00, off at 08:01 (hour, minute, hour, minute)
+  pumpCycle   "00050019" -> pump runs 0x0005 minutes, then rests 0x0019 minutes
+  clock       "0a0006"   -> garden local time of 10:00:06 (hour, minute, second)
+  timezone    "0"        -> garden offset from UTC in hours, used when clock is unavailable
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from enum import StrEnum
+
+from .models import GardenState
+
+SECONDS_PER_DAY = 86400
+
+# Poll slightly after a predicted transition so the cloud has reported it by the time we ask
+TRANSITION_MARGIN = 5
+
+# Gardens that changed within this many seconds are polled as active, even if they would otherwise be idle
+RECENT_CHANGE_WINDOW = 900
+
+
+class PollingTier(StrEnum):
+    ACTIVE = "active"
+    IDLE = "idle"
+
+
+def parse_light_cycle(light_cycle: str | None) -> tuple[int, int] | None:
+    """Returns the (on, off) second of day of the light schedule, or None if it can't be decoded"""
+    values = _parse_hex(light_cycle, 4, 1)
+    if values is None:
+        return None
+
+    on_hour, on_minute, off_hour, off_minute = values
+    if on_hour > 23 or off_hour > 23 or on_minute > 59 or off_minute > 59:
+        return None
+
+    return on_hour * 3600 + on_minute * 60, off_hour * 3600 + off_minute * 60
+
+
+def parse_pump_cycle(pump_cycle: str | None) -> tuple[int, int] | None:
+    """Returns the (running, resting) seconds of the pump cycle, or None if it can't be decoded"""
+    values = _parse_hex(pump_cycle, 2, 2)
+    if values is None:
+        return None
+
+    on_minutes, off_minutes = values
+    return on_minutes * 60, off_minutes * 60
+
+
+def parse_clock(clock: str | None) -> int | None:
+    """Returns the garden local second of day, or None if it can't be decoded"""
+    values = _parse_hex(clock, 3, 1)
+    if values is None:
+        return None
+
+    hour, minute, second = values
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+
+    return hour * 3600 + minute * 60 + second
+
+
+def _parse_hex(value: str | None, count: int, width: int) -> list[int] | None:
+    chars = width * 2
+    if not value or len(value) != count * chars:
+        return None
+
+    try:
+        return [int(value[i : i + chars], 16) for i in range(0, len(value), chars)]
+    except ValueError:
+        return None
+
+
+class GardenSchedule:
+    """Timeline of light and pump transitions for a garden, relative to when it was last polled"""
+
+    def __init__(
+        self,
+        light_window: tuple[int, int] | None,
+        pump_cycle: tuple[int, int] | None,
+        second_of_day: int,
+    ) -> None:
+        self._light_window = light_window
+        self._pump_cycle = pump_cycle
+        self._second_of_day = second_of_day
+
+    @staticmethod
+    def from_garden(garden: GardenState, now: datetime) -> GardenSchedule:
+        """Decode the schedule for a garden, using the given utc time if the garden clock is unavailable"""
+        second_of_day = parse_clock(garden.clock)
+        if second_of_day is None:
+            try:
+                offset = timedelta(hours=float(garden.timezone or 0))
+            except ValueError:
+                offset = timedelta()
+            local = now + offset
+            second_of_day = local.hour * 3600 + local.minute * 60 + local.second
+
+        return GardenSchedule(
+            parse_light_cycle(garden.light_cycle),
+            parse_pump_cycle(garden.pump_cycle),
+            second_of_day,
+        )
+
+    def next_light_transition(self, elapsed: float = 0) -> tuple[float, bool] | None:
+        """Returns the seconds until the light next switches and whether it switches on, or None if it never does"""
+        if self._light_window is None:
+            return None
+
+        on, off = self._light_window
+        if on == off:
+            return None
+
+        now = (self._second_of_day + elapsed) % SECONDS_PER_DAY
+        until_on = (on - now) % SECONDS_PER_DAY or SECONDS_PER_DAY
+        until_off = (off - now) % SECONDS_PER_DAY or SECONDS_PER_DAY
+        return (until_on, True) if until_on < until_off else (until_off, False)
+
+    def next_pump_transition(self, elapsed: float = 0) -> tuple[float, bool] | None:
+        """Returns the seconds until the pump next switches and whether it starts running, or None if it never does"""
+        if self._pump_cycle is None:
+            return None
+
+        running, resting = self._pump_cycle
+        if running == 0 or resting == 0:
+            return None
+
+        position = (self._second_of_day + elapsed) % (running + resting)
+        if position < running:
+            return running - position, False
+
+        return running + resting - position, True
+
+    def next_transition(self, elapsed: float = 0) -> float | None:
+        """Returns the seconds until the light or pump next switches, or None if neither has a schedule"""
+        transitions = [
+            transition[0]
+            for transition in (
+                self.next_light_transition(elapsed),
+                self.next_pump_transition(elapsed),
+            )
+            if transition is not None
+        ]
+        return min(transitions) if transitions else None
+
+
+def get_polling_tier(
+    garden: GardenState, seconds_since_change: float | None
+) -> PollingTier:
+    """Returns how often a garden needs polling. Gardens in vacation mode or at the end of their grow are idle,
+    unless they changed recently. A garden without a schedule that can be decoded is still active, since its
+    light and pump may change at any time."""
+    if seconds_since_change is not None and seconds_since_change < RECENT_CHANGE_WINDOW:
+        return PollingTier.ACTIVE
+
+    if garden.vacation_mode:
+        return PollingTier.IDLE
+
+    if garden.total_day and (garden.planted_day or 0) >= garden.total_day:
+        return PollingTier.IDLE
+
+    return PollingTier.ACTIVE
+
+
+def get_adaptive_polling_interval(
+    gardens: Iterable[GardenState],
+    min_interval: int,
+    max_interval: int,
+    now: datetime,
+    margin: int = TRANSITION_MARGIN,
+    tiers: Mapping[int, PollingTier] | None = None,
+    idle_interval: int | None = None,
+) -> int:
+    """Returns how many seconds to wait before polling again, so the next poll lands just after the
+    soonest predicted transition and steady periods back off towards the upper bound. Idle gardens
+    are left out, and only once every garden is idle does polling back off to the idle interval.
+    """
+    soonest: float | None = None
+    active = False
+    for garden in gardens:
+        if tiers is not None and tiers.get(garden.config_id) == PollingTier.IDLE:
+            continue
+
+        active = True
+        seconds = GardenSchedule.from_garden(garden, now).next_transition()
+        if seconds is not None and (soonest is None or seconds < soonest):
+            soonest = seconds
+
+    # A single device query refreshes every garden, so polling only slows down when none are active
+    if not active and tiers:
+        return max(max_interval, idle_interval or max_interval)
+
+    # Without a schedule to predict from, poll at the configured rate
+    if soonest is None:
+        return min_interval
+
+    return max(min_interval, min(max_interval, math.ceil(soonest) + margin))
@@ -7,24 +7,36 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.aerogarden import (
     AerogardenDataUpdateCoordinator,
     AerogardenEntity,
 )
 from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.breaker import CircuitState
+from custom_components.aerogarden.client import (
+    API_URL_LOGIN,
+    API_URL_QUERY_USER_DEVICE,
+    API_URL_UPDATE_DEVICE_CONFIG,
+    get_endpoint_name,
+)
+from custom_components.aerogarden.models import GardenState
 
 from .const import (
     DOMAIN,
     GARDEN_KEY_NUTRI_REMIND_DAY,
     GARDEN_KEY_PLANTED_DAY,
     GARDEN_KEY_PUMP_LEVEL,
+    MANUFACTURER,
 )
 
 
@@ -32,7 +44,8 @@ from .const import (
 class AerogardenSensorDescriptionMixin:
     """Mixin for adding required values to entity descriptions"""
 
-    value_fn: Callable[[Aerogarden, int], StateType]
+    value_fn: Callable[[GardenState], StateType]
+    data_keys: tuple[str, ...]
 
 
 @dataclass
@@ -42,6 +55,20 @@ class AerogardenSensorDescription(
     """Describes Aerogarden Sensor Entities."""
 
 
+@dataclass
+class AerogardenDiagnosticSensorDescriptionMixin:
+    """Mixin for adding required values to diagnostic entity descriptions"""
+
+    value_fn: Callable[[Aerogarden], StateType]
+
+
+@dataclass
+class AerogardenDiagnosticSensorDescription(
+    SensorEntityDescription, AerogardenDiagnosticSensorDescriptionMixin
+):
+    """Describes Aerogarden Diagnostic Sensor Entities."""
+
+
 WATER_LEVEL_OPTIONS = ["Low", "Medium", "Full"]
 SENSOR_DESCRIPTIONS: list[AerogardenSensorDescription] = [
     AerogardenSensorDescription(
@@ -50,9 +77,8 @@ SENSOR_DESCRIPTIONS: list[AerogardenSensorDescription] = [
         device_class=SensorDeviceClass.DURATION,
         unit_of_measurement=UnitOfTime.DAYS,
         icon="mdi:calendar",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_PLANTED_DAY)
-        ),
+        value_fn=lambda garden: garden.planted_day,
+        data_keys=(GARDEN_KEY_PLANTED_DAY,),
     ),
     AerogardenSensorDescription(
         key=GARDEN_KEY_NUTRI_REMIND_DAY,
@@ -60,9 +86,8 @@ SENSOR_DESCRIPTIONS: list[AerogardenSensorDescription] = [
         device_class=SensorDeviceClass.DURATION,
         unit_of_measurement=UnitOfTime.DAYS,
         icon="mdi:calendar-clock",
-        value_fn=lambda aerogarden, config_id: (
-            aerogarden.get_garden_property(config_id, GARDEN_KEY_NUTRI_REMIND_DAY)
-        ),
+        value_fn=lambda garden: garden.nutri_remind_day,
+        data_keys=(GARDEN_KEY_NUTRI_REMIND_DAY,),
     ),
     AerogardenSensorDescription(
         key=GARDEN_KEY_PUMP_LEVEL,
@@ -70,12 +95,63 @@ SENSOR_DESCRIPTIONS: list[AerogardenSensorDescription] = [
         device_class=SensorDeviceClass.ENUM,
         options=WATER_LEVEL_OPTIONS,
         icon="mdi:water-percent",
-        value_fn=lambda aerogarden, config_id: (
-            WATER_LEVEL_OPTIONS[
-                aerogarden.get_garden_property(config_id, GARDEN_KEY_PUMP_LEVEL)
-            ]
-        ),
+        value_fn=lambda garden: WATER_LEVEL_OPTIONS[garden.pump_level]
+        if garden.pump_level is not None
+        else None,
+        data_keys=(GARDEN_KEY_PUMP_LEVEL,),
+    ),
+]
+
+
+def get_p95_latency_fn(path: str) -> Callable[[Aerogarden], StateType]:
+    """Returns a function reading the 95th percentile latency of an api endpoint, in milliseconds"""
+    endpoint = get_endpoint_name(path)
+
+    def get_p95_latency(aerogarden: Aerogarden) -> StateType:
+        metrics = aerogarden.api_metrics.get(endpoint)
+        latency = metrics.get_percentile(95) if metrics is not None else None
+        return round(latency * 1000) if latency is not None else None
+
+    return get_p95_latency
+
+
+def get_latency_description(
+    key: str, path: str
+) -> AerogardenDiagnosticSensorDescription:
+    return AerogardenDiagnosticSensorDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-outline",
+        value_fn=get_p95_latency_fn(path),
+    )
+
+
+DIAGNOSTIC_SENSOR_DESCRIPTIONS: list[AerogardenDiagnosticSensorDescription] = [
+    AerogardenDiagnosticSensorDescription(
+        key="api_circuit_state",
+        translation_key="api_circuit_state",
+        device_class=SensorDeviceClass.ENUM,
+        options=[state.value for state in CircuitState],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:cloud-alert",
+        value_fn=lambda aerogarden: aerogarden.circuit_state.value,
     ),
+    AerogardenDiagnosticSensorDescription(
+        key="api_errors",
+        translation_key="api_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:alert-circle-outline",
+        value_fn=lambda aerogarden: aerogarden.api_metrics.errors,
+    ),
+    get_latency_description("login_latency", API_URL_LOGIN),
+    get_latency_description("query_latency", API_URL_QUERY_USER_DEVICE),
+    get_latency_description("update_latency", API_URL_UPDATE_DEVICE_CONFIG),
 ]
 
 
@@ -88,12 +164,81 @@ class AerogardenSensor(AerogardenEntity, SensorEntity):
         description: AerogardenSensorDescription,
         config_id: int,
     ) -> None:
-        super().__init__(coordinator, config_id, description.key)
+        super().__init__(coordinator, config_id, description.key, description.data_keys)
         self.entity_description = description
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        return self.entity_description.value_fn(self.aerogarden, self._config_id)
+        garden = self.garden
+        if garden is None:
+            return None
+
+        return self.entity_description.value_fn(garden)
+
+
+class AerogardenDiagnosticSensor(
+    CoordinatorEntity[AerogardenDataUpdateCoordinator], SensorEntity
+):
+    """Reports on the account's connection to the Aerogarden API, rather than on garden data. Belongs to a
+    device for the config entry, since every garden of the account shares the connection.
+    """
+
+    entity_description: AerogardenDiagnosticSensorDescription
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: AerogardenDataUpdateCoordinator,
+        description: AerogardenDiagnosticSensorDescription,
+        config: ConfigEntry,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._entry_id = config.entry_id
+        self._entry_title = config.title
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # refreshes that changed no garden still change the api's latency and errors
+        self.async_on_remove(
+            self.coordinator.async_add_diagnostic_listener(
+                self._handle_coordinator_update
+            )
+        )
+
+    @property
+    def unique_id(self) -> str:
+        """Return the unique ID for this entity."""
+        return f"{DOMAIN}-{self._entry_id}-{self.entity_description.key}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information about the Aerogarden account."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry_id)},
+            name=self._entry_title or None,
+            manufacturer=MANUFACTURER,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def aerogarden(self) -> Aerogarden:
+        """Returns the underlying aerogarden api object from the assigned coordinator"""
+        return self.coordinator.aerogarden
+
+    @property
+    def available(self) -> bool:
+        # Remains available when refreshes fail, since that is when this is most useful
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.aerogarden)
 
 
 async def async_setup_entry(
@@ -106,4 +251,10 @@ async def async_setup_entry(
         for description in SENSOR_DESCRIPTIONS:
             sensors.append(AerogardenSensor(coordinator, description, config_id))
 
+    # the connection is shared by every garden of the account, so it is reported on once per entry
+    for diagnostic_description in DIAGNOSTIC_SENSOR_DESCRIPTIONS:
+        sensors.append(
+            AerogardenDiagnosticSensor(coordinator, diagnostic_description, config)
+        )
+
     add_entities_callback(sensors)
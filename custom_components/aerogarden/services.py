@@ -0,0 +1,79 @@
+"""Services for the Aerogarden integration."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    DOMAIN,
+    GARDEN_KEYS_REDACTED,
+    SERVICE_DUMP_PAYLOAD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DUMP_PAYLOAD_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): str})
+
+
+def async_setup_services(hass: HomeAssistant):
+    """Register the integration's services, if another config entry hasn't already"""
+    if hass.services.has_service(DOMAIN, SERVICE_DUMP_PAYLOAD):
+        return
+
+    async def async_dump_payload(call: ServiceCall) -> ServiceResponse:
+        """Fetch the complete device list for each account and write it to the log, with secrets redacted"""
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        entries = [
+            entry
+            for entry in _get_loaded_entries(hass)
+            if entry_id is None or entry.entry_id == entry_id
+        ]
+        if entry_id is not None and not entries:
+            raise HomeAssistantError(
+                f"Aerogarden config entry {entry_id} is not loaded."
+            )
+
+        payloads = {}
+        for entry in entries:
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            devices = await coordinator.aerogarden.get_raw_devices()
+            payloads[entry.entry_id] = async_redact_data(devices, GARDEN_KEYS_REDACTED)
+            _LOGGER.info(
+                "Device payload for %s: %s", entry.entry_id, payloads[entry.entry_id]
+            )
+
+        return {"payloads": payloads}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_PAYLOAD,
+        async_dump_payload,
+        schema=DUMP_PAYLOAD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant):
+    """Remove the integration's services once the last config entry is unloaded"""
+    if not _get_loaded_entries(hass):
+        hass.services.async_remove(DOMAIN, SERVICE_DUMP_PAYLOAD)
+
+
+def _get_loaded_entries(hass: HomeAssistant) -> list[ConfigEntry]:
+    loaded = hass.data.get(DOMAIN, {})
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id in loaded
+    ]
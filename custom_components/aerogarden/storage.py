@@ -0,0 +1,84 @@
+"""Persistent storage for the Aerogarden integration."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import GARDEN_KEYS_RETAINED
+
+STORAGE_VERSION = 1
+# Delay persisting device snapshots so a write happens at most once per window rather than every poll
+SNAPSHOT_SAVE_DELAY = 300
+SNAPSHOT_VERSION = 2
+
+STORAGE_KEY_SESSION = "session"
+STORAGE_KEY_USER_ID = "user_id"
+STORAGE_KEY_LOGIN_TIME = "login_time"
+STORAGE_KEY_SNAPSHOT = "snapshot"
+STORAGE_KEY_SNAPSHOT_VERSION = "version"
+STORAGE_KEY_SNAPSHOT_DEVICES = "devices"
+
+
+class AerogardenStore:
+    """Persists state for a single config entry across restarts and reloads"""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}", private=True
+        )
+        self._data: dict = {}
+
+    async def async_load(self):
+        """Load previously persisted data from disk"""
+        self._data = await self._store.async_load() or {}
+
+    async def async_remove(self):
+        """Remove all persisted data for this config entry"""
+        self._data = {}
+        await self._store.async_remove()
+
+    def get_user_id(self) -> int:
+        """Returns the user id of the last successful login, or 0 if there is none"""
+        session = self._data.get(STORAGE_KEY_SESSION)
+        if not session:
+            return 0
+
+        return session.get(STORAGE_KEY_USER_ID, 0)
+
+    async def async_save_session(self, user_id: int):
+        """Persist the user id of a successful login"""
+        self._data[STORAGE_KEY_SESSION] = {
+            STORAGE_KEY_USER_ID: user_id,
+            STORAGE_KEY_LOGIN_TIME: time.time(),
+        }
+        await self._store.async_save(self._data)
+
+    async def async_clear_session(self):
+        """Forget a persisted login that is no longer accepted by the API"""
+        if self._data.pop(STORAGE_KEY_SESSION, None) is not None:
+            await self._store.async_save(self._data)
+
+    def get_devices(self) -> list[dict]:
+        """Returns the last persisted device list, or an empty list if there is none or its schema is outdated"""
+        snapshot = self._data.get(STORAGE_KEY_SNAPSHOT)
+        if (
+            not snapshot
+            or snapshot.get(STORAGE_KEY_SNAPSHOT_VERSION) != SNAPSHOT_VERSION
+        ):
+            return []
+
+        return snapshot.get(STORAGE_KEY_SNAPSHOT_DEVICES, [])
+
+    def save_devices(self, devices: list[dict]):
+        """Schedule the given device list to be persisted, retaining only the fields read by the integration"""
+        self._data[STORAGE_KEY_SNAPSHOT] = {
+            STORAGE_KEY_SNAPSHOT_VERSION: SNAPSHOT_VERSION,
+            STORAGE_KEY_SNAPSHOT_DEVICES: [
+                {key: device[key] for key in GARDEN_KEYS_RETAINED if key in device}
+                for device in devices
+            ],
+        }
+        self._store.async_delay_save(lambda: self._data, SNAPSHOT_SAVE_DELAY)
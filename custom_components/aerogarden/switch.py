@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.switch import (
+    SwitchDeviceClass,
+    SwitchEntity,
+    SwitchEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from custom_components.aerogarden import (
+    AerogardenControlEntity,
+    AerogardenDataUpdateCoordinator,
+)
+
+from .const import DOMAIN, GARDEN_KEY_PUMP_SAFETY_MODE, GARDEN_KEY_VACATION_MODE
+
+
+@dataclass
+class AerogardenSwitchDescriptionMixin:
+    """Mixin for adding required values to entity descriptions"""
+
+    data_key: str
+
+
+@dataclass
+class AerogardenSwitchDescription(
+    SwitchEntityDescription, AerogardenSwitchDescriptionMixin
+):
+    """Describes Aerogarden Switch Entities."""
+
+
+SWITCH_DESCRIPTIONS: list[AerogardenSwitchDescription] = [
+    AerogardenSwitchDescription(
+        key=GARDEN_KEY_VACATION_MODE,
+        device_class=SwitchDeviceClass.SWITCH,
+        icon="mdi:airplane",
+        translation_key="vacation_mode",
+        data_key=GARDEN_KEY_VACATION_MODE,
+    ),
+    AerogardenSwitchDescription(
+        key=GARDEN_KEY_PUMP_SAFETY_MODE,
+        device_class=SwitchDeviceClass.SWITCH,
+        icon="mdi:water-pump-off",
+        translation_key="pump_safety_mode",
+        data_key=GARDEN_KEY_PUMP_SAFETY_MODE,
+    ),
+]
+
+
+class AerogardenSwitch(AerogardenControlEntity, SwitchEntity):
+    entity_description: AerogardenSwitchDescription
+
+    def __init__(
+        self,
+        coordinator: AerogardenDataUpdateCoordinator,
+        description: AerogardenSwitchDescription,
+        config_id: int,
+    ) -> None:
+        super().__init__(
+            coordinator, config_id, description.key, (description.data_key,)
+        )
+        self.entity_description = description
+
+    @property
+    def is_on(self) -> bool | None:
+        value = self._get_value(self.entity_description.data_key)
+        if value is None:
+            return None
+
+        return bool(value)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self._async_write({self.entity_description.data_key: 1})
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_write({self.entity_description.data_key: 0})
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config: ConfigEntry, add_entities_callback: AddEntitiesCallback
+) -> None:
+    coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][config.entry_id]
+
+    switches = []
+    for config_id in coordinator.aerogarden.get_garden_config_ids():
+        for description in SWITCH_DESCRIPTIONS:
+            switches.append(AerogardenSwitch(coordinator, description, config_id))
+
+    add_entities_callback(switches)
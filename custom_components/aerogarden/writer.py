@@ -0,0 +1,105 @@
+"""Coalesced writes of garden config changes to the Aerogarden cloud api."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .aerogarden import Aerogarden
+
+_LOGGER = logging.getLogger(__name__)
+
+# Window in which config changes are collected before being written together
+WRITE_COALESCE_DELAY = 1.0
+
+GardenKey = tuple[str, int]
+
+
+class AerogardenWriteQueue:
+    """Collects plant config patches made in quick succession and writes them with a single request per garden,
+    followed by a single refresh"""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        aerogarden: Aerogarden,
+        on_written: Callable[[], Awaitable[None]],
+        delay: float = WRITE_COALESCE_DELAY,
+    ) -> None:
+        self._hass = hass
+        self._aerogarden = aerogarden
+        self._on_written = on_written
+        self._delay = delay
+
+        self._pending: dict[GardenKey, dict] = {}
+        self._waiters: dict[GardenKey, asyncio.Future[None]] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @property
+    def pending_count(self) -> int:
+        """Number of gardens with config changes waiting to be written"""
+        return len(self._pending)
+
+    async def async_update(self, air_guid: str, choose_garden: int, patch: dict):
+        """Queue a plant config patch for a garden, and wait until it has been written.
+        Raises the error of the write if the merged patch could not be applied."""
+        key = (air_guid, choose_garden)
+        self._pending.setdefault(key, {}).update(patch)
+
+        waiter = self._waiters.get(key)
+        if waiter is None:
+            waiter = self._waiters[key] = self._hass.loop.create_future()
+
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, self._delay, self.__handle_flush
+            )
+
+        # shielded, so a caller giving up doesn't cancel a write shared with other callers
+        await asyncio.shield(waiter)
+
+    async def async_flush(self):
+        """Write all queued patches immediately"""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        pending, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, {}
+        if not pending:
+            return
+
+        _LOGGER.debug("Writing config changes for %s gardens", len(pending))
+        results = await asyncio.gather(
+            *(
+                self._aerogarden.update_device_config(air_guid, choose_garden, patch)
+                for (air_guid, choose_garden), patch in pending.items()
+            ),
+            return_exceptions=True,
+        )
+
+        written = False
+        for key, result in zip(pending, results):
+            waiter = waiters[key]
+            if isinstance(result, BaseException):
+                _LOGGER.warning(
+                    "Unable to write config changes for %s: %s", key, result
+                )
+                waiter.set_exception(result)
+                # retrieved here so an abandoned waiter doesn't log an unhandled exception
+                waiter.exception()
+            else:
+                waiter.set_result(None)
+                written = True
+
+        if written:
+            await self._on_written()
+
+    @callback
+    def __handle_flush(self, _now: datetime):
+        self._unsub_flush = None
+        self._hass.async_create_task(self.async_flush())
@@ -0,0 +1,461 @@
+"""Benchmarks of the integration against the local api simulator, without network access.
+
+Runs the real AerogardenClient -> Aerogarden -> coordinator -> entities pipeline against a simulated account,
+the same pipeline with every entity written on every refresh as it was before refreshes were diffed, the device
+payload decode path on its own, and device queries over a pooled session against a new session per query,
+reporting throughput, refresh latency, state writes, connections opened and the memory kept by raw device dicts
+against parsed GardenState objects.
+
+    python -m tests.benchmark
+    python -m tests.benchmark --devices 1,50 --refreshes 100 --latency 0.05 --change-rate 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from unittest.mock import patch
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
+
+from custom_components.aerogarden import (
+    AerogardenDataUpdateCoordinator,
+    AerogardenEntity,
+)
+from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.binary_sensor import (
+    async_setup_entry as async_setup_binary_sensors,
+)
+from custom_components.aerogarden.client import (
+    AerogardenClient,
+    json_loads,
+    project_device,
+)
+from custom_components.aerogarden.const import DOMAIN
+from custom_components.aerogarden.light import async_setup_entry as async_setup_lights
+from custom_components.aerogarden.models import GardenState
+from custom_components.aerogarden.number import (
+    async_setup_entry as async_setup_numbers,
+)
+from custom_components.aerogarden.sensor import AerogardenDiagnosticSensor
+from custom_components.aerogarden.sensor import (
+    async_setup_entry as async_setup_sensors,
+)
+from custom_components.aerogarden.switch import (
+    async_setup_entry as async_setup_switches,
+)
+from tests.simulator import (
+    SIMULATOR_EMAIL,
+    SIMULATOR_PASSWORD,
+    AerogardenSimulator,
+    make_device,
+)
+
+ENTRY_ID = "aerogarden-benchmark"
+PLATFORM_SETUPS = (
+    async_setup_sensors,
+    async_setup_binary_sensors,
+    async_setup_lights,
+    async_setup_numbers,
+    async_setup_switches,
+)
+
+
+class StateWriteCounter:
+    """Stands in for writing to the state machine, counting writes and computing the state each entity would
+    write"""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def patch(self):
+        """Returns a patch replacing state writes of every entity with this counter"""
+        counter = self
+
+        def write_state(entity: Entity):
+            counter.count += 1
+            _ = entity.state, entity.available, entity.extra_state_attributes
+
+        return patch.object(Entity, "async_write_ha_state", write_state)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, round(percentile / 100 * len(ordered)) - 1)]
+
+
+async def _create_entities(
+    hass: HomeAssistant, coordinator: AerogardenDataUpdateCoordinator
+) -> list[AerogardenEntity]:
+    config_entry = ConfigEntry(
+        entry_id=ENTRY_ID,
+        data={CONF_EMAIL: SIMULATOR_EMAIL},
+        domain=DOMAIN,
+        minor_version=0,
+        source="",
+        title="",
+        version=0,
+    )
+
+    entities: list[AerogardenEntity] = []
+    for async_setup in PLATFORM_SETUPS:
+        await async_setup(hass, config_entry, entities.extend)
+
+    return entities
+
+
+async def _refresh(coordinator: AerogardenDataUpdateCoordinator):
+    """A coordinator refresh, without the scheduling and bookkeeping Home Assistant does around it"""
+    coordinator.data = await coordinator._async_update_data()
+    coordinator.last_update_success = True
+    coordinator.async_update_listeners()
+
+
+@contextlib.asynccontextmanager
+async def _pipeline(simulator: AerogardenSimulator):
+    """Yields a coordinator, refreshed once, and the entities of every platform subscribed to it"""
+    aerogarden = Aerogarden(simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+    hass = HomeAssistant("/benchmark")
+    hass.loop = asyncio.get_running_loop()
+    coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30)
+    hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
+
+    await _refresh(coordinator)
+    entities = await _create_entities(hass, coordinator)
+    unsubscribes = [
+        coordinator.async_add_listener(entity._handle_coordinator_update)
+        for entity in entities
+    ] + [
+        coordinator.async_add_diagnostic_listener(entity._handle_coordinator_update)
+        for entity in entities
+        if isinstance(entity, AerogardenDiagnosticSensor)
+    ]
+    try:
+        yield coordinator, entities
+    finally:
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+        await aerogarden.close()
+
+
+@contextlib.contextmanager
+def _without_diffing():
+    """Restores what refreshes did before they were diffed: every entity written on every refresh"""
+    with patch.object(
+        AerogardenDataUpdateCoordinator,
+        "async_update_listeners",
+        DataUpdateCoordinator.async_update_listeners,
+    ), patch.object(
+        AerogardenEntity,
+        "_handle_coordinator_update",
+        CoordinatorEntity._handle_coordinator_update,
+    ):
+        yield
+
+
+async def benchmark_pipeline(
+    device_count: int,
+    refreshes: int,
+    latency: float,
+    error_rate: float,
+    change_rate: float,
+    concurrency: int,
+    state_writes: StateWriteCounter,
+):
+    """Time refreshes through the whole integration, then the request throughput of a single client"""
+    async with AerogardenSimulator(
+        device_count, latency, error_rate, change_rate, seed=device_count
+    ) as simulator:
+        async with _pipeline(simulator) as (coordinator, entities):
+            state_writes.count = 0
+            simulator.requests.clear()
+            timings = []
+            failures = 0
+            started_at = time.perf_counter()
+            for _ in range(refreshes):
+                refresh_started_at = time.perf_counter()
+                try:
+                    await _refresh(coordinator)
+                except Exception:
+                    failures += 1
+                timings.append(time.perf_counter() - refresh_started_at)
+            elapsed = time.perf_counter() - started_at
+            requests = sum(simulator.requests.values())
+            writes = state_writes.count
+
+            # memory is traced in a separate pass, so tracing doesn't inflate the timings above
+            gc.collect()
+            tracemalloc.start()
+            peaks = []
+            for _ in range(min(refreshes, 10)):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                try:
+                    await _refresh(coordinator)
+                except Exception:
+                    continue
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            tracemalloc.stop()
+
+        throughput = await _benchmark_throughput(simulator.host, concurrency, refreshes)
+
+    print(  # noqa: T201
+        f"{device_count:>7} {len(entities):>8} "
+        f"{statistics.median(timings) * 1000:>9.2f} "
+        f"{_percentile(timings, 95) * 1000:>9.2f} "
+        f"{requests / elapsed:>9.1f} {throughput:>10.1f} "
+        f"{writes / refreshes:>9.1f} "
+        f"{(statistics.median(peaks) if peaks else 0) / 1024:>10.1f} "
+        f"{failures:>8}"
+    )
+
+
+async def benchmark_state_writes(
+    device_count: int,
+    refreshes: int,
+    change_rate: float,
+    state_writes: StateWriteCounter,
+):
+    """Count state writes per refresh with every entity written on every refresh, against only the entities
+    whose garden fields changed"""
+    writes = []
+    for diffing in (False, True):
+        async with AerogardenSimulator(
+            device_count, change_rate=change_rate, seed=device_count
+        ) as simulator:
+            with contextlib.nullcontext() if diffing else _without_diffing():
+                async with _pipeline(simulator) as (coordinator, entities):
+                    state_writes.count = 0
+                    for _ in range(refreshes):
+                        await _refresh(coordinator)
+                    writes.append(state_writes.count / refreshes)
+
+    print(  # noqa: T201
+        f"{device_count:>7} {len(entities):>8} {writes[0]:>9.1f} {writes[1]:>9.1f} "
+        f"{(1 - writes[1] / writes[0]) * 100 if writes[0] else 0:>8.1f}%"
+    )
+
+
+async def _benchmark_throughput(host: str, concurrency: int, count: int) -> float:
+    """Returns device queries per second served to a single client with concurrent requests in flight"""
+    client = AerogardenClient(host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+    await client.login()
+    queue: asyncio.Queue[None] = asyncio.Queue()
+    for _ in range(count):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            with contextlib.suppress(Exception):
+                await client.get_user_devices()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    await client.close()
+    return count / elapsed
+
+
+async def benchmark_connections(count: int, latency: float):
+    """Time device queries sent over one pooled session, against a new session for every query"""
+    async with AerogardenSimulator(latency=latency) as simulator:
+        for label, pooled in (("pooled", True), ("per request", False)):
+            timings, connections = await _time_queries(simulator.host, count, pooled)
+            print(  # noqa: T201
+                f"{label:<12} {statistics.median(timings) * 1000:>9.2f} "
+                f"{_percentile(timings, 95) * 1000:>9.2f} {connections:>11}"
+            )
+
+
+async def _time_queries(host: str, count: int, pooled: bool) -> tuple[list[float], int]:
+    """Returns the seconds taken by each of a number of device queries, and the connections opened to send them"""
+    connections = 0
+
+    async def on_connection_create_end(*_args):
+        nonlocal connections
+        connections += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+
+    def create_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(trace_configs=[trace_config])
+
+    session = create_session()
+    client = AerogardenClient(host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD, session)
+    await client.login()
+    connections = 0
+
+    timings = []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        if pooled:
+            await client.get_user_devices()
+        else:
+            # what every request cost before sessions were pooled: a new session, and so a new connection
+            async with create_session() as request_session:
+                request_client = AerogardenClient(
+                    host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD, request_session
+                )
+                request_client.restore_session(client.user_id)
+                await request_client.get_user_devices()
+        timings.append(time.perf_counter() - started_at)
+
+    await session.close()
+    return timings, connections
+
+
+def benchmark_parse(device_count: int, repeat: int):
+    """Time decoding, projecting and parsing a device list payload, and measure the memory kept by the raw
+    device dicts, the projected dicts and the parsed GardenState objects"""
+    payload = json.dumps([make_device(index) for index in range(device_count)]).encode()
+
+    decode = _time(lambda: json_loads(payload), repeat)
+    devices = json_loads(payload)
+    project = _time(lambda: [project_device(device) for device in devices], repeat)
+
+    aerogarden = Aerogarden("http://localhost", SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+    projected = [project_device(device) for device in devices]
+
+    def parse():
+        # forget the previous parse, so every round parses every garden
+        aerogarden._fingerprints = {}
+        aerogarden._data = {}
+        aerogarden._set_devices(projected)
+
+    parse_time = _time(parse, repeat)
+
+    raw_size = _retained(lambda: json_loads(payload))
+    projected_size = _retained(
+        lambda: [project_device(device) for device in json_loads(payload)]
+    )
+    # what the integration keeps between polls, in place of the raw dicts it used to hold on to
+    state_size = _retained(
+        lambda: [GardenState(device) for device in json_loads(payload)]
+    )
+
+    print(  # noqa: T201
+        f"{device_count:>7} {len(payload) / 1024:>10.1f} "
+        f"{decode * 1000:>9.3f} {project * 1000:>9.3f} {parse_time * 1000:>9.3f} "
+        f"{raw_size / 1024:>10.1f} {projected_size / 1024:>10.1f} "
+        f"{state_size / 1024:>11.1f}"
+    )
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    """Returns the median seconds taken by a function"""
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started_at)
+
+    return statistics.median(timings)
+
+
+def _retained(fn: Callable[[], object]) -> int:
+    """Returns the bytes still allocated by the result of a function once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def _parse_counts(value: str) -> list[int]:
+    return [int(count) for count in value.split(",")]
+
+
+async def run(args: argparse.Namespace):
+    print(  # noqa: T201
+        f"Pipeline: {args.refreshes} refreshes, latency {args.latency}s, "
+        f"error rate {args.error_rate}, change rate {args.change_rate}, "
+        f"{args.concurrency} concurrent queries for q/s"
+    )
+    print(  # noqa: T201
+        "gardens entities  p50 (ms)  p95 (ms)     req/s      q/s  "
+        "writes/r  peak (KiB) failures"
+    )
+    state_writes = StateWriteCounter()
+    with patch.object(
+        HomeAssistant, "__init__", return_value=None
+    ), state_writes.patch():
+        for device_count in args.devices:
+            await benchmark_pipeline(
+                device_count,
+                args.refreshes,
+                args.latency,
+                args.error_rate,
+                args.change_rate,
+                args.concurrency,
+                state_writes,
+            )
+
+        print()  # noqa: T201
+        print(  # noqa: T201
+            f"State writes: {args.refreshes} refreshes, "
+            f"change rate {args.change_rate}"
+        )
+        print("gardens entities    before     after  saved")  # noqa: T201
+        for device_count in args.devices:
+            await benchmark_state_writes(
+                device_count, args.refreshes, args.change_rate, state_writes
+            )
+
+    print()  # noqa: T201
+    print(f"Parse: median of {args.repeat} rounds")  # noqa: T201
+    print(  # noqa: T201
+        "gardens payload (KiB) decode (ms) project (ms) parse (ms)  "
+        "raw (KiB) kept (KiB) states (KiB)"
+    )
+    for device_count in args.devices:
+        benchmark_parse(device_count, args.repeat)
+
+    print()  # noqa: T201
+    print(  # noqa: T201
+        f"Connections: {args.refreshes} sequential device queries, "
+        f"latency {args.latency}s"
+    )
+    print("session       p50 (ms)  p95 (ms) connections")  # noqa: T201
+    await benchmark_connections(args.refreshes, args.latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--devices",
+        type=_parse_counts,
+        default=[1, 10, 100, 500],
+        help="comma separated garden counts to benchmark",
+    )
+    parser.add_argument("--refreshes", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
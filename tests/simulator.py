@@ -0,0 +1,213 @@
+"""Local stand-in for the Aerogarden cloud api, serving generated gardens from an aiohttp server.
+
+Used by tests and benchmarks to exercise the real client over http without network access.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import random
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.aerogarden.client import (
+    API_URL_LOGIN,
+    API_URL_QUERY_USER_DEVICE,
+    API_URL_UPDATE_DEVICE_CONFIG,
+    get_endpoint_name,
+)
+from custom_components.aerogarden.const import (
+    GARDEN_KEY_AIR_GUID,
+    GARDEN_KEY_CHOOSE_GARDEN,
+    GARDEN_KEY_CLOCK,
+    GARDEN_KEY_EMAIL,
+    GARDEN_KEY_LIGHT_STAT,
+    GARDEN_KEY_PASSWORD,
+    GARDEN_KEY_PLANT_CONFIG,
+    GARDEN_KEY_PUMP_STAT,
+    GARDEN_KEY_USER_ID,
+)
+
+SIMULATOR_EMAIL = "simulator@unittest.com"
+SIMULATOR_PASSWORD = "hunter2"
+SIMULATOR_USER_ID = 123456
+
+# Fields toggled on the gardens picked to change on a device query
+DEFAULT_CHANGING_FIELDS = (GARDEN_KEY_LIGHT_STAT, GARDEN_KEY_PUMP_STAT)
+
+
+def make_device(index: int) -> dict:
+    """Returns a complete device payload, shaped like those returned by the api, for the garden at an index"""
+    name = base64.b64encode(f"Garden {index}".encode()).decode()
+    # noinspection SpellCheckingInspection
+    return {
+        "configID": 100000 + index,
+        "airGuid": f"12:34:56:78:{index // 256 % 256:02X}:{index % 256:02X}",
+        "lightCycle": "08001400",
+        "pumpCycle": "00050019",
+        "lightTemp": 1,
+        "lightStat": 1,
+        "clock": _get_clock(),
+        "pumpStat": 0,
+        "pumpHydro": 0,
+        "pumpTest": None,
+        "pumpDrain": None,
+        "pumpDrainState": None,
+        "pumpLevel": 1,
+        "pumpRemind4Hour": 0,
+        "gardenType": 5,
+        "plantedType": 10,
+        "plantedName": name,
+        "totalDay": 120,
+        "plantedDay": index % 120,
+        "nutriCycle": 7,
+        "nutriRemindDay": index % 7,
+        "nutriStatus": 0,
+        "alarmAllow": 0,
+        "plantedDate": None,
+        "nutrientDate": None,
+        "updateDate": "2023-08-25T00:27:24",
+        "createDate": None,
+        "swVersion": "MFW-V0.37",
+        "hwVersion": "SW-V1.01",
+        "bwVersion": "HW-V5.0",
+        "oldPlantedDay": index % 120,
+        "deviceID": f"{index:015X}",
+        "deviceIP": f"http://10.10.{index // 256 % 256}.{index % 256}",
+        "chooseGarden": 0,
+        "oldlightCycle": "",
+        "vacationMode": 0,
+        "bwConnectedSsid": "Pretty Fly for a Wifi",
+        "nutriStatusFlag": "0",
+        "nutriStatusDate": "2023-08-23T14:05:02",
+        "remark": None,
+        "imgUrl": None,
+        "timezone": "0",
+        "audioAlarmStat": 0,
+        "audioAlarmCycle": "08001400",
+        "audioAlarmCycleSet": 0,
+        "clientIP": "555.55.55.5",
+        "latlng": None,
+        "lightDimming": 0,
+        "pumpSafetyMode": 0,
+        "lightCycleUpdateDate": None,
+    }
+
+
+def _get_clock() -> str:
+    now = time.gmtime()
+    return f"{now.tm_hour:02x}{now.tm_min:02x}{now.tm_sec:02x}"
+
+
+class AerogardenSimulator:
+    """Serves the login, device query and config update endpoints of the Aerogarden api for generated gardens.
+
+    Each device query advances the garden clocks, and toggles the changing fields of a random share of gardens.
+    Requests can be delayed by a fixed latency, and fail with an http 500 at a given rate.
+    """
+
+    def __init__(
+        self,
+        device_count: int = 1,
+        latency: float = 0,
+        error_rate: float = 0,
+        change_rate: float = 0,
+        changing_fields: Iterable[str] = DEFAULT_CHANGING_FIELDS,
+        seed: int | None = None,
+    ) -> None:
+        self.devices = [make_device(index) for index in range(device_count)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.change_rate = change_rate
+        self.changing_fields = tuple(changing_fields)
+        self.requests: Counter[str] = Counter()
+
+        self._random = random.Random(seed)
+        self._server: TestServer | None = None
+
+        app = web.Application()
+        app.router.add_post(API_URL_LOGIN, self.__handle_login)
+        app.router.add_post(API_URL_QUERY_USER_DEVICE, self.__handle_query)
+        app.router.add_post(API_URL_UPDATE_DEVICE_CONFIG, self.__handle_update)
+        self._app = app
+
+    @property
+    def host(self) -> str:
+        """Base url to create clients with, e.g. http://127.0.0.1:12345"""
+        if self._server is None:
+            raise RuntimeError("Simulator has not been started.")
+
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def start(self):
+        self._server = TestServer(self._app)
+        await self._server.start_server()
+
+    async def close(self):
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    async def __aenter__(self) -> AerogardenSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def __handle_login(self, request: web.Request) -> web.Response:
+        data = await self.__receive(request)
+        if data.get(GARDEN_KEY_EMAIL) != SIMULATOR_EMAIL:
+            return web.json_response({"code": -2, "msg": "User does not exist."})
+        if data.get(GARDEN_KEY_PASSWORD) != SIMULATOR_PASSWORD:
+            return web.json_response({"code": -4, "msg": "Password is incorrect."})
+
+        return web.json_response({"code": SIMULATOR_USER_ID, "msg": "用户登陆成功。"})
+
+    async def __handle_query(self, request: web.Request) -> web.Response:
+        data = await self.__receive(request)
+        if data.get(GARDEN_KEY_USER_ID) != str(SIMULATOR_USER_ID):
+            return web.json_response({"code": -1, "msg": "User is not logged in."})
+
+        self.__advance()
+        return web.json_response(self.devices)
+
+    async def __handle_update(self, request: web.Request) -> web.Response:
+        data = await self.__receive(request)
+        if data.get(GARDEN_KEY_USER_ID) != str(SIMULATOR_USER_ID):
+            return web.json_response({"code": -1, "msg": "User is not logged in."})
+
+        choose_garden = int(data.get(GARDEN_KEY_CHOOSE_GARDEN, -1))
+        for device in self.devices:
+            if (
+                device[GARDEN_KEY_AIR_GUID] == data.get(GARDEN_KEY_AIR_GUID)
+                and device[GARDEN_KEY_CHOOSE_GARDEN] == choose_garden
+            ):
+                device.update(json.loads(data[GARDEN_KEY_PLANT_CONFIG]))
+                return web.json_response({"code": 1, "msg": "Success."})
+
+        return web.json_response({"code": -1, "msg": "Device does not exist."})
+
+    async def __receive(self, request: web.Request):
+        """Count the request, then apply the simulated latency and error rate before it is handled"""
+        self.requests[get_endpoint_name(request.path)] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            raise web.HTTPInternalServerError()
+
+        return await request.post()
+
+    def __advance(self):
+        clock = _get_clock()
+        for device in self.devices:
+            device[GARDEN_KEY_CLOCK] = clock
+            if self.change_rate > 0 and self._random.random() < self.change_rate:
+                for field in self.changing_fields:
+                    value = device.get(field) or 0
+                    device[field] = 1 - value if value in (0, 1) else value + 1
@@ -1,16 +1,29 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from pytest_mock import MockFixture
 from pytest_mock.plugin import MockType
 
 from custom_components.aerogarden.aerogarden import Aerogarden
-from custom_components.aerogarden.client import AerogardenClient
+from custom_components.aerogarden.client import (
+    AerogardenApiAuthError,
+    AerogardenApiConnectError,
+    AerogardenApiCredentialsError,
+    AerogardenApiError,
+    AerogardenClient,
+)
 from custom_components.aerogarden.const import (
     DOMAIN,
     GARDEN_KEY_CONFIG_ID,
     GARDEN_KEY_GARDEN_TYPE,
     MANUFACTURER,
 )
+from custom_components.aerogarden.hub import AerogardenHub
+from custom_components.aerogarden.models import GardenState
 
 HOST = "https://unittest.abcxyz"
 EMAIL = "myemail@unittest.com"
@@ -102,14 +115,6 @@ DEVICES = [
     },
 ]
 
-DATA = {
-    DEVICES[0]["configID"]: DEVICES[0],
-    DEVICES[1]["configID"]: DEVICES[1],
-    DEVICES[2]["configID"]: DEVICES[2],
-    DEVICES[3]["configID"]: DEVICES[3],
-    DEVICES[4]["configID"]: DEVICES[4],
-}
-
 
 @pytest.mark.asyncio
 class TestAerogarden:
@@ -117,7 +122,7 @@ class TestAerogarden:
         """get_garden_config_ids returns ids for all gardens on account"""
 
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
+        aerogarden._set_devices(DEVICES)
 
         ids = aerogarden.get_garden_config_ids()
         assert len(ids) == 5
@@ -140,7 +145,7 @@ class TestAerogarden:
         """get_garden_name returns the unencoded garden name for the config id passed. For a single garden, it should be verbatim"""
 
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
+        aerogarden._set_devices(DEVICES)
 
         name = aerogarden.get_garden_name(CONFIG_ID + 1)
 
@@ -153,16 +158,28 @@ class TestAerogarden:
         """
 
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
+        aerogarden._set_devices(DEVICES)
 
         name = aerogarden.get_garden_name(CONFIG_ID + index)
 
         assert name == f"This Test Shall Pass ({suffix})"
 
+    async def test_set_devices_indexes_garden_halves(self):
+        """gardens sharing an airGuid should be indexed together as halves of a multi-garden"""
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+
+        assert aerogarden._garden_halves["98:34:56:78:10:3F"] == [
+            CONFIG_ID + 2,
+            CONFIG_ID + 3,
+        ]
+        assert aerogarden._garden_halves[MAC_ADDR] == [CONFIG_ID + 4]
+
     @pytest.mark.parametrize(
         "config_id,field,value",
         [
-            (CONFIG_ID + 4, "bwConnectedSsid", "Pretty Fly for a Wifi"),
+            (CONFIG_ID + 4, "hwVersion", "SW-V1.01"),
             (CONFIG_ID + 4, "swVersion", "MFW-V0.37"),
             (CONFIG_ID + 3, "swVersion", "MFW-V0.20"),
         ],
@@ -171,23 +188,163 @@ class TestAerogarden:
         """get_property should return the correct value for the given config_id"""
 
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
+        aerogarden._set_devices(DEVICES)
 
         result = aerogarden.get_garden_property(config_id, field)
         assert value == result
 
     @pytest.mark.parametrize(
         "field, config_id",
-        [(GARDEN_KEY_CONFIG_ID, "232161"), ("MyFakeField", CONFIG_ID)],
+        [
+            (GARDEN_KEY_CONFIG_ID, "232161"),
+            ("MyFakeField", CONFIG_ID),
+            ("bwConnectedSsid", CONFIG_ID + 4),
+        ],
     )
     async def test_get_device_property_returns_null_properly(self, field, config_id):
         """the absence of a value should return None instead of key-error"""
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
+        aerogarden._set_devices(DEVICES)
 
         result = aerogarden.get_garden_property(config_id, field)
         assert result is None
 
+    async def test_set_devices_parses_garden_state(self):
+        """gardens should be parsed once with their name decoded and model resolved up front"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+
+        garden = aerogarden.get_garden(CONFIG_ID + 4)
+
+        assert isinstance(garden, GardenState)
+        assert not hasattr(garden, "__dict__")
+        assert garden.name == "( ͡° ͜ʖ ͡°) Hello there"
+        assert garden.model == "Aerogarden Bounty"
+        assert garden.planted_day == 43
+
+    async def test_has_changed_tracks_changed_fields(self):
+        """only fields that changed between updates should be reported as changed"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+        assert aerogarden.has_changed(CONFIG_ID + 4, ("plantedDay",))
+
+        aerogarden._set_devices(
+            [*DEVICES[:4], {**DEVICES[4], "plantedDay": 44, "updateDate": "now"}]
+        )
+
+        assert aerogarden.has_changed(CONFIG_ID + 4, ("plantedDay",))
+        assert not aerogarden.has_changed(CONFIG_ID + 4, ("pumpLevel",))
+        assert not aerogarden.has_changed(CONFIG_ID, ("plantedDay",))
+
+    async def test_set_devices_unchanged_payload_skipped(self):
+        """when no garden changed meaningfully, parsed states should be kept and nothing reported as changed"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        assert aerogarden._set_devices(DEVICES)
+        garden = aerogarden.get_garden(CONFIG_ID)
+
+        assert not aerogarden._set_devices([{**device} for device in DEVICES])
+        assert aerogarden.get_garden(CONFIG_ID) is garden
+        assert not aerogarden.has_changed(CONFIG_ID, ("plantedDay",))
+
+    async def test_set_devices_volatile_fields_updated_in_place(self):
+        """fields that change every poll should be updated without counting as a change"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+
+        changed = aerogarden._set_devices(
+            [{**DEVICES[0], "clock": "0b0000"}, *DEVICES[1:]]
+        )
+
+        assert not changed
+        garden = aerogarden.get_garden(CONFIG_ID)
+        assert garden is not None
+        assert garden.clock == "0b0000"
+
+    async def test_set_devices_only_changed_gardens_parsed(self):
+        """when one garden changed, the others should keep their parsed states"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+        unchanged = aerogarden.get_garden(CONFIG_ID + 1)
+
+        changed = aerogarden._set_devices(
+            [{**DEVICES[0], "plantedDay": 44}, *DEVICES[1:]]
+        )
+
+        assert changed
+        assert aerogarden.get_garden(CONFIG_ID + 1) is unchanged
+        garden = aerogarden.get_garden(CONFIG_ID)
+        assert garden is not None
+        assert garden.planted_day == 44
+        assert aerogarden.has_changed(CONFIG_ID, ("plantedDay",))
+        assert not aerogarden.has_changed(CONFIG_ID + 1, ("plantedDay",))
+
+    async def test_seconds_since_change_tracked_per_garden(self, mocker: MockFixture):
+        """only gardens that changed meaningfully should have their change time reset"""
+        monotonic = mocker.patch(
+            "custom_components.aerogarden.aerogarden.time"
+        ).monotonic
+        monotonic.return_value = 100
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        assert aerogarden.get_seconds_since_change(CONFIG_ID) is None
+
+        aerogarden._set_devices(DEVICES)
+        monotonic.return_value = 400
+        aerogarden._set_devices([{**DEVICES[0], "plantedDay": 44}, *DEVICES[1:]])
+        monotonic.return_value = 500
+
+        assert aerogarden.get_seconds_since_change(CONFIG_ID) == 100
+        assert aerogarden.get_seconds_since_change(CONFIG_ID + 1) == 400
+
+    async def test_update_counts_skipped_refreshes(self, mocker: MockFixture):
+        """refreshes returning unchanged gardens should be counted as skipped"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mocker.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        await aerogarden.update()
+        await aerogarden.update()
+
+        assert aerogarden.refreshes_processed == 1
+        assert aerogarden.refreshes_skipped == 1
+        assert not aerogarden.last_update_changed
+
+    async def test_update_logs_summary_without_payload(
+        self, mocker: MockFixture, caplog: pytest.LogCaptureFixture
+    ):
+        """the debug log should summarize each refresh, without writing out the payload"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mocker.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        with caplog.at_level(logging.DEBUG, "custom_components.aerogarden.aerogarden"):
+            await aerogarden.update()
+
+        assert "Refreshed 5 gardens" in caplog.text
+        assert str(DEVICES[0]["plantedName"]) not in caplog.text
+
+    async def test_get_raw_devices_not_projected(self, mocker: MockFixture):
+        """raw devices should be fetched without discarding unread fields"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mock_get: MockType = mocker.patch.object(
+            AerogardenClient, "get_user_devices", return_value=DEVICES
+        )
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        result = await aerogarden.get_raw_devices()
+
+        assert result == DEVICES
+        mock_get.assert_called_with(project=False)
+
+    async def test_get_garden_returns_none_for_unknown_garden(self):
+        """asking for a garden that doesn't exist should return None instead of key-error"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(DEVICES)
+
+        assert aerogarden.get_garden(CONFIG_ID - 1) is None
+
     async def test_update_logged_in_should_not_be_called_if_not_necessary(
         self, mocker: MockFixture
     ):
@@ -242,6 +399,344 @@ class TestAerogarden:
         with pytest.raises(UpdateFailed):
             await aerogarden.update()
 
+    async def test_update_devices_fetched_through_hub(self, mocker: MockFixture):
+        """when a hub is provided, devices should be fetched through it so fetches can be shared"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mocker.patch.object(AerogardenClient, "user_id", 42)
+        hub = MagicMock()
+        hub.async_get_user_devices = AsyncMock(return_value=DEVICES)
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, hub=hub)
+        await aerogarden.update()
+
+        hub.async_get_user_devices.assert_awaited_once()
+        assert hub.async_get_user_devices.await_args.args[0] == 42
+        assert len(aerogarden._data) == 5
+
+    async def test_update_after_write_fetches_written_state(self, mocker: MockFixture):
+        """the refresh following a write shouldn't reuse devices the hub fetched before it, even right after a poll"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mocker.patch.object(AerogardenClient, "user_id", 42)
+        mocker.patch.object(AerogardenClient, "update_device_config")
+        get_user_devices = mocker.patch.object(
+            AerogardenClient, "get_user_devices", return_value=DEVICES
+        )
+        mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+        mocker.patch("custom_components.aerogarden.hub.async_get_clientsession")
+        hass = HomeAssistant("/path")
+        hass.loop = asyncio.get_running_loop()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, hub=AerogardenHub(hass, HOST))
+        await aerogarden.update()
+        await aerogarden.update_device_config(MAC_ADDR, 0, {"lightTemp": 1})
+        await aerogarden.update()
+
+        assert get_user_devices.await_count == 2
+
+    async def test_update_device_config_serializes_patch(self, mocker: MockFixture):
+        """a plant config patch should be sent to the api as a json document"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=True)
+        mock_update: MockType = mocker.patch.object(
+            AerogardenClient, "update_device_config"
+        )
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        await aerogarden.update_device_config(
+            MAC_ADDR, 1, {"lightTemp": 0, "lightDimming": 50}
+        )
+
+        mock_update.assert_called_with(
+            MAC_ADDR, 1, '{"lightTemp": 0, "lightDimming": 50}'
+        )
+
+    async def test_update_device_config_logs_in_if_not_logged_in(
+        self, mocker: MockFixture
+    ):
+        """if client is not already logged in, then log in should be called before writing"""
+
+        mocker.patch.object(AerogardenClient, "is_logged_in", return_value=False)
+        mocker.patch.object(AerogardenClient, "update_device_config")
+        mock_login: MockType = mocker.patch.object(AerogardenClient, "login")
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        await aerogarden.update_device_config(MAC_ADDR, 0, {"lightTemp": 1})
+
+        assert mock_login.called
+
+    async def test_async_restore_restores_persisted_session(self):
+        """a persisted user id should be restored onto the client so the first update skips login"""
+        store = MagicMock()
+        store.async_load = AsyncMock()
+        store.get_user_id.return_value = 42
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        await aerogarden.async_restore()
+
+        assert aerogarden._client.is_logged_in()
+        assert aerogarden._client.user_id == 42
+
+    async def test_async_restore_restores_snapshot(self):
+        """a persisted device snapshot should be loaded so entities can be created before the first refresh"""
+        store = MagicMock()
+        store.async_load = AsyncMock()
+        store.get_user_id.return_value = 0
+        store.get_devices.return_value = DEVICES
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        await aerogarden.async_restore()
+
+        assert len(aerogarden.get_garden_config_ids()) == 5
+        assert not aerogarden._client.is_logged_in()
+
+    async def test_update_login_persisted(self, mocker: MockFixture):
+        """a fresh login should be persisted to the store"""
+        mocker.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+        mocker.patch.object(AerogardenClient, "login")
+        store = MagicMock()
+        store.async_save_session = AsyncMock()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        await aerogarden.update()
+
+        store.async_save_session.assert_called()
+        store.save_devices.assert_called_with(DEVICES)
+
+    async def test_async_update_password_logs_in_and_persists_session(
+        self, mocker: MockFixture
+    ):
+        """a new password should be logged in with once, and the new session persisted"""
+        mock_login: MockType = mocker.patch.object(AerogardenClient, "login")
+        store = MagicMock()
+        store.async_save_session = AsyncMock()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        await aerogarden.async_update_password("hunter3")
+
+        mock_login.assert_called_once_with("hunter3")
+        store.async_save_session.assert_called()
+
+    async def test_async_update_password_keeps_session_on_auth_error(
+        self, mocker: MockFixture
+    ):
+        """a rejected password should leave the current session in place"""
+        mocker.patch.object(
+            AerogardenClient, "login", side_effect=AerogardenApiAuthError("unit test")
+        )
+        store = MagicMock()
+        store.async_save_session = AsyncMock()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        aerogarden._client.restore_session(42)
+        with pytest.raises(AerogardenApiAuthError):
+            await aerogarden.async_update_password("wrong")
+
+        assert aerogarden.user_id == 42
+        store.async_save_session.assert_not_called()
+
+    async def test_async_update_password_invalidates_shared_devices(
+        self, mocker: MockFixture
+    ):
+        """the refresh after a password change shouldn't be served devices the hub fetched before it"""
+        mocker.patch.object(AerogardenClient, "login")
+        hub = MagicMock()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, hub=hub)
+        aerogarden._client.restore_session(42)
+        await aerogarden.async_update_password("hunter3")
+
+        hub.invalidate_user_devices.assert_called_once_with(42)
+
+    async def test_update_rejected_restored_session_logs_in_again(
+        self, mocker: MockFixture
+    ):
+        """if a restored session is rejected by the api, log in again and retry the request once"""
+        mocker.patch.object(
+            AerogardenClient,
+            "get_user_devices",
+            side_effect=[AerogardenApiAuthError("unit test"), DEVICES],
+        )
+        mock_login: MockType = mocker.patch.object(AerogardenClient, "login")
+        store = MagicMock()
+        store.async_load = AsyncMock()
+        store.async_save_session = AsyncMock()
+        store.async_clear_session = AsyncMock()
+        store.get_user_id.return_value = 42
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        await aerogarden.async_restore()
+        await aerogarden.update()
+
+        assert mock_login.call_count == 1
+        assert len(aerogarden._data) == 5
+        store.async_clear_session.assert_awaited_once()
+
+    async def test_update_rejected_session_forgotten_when_login_fails(
+        self, mocker: MockFixture
+    ):
+        """a rejected session shouldn't be restored on the next start, even if logging in again failed"""
+        mocker.patch.object(
+            AerogardenClient,
+            "get_user_devices",
+            side_effect=AerogardenApiAuthError("unit test"),
+        )
+        mocker.patch.object(
+            AerogardenClient,
+            "login",
+            side_effect=AerogardenApiConnectError("unit test"),
+        )
+        store = MagicMock()
+        store.async_save_session = AsyncMock()
+        store.async_clear_session = AsyncMock()
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD, store=store)
+        aerogarden._client.restore_session(42)
+        with pytest.raises(UpdateFailed):
+            await aerogarden.update()
+
+        store.async_clear_session.assert_awaited_once()
+        store.async_save_session.assert_not_called()
+
+    async def test_update_burst_on_fresh_client_logs_in_once(self, mocker: MockFixture):
+        """concurrent updates on a client without a session should share a single login"""
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+
+        async def login(_password=None):
+            await asyncio.sleep(0)
+            aerogarden._client.restore_session(42)
+
+        mock_login: MockType = mocker.patch.object(
+            AerogardenClient, "login", side_effect=login
+        )
+        mocker.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+
+        await asyncio.gather(*(aerogarden.update() for _ in range(5)))
+
+        assert mock_login.call_count == 1
+
+    async def test_update_burst_on_expired_session_logs_in_once(
+        self, mocker: MockFixture
+    ):
+        """when concurrent requests find the session expired, a single login should renew it for all of them"""
+        session = {"valid": False}
+
+        async def login(_password=None):
+            await asyncio.sleep(0)
+            session["valid"] = True
+
+        async def get_user_devices(*_args, **_kwargs):
+            await asyncio.sleep(0)
+            if not session["valid"]:
+                raise AerogardenApiAuthError("User session was rejected.")
+            return DEVICES
+
+        mock_login: MockType = mocker.patch.object(
+            AerogardenClient, "login", side_effect=login
+        )
+        mock_get: MockType = mocker.patch.object(
+            AerogardenClient, "get_user_devices", side_effect=get_user_devices
+        )
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._client.restore_session(42)
+        await asyncio.gather(*(aerogarden.update() for _ in range(5)))
+
+        assert mock_login.call_count == 1
+        assert mock_get.call_count == 10
+        assert len(aerogarden._data) == 5
+
+    async def test_update_raises_when_session_rejected_after_login(
+        self, mocker: MockFixture
+    ):
+        """a request should only be retried once after logging in again"""
+        mocker.patch.object(
+            AerogardenClient,
+            "get_user_devices",
+            side_effect=AerogardenApiAuthError("unit test"),
+        )
+        mock_login: MockType = mocker.patch.object(AerogardenClient, "login")
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._client.restore_session(42)
+        with pytest.raises(UpdateFailed):
+            await aerogarden.update()
+
+        assert mock_login.call_count == 1
+
+    async def test_update_rejected_credentials_not_tried_again(
+        self, mocker: MockFixture
+    ):
+        """once the api rejects the credentials, later updates should fail without sending any requests"""
+        mock_login: MockType = mocker.patch.object(
+            AerogardenClient,
+            "login",
+            side_effect=AerogardenApiCredentialsError("unit test"),
+        )
+        mock_get: MockType = mocker.patch.object(AerogardenClient, "get_user_devices")
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        for _ in range(3):
+            with pytest.raises(UpdateFailed) as ex:
+                await aerogarden.update()
+            assert isinstance(ex.value.__cause__, AerogardenApiCredentialsError)
+
+        assert aerogarden.credentials_rejected
+        assert mock_login.call_count == 1
+        mock_get.assert_not_called()
+
+    async def test_update_failed_login_tried_again(self, mocker: MockFixture):
+        """a login failing without rejecting the credentials should be tried again by the next update"""
+        mock_login: MockType = mocker.patch.object(
+            AerogardenClient, "login", side_effect=AerogardenApiAuthError("unit test")
+        )
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        for _ in range(2):
+            with pytest.raises(UpdateFailed):
+                await aerogarden.update()
+
+        assert not aerogarden.credentials_rejected
+        assert mock_login.call_count == 2
+
+    async def test_update_password_clears_rejected_credentials(
+        self, mocker: MockFixture
+    ):
+        """providing a password the api accepts should resume updates"""
+        mocker.patch.object(
+            AerogardenClient,
+            "login",
+            side_effect=[AerogardenApiCredentialsError("unit test"), None],
+        )
+        mocker.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        with pytest.raises(UpdateFailed):
+            await aerogarden.update()
+        aerogarden._client.restore_session(42)
+        await aerogarden.async_update_password("hunter3")
+        await aerogarden.update()
+
+        assert not aerogarden.credentials_rejected
+        assert len(aerogarden._data) == 5
+
+    async def test_update_device_config_retried_after_login(self, mocker: MockFixture):
+        """a write failing on an expired session should be retried once after logging in again"""
+        mock_update: MockType = mocker.patch.object(
+            AerogardenClient,
+            "update_device_config",
+            side_effect=[AerogardenApiError("unit test"), None],
+        )
+        mock_login: MockType = mocker.patch.object(AerogardenClient, "login")
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._client.restore_session(42)
+        await aerogarden.update_device_config(MAC_ADDR, 0, {"lightTemp": 1})
+
+        assert mock_login.call_count == 1
+        assert mock_update.call_count == 2
+
     @pytest.mark.parametrize(
         "garden_type,expected_model",
         [(5, "Aerogarden Bounty"), (3, "Aerogarden Type 3")],
@@ -251,8 +746,9 @@ class TestAerogarden:
     ):
         """getting device returns a model object that contains correct device info for the device registry"""
         aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
-        aerogarden._data = DATA
-        aerogarden._data[CONFIG_ID + 4][GARDEN_KEY_GARDEN_TYPE] = garden_type
+        aerogarden._set_devices(
+            [*DEVICES[:4], {**DEVICES[4], GARDEN_KEY_GARDEN_TYPE: garden_type}]
+        )
 
         device_info = aerogarden.get_device_info(CONFIG_ID + 4)
 
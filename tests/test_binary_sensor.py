@@ -1,3 +1,4 @@
+import time
 from asyncio import Future
 from typing import Union
 from unittest.mock import AsyncMock, MagicMock, NonCallableMagicMock
@@ -13,6 +14,7 @@ from pytest_mock import MockFixture
 from custom_components.aerogarden import AerogardenDataUpdateCoordinator
 from custom_components.aerogarden.aerogarden import Aerogarden
 from custom_components.aerogarden.binary_sensor import (
+    PREDICTION_TIMEOUT,
     AerogardenBinarySensor,
     async_setup_entry,
 )
@@ -36,7 +38,7 @@ DEVICES = [
     {
         "configID": CONFIG_ID,
         "airGuid": "12:34:56:78:10:AB",
-        "lightCycle": "08000801",
+        "lightCycle": "08001400",
         "pumpCycle": "00050019",
         "lightTemp": 1,
         "lightStat": 1,
@@ -120,7 +122,7 @@ def setup(mocker: MockFixture):
     ag_service = Aerogarden(HOST, EMAIL, PASSWORD)
     mocker.patch.object(ag_service, "update", return_value=future)
 
-    ag_service._data = {CONFIG_ID: DEVICES[0]}
+    ag_service._set_devices(DEVICES)
 
     hass = HomeAssistant("/path")
     coordinator = AerogardenDataUpdateCoordinator(hass, ag_service, 10)
@@ -242,3 +244,130 @@ class TestBinarySensor:
         sensor._handle_coordinator_update()
 
         write_ha_mock.assert_called()
+
+    @pytest.mark.parametrize(
+        "field,seconds,new_state",
+        [
+            # 10:00:06 is 6 seconds into a 5 minute on, 25 minute off pump cycle
+            (GARDEN_KEY_PUMP_STAT, 294, False),
+            # the light turned on at 08:00, and turns off at 20:00
+            (GARDEN_KEY_LIGHT_STAT, 10 * 3600 - 6, False),
+        ],
+    )
+    async def test_transition_scheduled_from_garden_cycle(
+        self, mocker: MockFixture, setup, field, seconds, new_state
+    ):
+        """After a refresh, a timer should be set for the next scheduled transition"""
+
+        (hass, _, _, _) = setup
+        call_later = mocker.patch(
+            "custom_components.aerogarden.binary_sensor.async_call_later"
+        )
+        sensor = await self.__execute_and_get_sensor(setup, field)
+        sensor.hass = hass
+        sensor.aerogarden._updated_at = time.monotonic()
+
+        sensor._handle_coordinator_update()
+
+        call_later.assert_called()
+        assert call_later.call_args[0][1] == pytest.approx(seconds, abs=1)
+
+        transition = call_later.call_args[0][2]
+        transition(None)
+        assert sensor.is_on is new_state
+
+    @pytest.mark.parametrize("field", [GARDEN_KEY_PUMP_STAT, GARDEN_KEY_LIGHT_STAT])
+    async def test_transition_not_scheduled_when_polled_state_disagrees(
+        self, mocker: MockFixture, setup, field
+    ):
+        """A garden switched off its schedule by hand shouldn't have the schedule predicted for it"""
+
+        (hass, _, _, _) = setup
+        call_later = mocker.patch(
+            "custom_components.aerogarden.binary_sensor.async_call_later"
+        )
+        sensor = await self.__execute_and_get_sensor(setup, field)
+        sensor.hass = hass
+        sensor.aerogarden._updated_at = time.monotonic()
+        garden = sensor.garden
+        assert garden is not None
+        # both are scheduled to be on at 10:00:06
+        garden.light_stat = 0
+        garden.pump_stat = 0
+
+        sensor._handle_coordinator_update()
+
+        call_later.assert_not_called()
+
+    async def test_transition_not_scheduled_without_schedule(
+        self, mocker: MockFixture, setup
+    ):
+        """Sensors that don't follow a garden schedule shouldn't predict transitions"""
+
+        (hass, _, _, _) = setup
+        call_later = mocker.patch(
+            "custom_components.aerogarden.binary_sensor.async_call_later"
+        )
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PUMP_HYDRO)
+        sensor.hass = hass
+        sensor.aerogarden._updated_at = time.monotonic()
+
+        sensor._handle_coordinator_update()
+
+        call_later.assert_not_called()
+
+    async def test_predicted_state_kept_until_confirmed(
+        self, mocker: MockFixture, setup
+    ):
+        """A predicted state should survive a poll that hasn't caught up with it yet"""
+
+        mocker.patch("custom_components.aerogarden.binary_sensor.async_call_later")
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PUMP_STAT)
+        sensor._predicted_state = False
+        sensor._predicted_at = time.monotonic()
+
+        sensor._handle_coordinator_update()
+
+        assert sensor.is_on is False
+
+    async def test_predicted_state_reverted_after_timeout(
+        self, mocker: MockFixture, setup
+    ):
+        """A predicted state the api never confirms should revert to the polled state"""
+
+        write_ha_mock: MockType
+        (_, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PUMP_STAT)
+        sensor._predicted_state = False
+        sensor._predicted_at = time.monotonic() - PREDICTION_TIMEOUT - 1
+
+        sensor._handle_coordinator_update()
+
+        assert sensor.is_on
+        write_ha_mock.assert_called()
+
+    async def test_predicted_state_expires_without_refresh(
+        self, mocker: MockFixture, setup
+    ):
+        """A predicted state should expire on its own, since unchanged refreshes don't reach the sensor"""
+
+        (hass, _, _, _) = setup
+        call_later = mocker.patch(
+            "custom_components.aerogarden.binary_sensor.async_call_later"
+        )
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PUMP_STAT)
+        sensor.hass = hass
+        sensor.aerogarden._updated_at = time.monotonic()
+        sensor._handle_coordinator_update()
+
+        transition = call_later.call_args[0][2]
+        transition(None)
+        assert sensor.is_on is False
+
+        expiry = next(
+            call[0][2]
+            for call in call_later.call_args_list
+            if call[0][1] == PREDICTION_TIMEOUT
+        )
+        expiry(None)
+        assert sensor.is_on
@@ -0,0 +1,158 @@
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.aerogarden.breaker import (
+    CircuitBreaker,
+    CircuitState,
+    RateLimiter,
+    RetryBudget,
+    get_backoff_delay,
+)
+
+
+def tick(seconds: float):
+    return patch(
+        "custom_components.aerogarden.breaker.time.monotonic", return_value=seconds
+    )
+
+
+class TestCircuitBreaker:
+    def test_closed_allows_requests(self):
+        """A new breaker should allow requests"""
+        breaker = CircuitBreaker()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request()
+        assert breaker.retry_after == 0
+
+    def test_opens_after_failure_threshold(self):
+        """Failures up to the threshold should open the circuit and withhold requests"""
+        breaker = CircuitBreaker(failure_threshold=3, base_delay=30)
+
+        with tick(1000):
+            breaker.record_failure()
+            breaker.record_failure()
+            assert breaker.state == CircuitState.CLOSED
+
+            breaker.record_failure()
+            assert breaker.state == CircuitState.OPEN
+            assert not breaker.allow_request()
+            assert 15 <= breaker.retry_after <= 30
+
+    def test_success_resets_failures(self):
+        """A success should reset the count of consecutive failures"""
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_allows_single_trial(self):
+        """Once the backoff delay has passed, a single trial request should be let through"""
+        breaker = CircuitBreaker(failure_threshold=1, base_delay=30)
+
+        with tick(1000):
+            breaker.record_failure()
+        with tick(1031):
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.allow_request()
+            assert not breaker.allow_request()
+
+    def test_half_open_released_trial_allows_another(self):
+        """A trial request ended without an answer should let another trial through"""
+        breaker = CircuitBreaker(failure_threshold=1, base_delay=30)
+
+        with tick(1000):
+            breaker.record_failure()
+        with tick(1031):
+            breaker.allow_request()
+            breaker.release_trial()
+
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.allow_request()
+            assert not breaker.allow_request()
+
+    def test_half_open_success_closes(self):
+        """A successful trial request should close the circuit"""
+        breaker = CircuitBreaker(failure_threshold=1, base_delay=30)
+
+        with tick(1000):
+            breaker.record_failure()
+        with tick(1031):
+            breaker.allow_request()
+            breaker.record_success()
+
+            assert breaker.state == CircuitState.CLOSED
+            assert breaker.allow_request()
+
+    def test_half_open_failure_reopens_with_longer_delay(self):
+        """A failed trial request should open the circuit again, backing off for longer"""
+        breaker = CircuitBreaker(failure_threshold=1, base_delay=30)
+
+        with tick(1000):
+            breaker.record_failure()
+        with tick(1031):
+            breaker.allow_request()
+            breaker.record_failure()
+
+            assert breaker.state == CircuitState.OPEN
+            assert 30 <= breaker.retry_after <= 60
+
+
+class TestRetryBudget:
+    def test_spend_until_exhausted(self):
+        """Retries should be allowed until the budget is spent"""
+        budget = RetryBudget(max_tokens=2)
+
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+    def test_deposit_earns_back_tokens(self):
+        """Successful requests should earn back a fraction of a retry, up to the maximum"""
+        budget = RetryBudget(max_tokens=1, token_ratio=0.5)
+        budget.try_spend()
+
+        budget.deposit()
+        assert not budget.try_spend()
+
+        budget.deposit()
+        budget.deposit()
+        assert budget.tokens == 1
+        assert budget.try_spend()
+
+
+class TestRateLimiter:
+    def test_burst_allowed_then_spaced(self):
+        """Requests up to the burst should be sent immediately, then spaced at the configured rate"""
+        limiter = RateLimiter(rate=2, burst=2)
+
+        with tick(1000):
+            assert limiter.reserve() == 0
+            assert limiter.reserve() == 0
+            assert limiter.reserve() == 0.5
+            assert limiter.reserve() == 1
+
+    def test_idle_time_restores_burst(self):
+        """Once idle for long enough, a full burst should be allowed again"""
+        limiter = RateLimiter(rate=2, burst=2)
+
+        with tick(1000):
+            for _ in range(4):
+                limiter.reserve()
+        with tick(1010):
+            assert limiter.reserve() == 0
+            assert limiter.reserve() == 0
+            assert limiter.reserve() == 0.5
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 2, 5, 10])
+def test_get_backoff_delay_within_bounds(attempt):
+    """Backoff should grow exponentially, be capped, and jitter within the upper half of the delay"""
+    delay = min(60, 2 * 2**attempt)
+
+    for _ in range(20):
+        assert delay / 2 <= get_backoff_delay(attempt, 2, 60) <= delay
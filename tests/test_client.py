@@ -1,15 +1,24 @@
+import asyncio
+from unittest.mock import ANY, AsyncMock
+
+import aiohttp
 import pytest
 from aioresponses import aioresponses
+from pytest_mock import MockFixture
 
+from custom_components.aerogarden.breaker import CircuitBreaker, CircuitState
 from custom_components.aerogarden.client import (
     API_URL_LOGIN,
     API_URL_QUERY_USER_DEVICE,
     API_URL_UPDATE_DEVICE_CONFIG,
     AerogardenApiAuthError,
+    AerogardenApiCircuitOpenError,
     AerogardenApiConnectError,
+    AerogardenApiCredentialsError,
     AerogardenApiError,
     AerogardenClient,
 )
+from custom_components.aerogarden.models import GARDEN_KEYS_RETAINED
 
 HOST = "https://unittest.abcxyz"
 EMAIL = "myemail@unittest.com"
@@ -81,6 +90,11 @@ DEVICES_PAYLOAD = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def no_retry_delay(mocker: MockFixture):
+    mocker.patch("custom_components.aerogarden.client.RETRY_BASE_DELAY", 0)
+
+
 @pytest.mark.asyncio
 class TestClient:
     async def test_is_logged_in_returns_false_if_not_logged_in(self):
@@ -112,6 +126,31 @@ class TestClient:
 
             assert client._user_id > 0
 
+    async def test_login_with_new_password_kept_only_on_success(self):
+        """A new password should replace the current one only once it has logged in"""
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": -4, "msg": "Password is incorrect."},
+            )
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": USER_ID, "msg": "用户登陆成功。"},
+            )
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            with pytest.raises(AerogardenApiAuthError):
+                await client.login("wrong")
+            assert client._password == PASSWORD
+
+            await client.login("hunter3")
+
+            assert client._password == "hunter3"
+            assert client.user_id == USER_ID
+
     @pytest.mark.parametrize("status_code", [400, 401, 403, 404, 500])
     async def test_login_api_connect_error_raised_on_http_error(self, status_code):
         """When login is called and returns a non-successful status code, connect error should be raised"""
@@ -130,9 +169,33 @@ class TestClient:
             with pytest.raises(AerogardenApiConnectError):
                 await client.login()
 
-    @pytest.mark.parametrize("code", [-4, -2, -1])
-    async def test_login_api_auth_error_on_failed_login(self, code):
-        """When login is called and returns a non-successful status code, connect error should be raised"""
+    async def test_login_api_connect_error_raised_on_undecodable_response(self):
+        """When login returns a body that isn't json, e.g. a proxy's error page, connect error should be raised"""
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                body="<html><body>Bad Gateway</body></html>",
+                repeat=True,
+            )
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            with pytest.raises(AerogardenApiConnectError):
+                await client.login()
+
+            login = client.metrics.get("Login")
+            assert login is not None
+            assert login.errors == login.requests
+
+    @pytest.mark.parametrize(
+        "code,credentials_rejected", [(-4, True), (-2, True), (-1, False)]
+    )
+    async def test_login_api_auth_error_on_failed_login(
+        self, code, credentials_rejected
+    ):
+        """When login is called and returns a non-successful status code, auth error should be raised, telling
+        apart invalid credentials from other failures"""
 
         with aioresponses() as mocked:
             mocked.post(
@@ -142,9 +205,14 @@ class TestClient:
             )
 
             client = AerogardenClient(HOST, EMAIL, PASSWORD)
-            with pytest.raises(AerogardenApiAuthError):
+            with pytest.raises(AerogardenApiAuthError) as ex:
                 await client.login()
 
+            assert (
+                isinstance(ex.value, AerogardenApiCredentialsError)
+                == credentials_rejected
+            )
+
     async def test_get_user_devices_returns_user_devices(self):
         """When logged in, user devices should return a list of user devices"""
         client = AerogardenClient(HOST, EMAIL, PASSWORD)
@@ -162,6 +230,47 @@ class TestClient:
             assert result is not None
             assert result[0]["configID"] == 987654
 
+    async def test_get_user_devices_projects_unread_fields(self):
+        """Fields not read by the integration should be discarded from the device list"""
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client._user_id = USER_ID
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_QUERY_USER_DEVICE}",
+                status=200,
+                payload=DEVICES_PAYLOAD,
+            )
+
+            result = await client.get_user_devices()
+
+            assert set(result[0]) == set(GARDEN_KEYS_RETAINED)
+            assert "clientIP" not in result[0]
+            assert result[0]["plantedDay"] == 43
+
+    async def test_get_user_devices_auth_error_on_rejected_session(self):
+        """When the api responds with an error code instead of a device list, the session was rejected"""
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client.restore_session(USER_ID)
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_QUERY_USER_DEVICE}",
+                status=200,
+                payload={"code": -1, "msg": "Unit Test"},
+            )
+
+            with pytest.raises(AerogardenApiAuthError):
+                await client.get_user_devices()
+
+    async def test_restore_session_logs_in_client(self):
+        """A restored user id should be used without calling login"""
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client.restore_session(USER_ID)
+
+        assert client.is_logged_in() is True
+        assert client.user_id == USER_ID
+
     async def test_get_user_devices_connect_error_on_not_logged_in(self):
         """When not logged in, get user devices should throw a connect error"""
         client = AerogardenClient(HOST, EMAIL, PASSWORD)
@@ -191,6 +300,7 @@ class TestClient:
                     "chooseGarden": CHOOSE_GARDEN,
                     "plantConfig": PLANT_CONFIG,
                 },
+                headers=ANY,
             )
 
     async def test_update_device_config_connect_error_on_not_logged_in(self):
@@ -214,3 +324,176 @@ class TestClient:
 
             with pytest.raises(AerogardenApiError):
                 await client.update_device_config(AIR_GUID, CHOOSE_GARDEN, PLANT_CONFIG)
+
+    async def test_session_reused_across_requests(self):
+        """Subsequent requests should reuse the same pooled session instead of creating a new one each call"""
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client._user_id = USER_ID
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_QUERY_USER_DEVICE}",
+                status=200,
+                payload=DEVICES_PAYLOAD,
+                repeat=True,
+            )
+
+            await client.get_user_devices()
+            session = client._session
+            await client.get_user_devices()
+
+            assert session is not None
+            assert client._session is session
+
+        await client.close()
+
+    async def test_close_closes_owned_session(self):
+        """A session created by the client should be closed and released when the client is closed"""
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client._user_id = USER_ID
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_QUERY_USER_DEVICE}",
+                status=200,
+                payload=DEVICES_PAYLOAD,
+            )
+            await client.get_user_devices()
+
+        session = client._session
+        assert session is not None
+        await client.close()
+
+        assert session.closed
+        assert client._session is None
+
+    async def test_close_does_not_close_shared_session(self):
+        """A session provided by the caller is shared, and should be left open when the client is closed"""
+        session = aiohttp.ClientSession()
+        client = AerogardenClient(HOST, EMAIL, PASSWORD, session)
+
+        await client.close()
+
+        assert not session.closed
+        await session.close()
+
+    async def test_request_retried_after_connect_error(self):
+        """A request that fails to connect should be retried before an error is raised"""
+
+        with aioresponses() as mocked:
+            mocked.post(f"{HOST}{API_URL_LOGIN}", status=500)
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": USER_ID, "msg": "用户登陆成功。"},
+            )
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            await client.login()
+
+            assert client.user_id == USER_ID
+            assert client.circuit_state == "closed"
+
+    async def test_retries_limited_by_retry_budget(self):
+        """Requests should not be retried once the retry budget has been spent"""
+
+        with aioresponses() as mocked:
+            mocked.post(f"{HOST}{API_URL_LOGIN}", status=500)
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": USER_ID, "msg": "用户登陆成功。"},
+            )
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            client._retry_budget._tokens = 0
+            with pytest.raises(AerogardenApiConnectError):
+                await client.login()
+
+    async def test_circuit_opens_after_repeated_failures(self):
+        """Once requests have repeatedly failed, further requests should be withheld without calling the api"""
+
+        with aioresponses() as mocked:
+            mocked.post(f"{HOST}{API_URL_LOGIN}", status=500, repeat=True)
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            for _ in range(3):
+                with pytest.raises(AerogardenApiConnectError):
+                    await client.login()
+
+            assert client.circuit_state == "open"
+            assert client.retry_after > 0
+
+            calls = sum(len(requests) for requests in mocked.requests.values())
+            with pytest.raises(AerogardenApiCircuitOpenError):
+                await client.login()
+
+            assert sum(len(requests) for requests in mocked.requests.values()) == calls
+
+    @pytest.mark.parametrize(
+        "error", [asyncio.CancelledError(), ValueError("unit test"), KeyError("code")]
+    )
+    async def test_circuit_trial_released_when_ended_without_an_answer(
+        self, mocker: MockFixture, error
+    ):
+        """A trial request that was cancelled, or failed other than by reaching the api, shouldn't hold the
+        circuit half open"""
+
+        mocker.patch.object(
+            AerogardenClient, "_AerogardenClient__send", side_effect=error
+        )
+        client = AerogardenClient(HOST, EMAIL, PASSWORD)
+        client._breaker = CircuitBreaker(failure_threshold=1, base_delay=0)
+        client._breaker.record_failure()
+
+        for _ in range(2):
+            with pytest.raises(type(error)):
+                await client.login()
+
+            assert client.circuit_state == CircuitState.HALF_OPEN
+
+    async def test_requests_wait_for_rate_limiter(self):
+        """A shared rate limiter should be waited on before each request is sent"""
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": USER_ID, "msg": "用户登陆成功。"},
+            )
+
+            rate_limiter = AsyncMock()
+            client = AerogardenClient(HOST, EMAIL, PASSWORD, rate_limiter=rate_limiter)
+            await client.login()
+
+            rate_limiter.async_acquire.assert_awaited_once()
+
+    async def test_request_metrics_recorded(self):
+        """Latency, status and api codes should be recorded for each endpoint"""
+
+        with aioresponses() as mocked:
+            mocked.post(
+                f"{HOST}{API_URL_LOGIN}",
+                status=200,
+                payload={"code": USER_ID, "msg": "用户登陆成功。"},
+            )
+            mocked.post(f"{HOST}{API_URL_QUERY_USER_DEVICE}", status=500, repeat=True)
+
+            client = AerogardenClient(HOST, EMAIL, PASSWORD)
+            await client.login()
+            with pytest.raises(AerogardenApiConnectError):
+                await client.get_user_devices()
+
+            login = client.metrics.get("Login")
+            assert login is not None
+            assert login.requests == 1
+            assert login.errors == 0
+            assert login.status_codes == {200: 1}
+            assert login.api_codes == {USER_ID: 1}
+            assert login.get_percentile(95) is not None
+
+            query = client.metrics.get("QueryUserDevice")
+            assert query is not None
+            assert query.errors == query.requests
+            assert query.error_types["HTTP 500"] == query.requests
+            assert client.metrics.errors == query.errors
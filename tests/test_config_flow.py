@@ -1,7 +1,7 @@
 import asyncio
 from asyncio import Future
 from datetime import timedelta
-from unittest.mock import ANY, MagicMock
+from unittest.mock import ANY, AsyncMock, MagicMock
 
 import pytest
 import voluptuous as vol
@@ -10,6 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_HOST, CONF_PASSWORD
 from homeassistant.core import HomeAssistant, ServiceRegistry
 from pytest_mock import MockFixture
+from pytest_mock.plugin import MockType
 
 from custom_components.aerogarden import AerogardenDataUpdateCoordinator
 from custom_components.aerogarden.aerogarden import Aerogarden
@@ -21,15 +22,21 @@ from custom_components.aerogarden.client import (
 )
 from custom_components.aerogarden.config_flow import (
     CONFIG_SCHEMA,
+    REAUTH_SCHEMA,
     ConfigFlow,
     OptionsFlow,
 )
 from custom_components.aerogarden.const import (
+    CONF_IDLE_POLLING_INTERVAL,
+    CONF_MAX_POLLING_INTERVAL,
     CONF_POLLING_INTERVAL,
     CONF_UPDATE_PASSWORD,
+    DEFAULT_IDLE_POLLING_INTERVAL,
+    DEFAULT_MAX_POLLING_INTERVAL,
     DEFAULT_POLLING_INTERVAL,
     DOMAIN,
 )
+from custom_components.aerogarden.hub import async_pop_validated_login
 
 HOST = "https://unittest.abcxyz"
 EMAIL = "myemail@unittest.com"
@@ -37,6 +44,7 @@ PASSWORD = "hunter2"
 ENTRY_ID = f"aerogarden-{EMAIL}"
 
 USER_INPUT = {CONF_HOST: HOST, CONF_EMAIL: EMAIL, CONF_PASSWORD: PASSWORD}
+DEVICES = [{"configID": 1}]
 
 
 @pytest.fixture
@@ -65,6 +73,7 @@ def setup_mocks(mocker: MockFixture):
     )
 
     async_call = mocker.patch.object(ServiceRegistry, "async_call")
+    mocker.patch.object(AerogardenDataUpdateCoordinator, "async_request_refresh")
 
     options_flow = OptionsFlow(config_entry)
     options_flow.hass = hass
@@ -95,6 +104,7 @@ def setup(mocker: MockFixture):
 
     mocker.patch.object(config_entries.ConfigFlow, "async_show_form")
     mocker.patch.object(config_entries.ConfigFlow, "async_create_entry")
+    mocker.patch.object(config_entries.ConfigFlow, "async_abort")
     mocker.patch.object(config_entries.ConfigFlow, "async_set_unique_id")
     mocker.patch.object(config_entries.ConfigFlow, "_abort_if_unique_id_configured")
     mocker.patch.object(AerogardenClient, "login", return_value=future)
@@ -156,15 +166,102 @@ class TestConfigFlow:
         )
         flow.async_create_entry.assert_not_called()
 
-    async def test_async_step_user_config_entry_created_on_success(self, setup):
+    async def test_async_step_user_config_entry_created_on_success(
+        self, setup, setup_mocks
+    ):
         """If client successfully logs in and gets data, then commit the config"""
+        (hass, _, _, _) = setup_mocks
 
         flow = ConfigFlow()
+        flow.hass = hass
         await flow.async_step_user(USER_INPUT)
 
         flow.async_create_entry.assert_called()
         flow.async_show_form.assert_not_called()
 
+    async def test_async_step_user_validated_login_handed_to_setup(
+        self, setup, setup_mocks
+    ):
+        """The login and devices fetched to validate the account should be cached for the entry's setup"""
+        setup.patch.object(AerogardenClient, "get_user_devices", return_value=DEVICES)
+        setup.patch.object(
+            AerogardenClient,
+            "user_id",
+            new_callable=setup.PropertyMock,
+            return_value=42,
+        )
+        (hass, _, _, _) = setup_mocks
+
+        flow = ConfigFlow()
+        flow.hass = hass
+        await flow.async_step_user(USER_INPUT)
+
+        assert async_pop_validated_login(hass, ENTRY_ID) == (42, DEVICES)
+
+    async def test_async_step_reauth_form_shown(self, setup, setup_mocks):
+        """When the api rejects an entry's credentials, ask for a new password"""
+        (hass, _, config_entry, _) = setup_mocks
+        hass.config_entries = MagicMock()
+        hass.config_entries.async_get_entry.return_value = config_entry
+        mock_login: MockType = setup.patch.object(AerogardenClient, "login")
+
+        flow = ConfigFlow()
+        flow.hass = hass
+        flow.context = {"entry_id": ENTRY_ID}
+        await flow.async_step_reauth(config_entry.data)
+
+        flow.async_show_form.assert_called_with(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            description_placeholders={"email": "unittest@ha.com"},
+            errors={},
+        )
+        mock_login.assert_not_called()
+
+    async def test_async_step_reauth_form_reshown_on_auth_error(
+        self, setup, setup_mocks
+    ):
+        """When the new password is also rejected, reshow the form with error message"""
+        setup.patch.object(
+            AerogardenClient, "login", side_effect=AerogardenApiAuthError
+        )
+        (hass, _, config_entry, _) = setup_mocks
+        hass.config_entries = MagicMock()
+
+        flow = ConfigFlow()
+        flow.hass = hass
+        flow._reauth_entry = config_entry
+        await flow.async_step_reauth_confirm({CONF_PASSWORD: "hunter3"})
+
+        flow.async_show_form.assert_called_with(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            description_placeholders={"email": "unittest@ha.com"},
+            errors={"base": "invalid_auth"},
+        )
+        hass.config_entries.async_update_entry.assert_not_called()
+        flow.async_abort.assert_not_called()
+
+    async def test_async_step_reauth_entry_reloaded_on_success(
+        self, setup, setup_mocks
+    ):
+        """When the new password is accepted, save it and reload the entry to resume polling"""
+        (hass, _, config_entry, _) = setup_mocks
+        hass.config_entries = MagicMock()
+        hass.config_entries.async_reload = AsyncMock()
+
+        flow = ConfigFlow()
+        flow.hass = hass
+        flow._reauth_entry = config_entry
+        await flow.async_step_reauth_confirm({CONF_PASSWORD: "hunter3"})
+
+        hass.config_entries.async_update_entry.assert_called_with(
+            config_entry,
+            data={CONF_EMAIL: "unittest@ha.com", CONF_PASSWORD: "hunter3"},
+        )
+        hass.config_entries.async_reload.assert_awaited_once_with(ENTRY_ID)
+        flow.async_abort.assert_called_with(reason="reauth_successful")
+
     @pytest.mark.parametrize("user_input", [5, 600, DEFAULT_POLLING_INTERVAL])
     async def test_options_flow_handler_update_config_and_data_coordinator(
         self, setup_options_flow, user_input, setup_mocks
@@ -181,6 +278,46 @@ class TestConfigFlow:
 
         assert coordinator.update_interval == timedelta(seconds=user_input)
 
+    async def test_options_flow_handler_show_form_with_error_max_polling_interval(
+        self, setup_options_flow, setup_mocks
+    ):
+        """If provided max polling interval is less than the polling interval, show form with error"""
+
+        (_, _, _, flow) = setup_mocks
+        await flow.async_step_init(
+            {CONF_POLLING_INTERVAL: 60, CONF_MAX_POLLING_INTERVAL: 30}
+        )
+
+        flow.async_show_form.assert_called_with(
+            step_id="init",
+            data_schema=ANY,
+            errors={CONF_MAX_POLLING_INTERVAL: "invalid_max_polling_interval"},
+        )
+        flow.hass.config_entries.async_update_entry.assert_not_called()
+        flow.async_create_entry.assert_not_called()
+
+    async def test_options_flow_handler_show_form_with_error_idle_polling_interval(
+        self, setup_options_flow, setup_mocks
+    ):
+        """If provided idle polling interval is less than the max polling interval, show form with error"""
+
+        (_, _, _, flow) = setup_mocks
+        await flow.async_step_init(
+            {
+                CONF_POLLING_INTERVAL: 60,
+                CONF_MAX_POLLING_INTERVAL: 600,
+                CONF_IDLE_POLLING_INTERVAL: 300,
+            }
+        )
+
+        flow.async_show_form.assert_called_with(
+            step_id="init",
+            data_schema=ANY,
+            errors={CONF_IDLE_POLLING_INTERVAL: "invalid_idle_polling_interval"},
+        )
+        flow.hass.config_entries.async_update_entry.assert_not_called()
+        flow.async_create_entry.assert_not_called()
+
     async def test_async_get_options_flow_returns_options_flow(self):
         """options flow returned from static method"""
         config_entry = ConfigEntry(
@@ -225,6 +362,14 @@ class TestConfigFlow:
                     vol.Optional(
                         CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL
                     ): int,
+                    vol.Optional(
+                        CONF_MAX_POLLING_INTERVAL,
+                        default=DEFAULT_MAX_POLLING_INTERVAL,
+                    ): int,
+                    vol.Optional(
+                        CONF_IDLE_POLLING_INTERVAL,
+                        default=DEFAULT_IDLE_POLLING_INTERVAL,
+                    ): int,
                     vol.Optional(CONF_UPDATE_PASSWORD): str,
                 }
             ),
@@ -232,6 +377,33 @@ class TestConfigFlow:
         )
         flow.async_create_entry.assert_not_called()
 
+    async def test_options_flow_handler_show_form_bounds_raised_to_polling_interval(
+        self, setup_options_flow
+    ):
+        """An entry polling less often than the default upper bound should be offered bounds it can save"""
+
+        config_entry = ConfigEntry(
+            entry_id=ENTRY_ID,
+            data={CONF_POLLING_INTERVAL: 3600},
+            domain=DOMAIN,
+            minor_version=0,
+            source="",
+            title="",
+            version=0,
+        )
+
+        flow = OptionsFlow(config_entry)
+        await flow.async_step_init()
+
+        schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+        defaults = {
+            str(key): key.default()
+            for key in schema
+            if key.default is not vol.UNDEFINED
+        }
+        assert defaults[CONF_MAX_POLLING_INTERVAL] == 3600
+        assert defaults[CONF_IDLE_POLLING_INTERVAL] == 3600
+
     async def test_options_flow_handler_show_form_uninitialized(
         self, setup_options_flow
     ):
@@ -256,6 +428,14 @@ class TestConfigFlow:
                     vol.Optional(
                         CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL
                     ): int,
+                    vol.Optional(
+                        CONF_MAX_POLLING_INTERVAL,
+                        default=DEFAULT_MAX_POLLING_INTERVAL,
+                    ): int,
+                    vol.Optional(
+                        CONF_IDLE_POLLING_INTERVAL,
+                        default=DEFAULT_IDLE_POLLING_INTERVAL,
+                    ): int,
                     vol.Optional(CONF_UPDATE_PASSWORD): str,
                 }
             ),
@@ -279,6 +459,14 @@ class TestConfigFlow:
                     vol.Optional(
                         CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL
                     ): int,
+                    vol.Optional(
+                        CONF_MAX_POLLING_INTERVAL,
+                        default=DEFAULT_MAX_POLLING_INTERVAL,
+                    ): int,
+                    vol.Optional(
+                        CONF_IDLE_POLLING_INTERVAL,
+                        default=DEFAULT_IDLE_POLLING_INTERVAL,
+                    ): int,
                     vol.Optional(CONF_UPDATE_PASSWORD): str,
                 }
             ),
@@ -317,6 +505,14 @@ class TestConfigFlow:
                     vol.Optional(
                         CONF_POLLING_INTERVAL, default=DEFAULT_POLLING_INTERVAL
                     ): int,
+                    vol.Optional(
+                        CONF_MAX_POLLING_INTERVAL,
+                        default=DEFAULT_MAX_POLLING_INTERVAL,
+                    ): int,
+                    vol.Optional(
+                        CONF_IDLE_POLLING_INTERVAL,
+                        default=DEFAULT_IDLE_POLLING_INTERVAL,
+                    ): int,
                     vol.Optional(CONF_UPDATE_PASSWORD): str,
                 }
             ),
@@ -325,20 +521,47 @@ class TestConfigFlow:
         flow.hass.config_entries.async_update_entry.assert_not_called()
         flow.async_create_entry.assert_not_called()
 
-    async def test_options_flow_handler_update_password_restart_dialog_shown(
+    async def test_options_flow_handler_update_password_applied_live(
         self, setup_options_flow, setup, setup_mocks
     ):
-        """If provided password is not valid, show form with error"""
+        """A new password should be logged in with by the running client and refreshed, without a restart"""
+
+        flow: OptionsFlow
+        coordinator: AerogardenDataUpdateCoordinator
+        (_, coordinator, _, flow) = setup_mocks
+        coordinator.last_update_success = True
+        mock_login: MockType = setup.patch.object(AerogardenClient, "login")
+
+        await flow.async_step_init({CONF_UPDATE_PASSWORD: "hunter3"})
+
+        mock_login.assert_called_once_with("hunter3")
+        coordinator.async_request_refresh.assert_awaited_once()
+        assert coordinator.last_update_success
+        flow.hass.services.async_call.assert_not_called()
+        flow.async_show_menu.assert_not_called()
+        flow.async_create_entry.assert_called_once()
+
+    async def test_options_flow_handler_password_not_changed_without_input(
+        self, setup_options_flow, setup, setup_mocks
+    ):
+        """Changing only the polling intervals should leave the password alone"""
 
         flow: OptionsFlow
         (_, _, _, flow) = setup_mocks
+        mock_login: MockType = setup.patch.object(AerogardenClient, "login")
 
-        await flow.async_step_init({CONF_UPDATE_PASSWORD: "hunter2"})
+        await flow.async_step_init({CONF_POLLING_INTERVAL: 10})
 
-        flow.async_show_menu.assert_called_with(
-            step_id="notify_restart", menu_options=["restart_yes", "restart_no"]
+        mock_login.assert_not_called()
+        flow.hass.config_entries.async_update_entry.assert_called_with(
+            ANY,
+            data={
+                CONF_EMAIL: "unittest@ha.com",
+                CONF_POLLING_INTERVAL: 10,
+                CONF_MAX_POLLING_INTERVAL: DEFAULT_MAX_POLLING_INTERVAL,
+                CONF_IDLE_POLLING_INTERVAL: DEFAULT_IDLE_POLLING_INTERVAL,
+            },
         )
-        flow.async_create_entry.assert_not_called()
 
     async def test_options_flow_handler_update_values_set_on_config(
         self, setup_options_flow, setup, setup_mocks
@@ -357,27 +580,9 @@ class TestConfigFlow:
             data={
                 CONF_EMAIL: "unittest@ha.com",
                 CONF_POLLING_INTERVAL: 10,
+                CONF_MAX_POLLING_INTERVAL: DEFAULT_MAX_POLLING_INTERVAL,
+                CONF_IDLE_POLLING_INTERVAL: DEFAULT_IDLE_POLLING_INTERVAL,
                 CONF_PASSWORD: "hunter2",
             },
         )
-        flow.async_create_entry.assert_not_called()
-
-    async def test_restart_yes_sends_restart_signal(
-        self, setup_options_flow, setup, setup_mocks
-    ):
-        """The signal for restarting home assistant is called when user selects Restart Now"""
-        flow: OptionsFlow
-        (_, _, _, flow) = setup_mocks
-
-        await flow.async_step_restart_yes(None)
-        flow.hass.services.async_call.assert_called_with("homeassistant", "restart")
-
-    async def test_restart_no_does_not_send_restart_signal(
-        self, setup_options_flow, setup, setup_mocks
-    ):
-        """The signal for restarting home assistant is called when user selects Restart Later"""
-        flow: OptionsFlow
-        (_, _, _, flow) = setup_mocks
-
-        await flow.async_step_restart_no(None)
-        flow.hass.services.async_call.assert_not_called()
+        flow.async_create_entry.assert_called_once()
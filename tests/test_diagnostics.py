@@ -0,0 +1,83 @@
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden import AerogardenDataUpdateCoordinator
+from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.const import DOMAIN
+from custom_components.aerogarden.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+HOST = "https://unittest.abcxyz"
+EMAIL = "myemail@unittest.com"
+PASSWORD = "hunter2"
+ENTRY_ID = "0123456789abcdef0123456789abcdef"
+
+# noinspection SpellCheckingInspection
+DEVICES = [
+    {
+        "configID": 123456,
+        "airGuid": "12:34:56:78:10:AB",
+        "plantedName": "VW5pdCBUZXN0IEdhcmRlbg==",
+        "chooseGarden": 0,
+    }
+]
+
+
+@pytest.fixture
+def setup(mocker: MockFixture):
+    mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+
+    hass = HomeAssistant("/path")
+    aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+    coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
+    hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
+
+    config_entry = ConfigEntry(
+        entry_id=ENTRY_ID,
+        data={CONF_EMAIL: EMAIL, CONF_PASSWORD: PASSWORD},
+        domain=DOMAIN,
+        minor_version=0,
+        source="",
+        title="",
+        version=0,
+    )
+
+    return hass, config_entry, aerogarden
+
+
+@pytest.mark.asyncio
+class TestDiagnostics:
+    async def test_diagnostics_redacts_credentials(self, setup):
+        """credentials should never be included in diagnostics"""
+        (hass, config_entry, _) = setup
+
+        result = await async_get_config_entry_diagnostics(hass, config_entry)
+
+        assert EMAIL not in str(result)
+        assert PASSWORD not in str(result)
+
+    async def test_diagnostics_includes_name_cache_statistics(self, setup):
+        """name cache hits and misses should be reported"""
+        (hass, config_entry, aerogarden) = setup
+        aerogarden._set_devices(DEVICES)
+        aerogarden._set_devices([{**DEVICES[0], "plantedDay": 44}])
+        aerogarden.get_device_info(123456)
+
+        result = await async_get_config_entry_diagnostics(hass, config_entry)
+
+        assert result["aerogarden"]["garden_count"] == 1
+        assert result["aerogarden"]["name_cache"] == {"hits": 1, "misses": 1}
+
+    async def test_diagnostics_includes_refresh_statistics(self, setup):
+        """processed and skipped refreshes should be reported"""
+        (hass, config_entry, aerogarden) = setup
+        aerogarden.refreshes_processed = 3
+        aerogarden.refreshes_skipped = 7
+
+        result = await async_get_config_entry_diagnostics(hass, config_entry)
+
+        assert result["aerogarden"]["refreshes"] == {"processed": 3, "skipped": 7}
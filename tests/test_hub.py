@@ -0,0 +1,252 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from homeassistant.core import HomeAssistant
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden.client import AerogardenApiConnectError
+from custom_components.aerogarden.const import DOMAIN
+from custom_components.aerogarden.hub import (
+    DATA_HUBS,
+    MAX_CONCURRENT_REFRESHES,
+    STAGGER_STEP,
+    VALIDATED_LOGIN_MAX_AGE,
+    AerogardenHub,
+    RefreshSlot,
+    async_cache_validated_login,
+    async_get_hub,
+    async_pop_validated_login,
+    async_release_hub,
+)
+
+HOST = "https://unittest.abcxyz"
+USER_ID = 123456
+DEVICES = [{"configID": 1}]
+
+
+@pytest_asyncio.fixture
+async def hass(mocker: MockFixture):
+    mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+    mocker.patch("custom_components.aerogarden.hub.async_get_clientsession")
+
+    hass = HomeAssistant("/path")
+    hass.data = {}
+    hass.loop = asyncio.get_running_loop()
+    return hass
+
+
+@pytest.mark.asyncio
+class TestHub:
+    async def test_async_get_hub_shared_by_host(self, hass):
+        """Entries for the same host should share a hub"""
+        hub = async_get_hub(hass, HOST)
+
+        assert async_get_hub(hass, HOST) is hub
+        assert hass.data[DOMAIN][DATA_HUBS][HOST] is hub
+
+    async def test_async_release_hub_discards_unused_hub(self, hass):
+        """A hub should be discarded once its last entry is released"""
+        async_get_hub(hass, HOST).register("entry1", USER_ID)
+        async_get_hub(hass, HOST).register("entry2", USER_ID + 1)
+
+        async_release_hub(hass, HOST, "entry1")
+        assert HOST in hass.data[DOMAIN][DATA_HUBS]
+
+        async_release_hub(hass, HOST, "entry2")
+        assert HOST not in hass.data[DOMAIN][DATA_HUBS]
+
+    async def test_validated_login_used_once(self, hass):
+        """A login cached by the config flow should be handed to the entry's setup, and only once"""
+        async_cache_validated_login(hass, "aerogarden-unittest", USER_ID, DEVICES)
+
+        assert async_pop_validated_login(hass, "aerogarden-unittest") == (
+            USER_ID,
+            DEVICES,
+        )
+        assert async_pop_validated_login(hass, "aerogarden-unittest") is None
+        assert async_pop_validated_login(hass, None) is None
+
+    async def test_validated_login_expires(self, mocker: MockFixture, hass):
+        """A login cached too long ago should not be used to set up an entry"""
+        mock_time = mocker.patch("custom_components.aerogarden.hub.time")
+        mock_time.monotonic.return_value = 1000
+        async_cache_validated_login(hass, "aerogarden-unittest", USER_ID, DEVICES)
+
+        mock_time.monotonic.return_value = 1000 + VALIDATED_LOGIN_MAX_AGE
+        assert async_pop_validated_login(hass, "aerogarden-unittest") is None
+
+    async def test_register_staggers_accounts(self, hass):
+        """Entries for different accounts should be given different poll offsets"""
+        hub = AerogardenHub(hass, HOST)
+
+        assert hub.register("entry1", USER_ID).poll_offset == 0
+        assert hub.register("entry2", USER_ID + 1).poll_offset == STAGGER_STEP
+        assert hub.register("entry3", 0).poll_offset == STAGGER_STEP * 2
+
+    async def test_register_same_account_shares_offset(self, hass):
+        """Entries for the same account should poll together, so they can share a fetch"""
+        hub = AerogardenHub(hass, HOST)
+
+        first = hub.register("entry1", USER_ID)
+        second = hub.register("entry2", USER_ID)
+
+        assert first.poll_offset == second.poll_offset
+
+    async def test_unregister_frees_slot(self, hass):
+        """Once an account's last entry is removed, its poll slot should be reused"""
+        hub = AerogardenHub(hass, HOST)
+        hub.register("entry1", USER_ID)
+        hub.register("entry2", USER_ID + 1)
+
+        hub.unregister("entry1")
+
+        assert hub.register("entry3", USER_ID + 2).poll_offset == 0
+
+    async def test_register_again_once_logged_in(self, hass):
+        """An entry registered before its first login should move to its account's slot once it knows it"""
+        hub = AerogardenHub(hass, HOST)
+        first = hub.register("entry1", USER_ID)
+        second = hub.register("entry2", 0)
+
+        assert hub.register("entry2", USER_ID) is second
+        assert second.poll_offset == first.poll_offset
+        assert hub.register("entry3", USER_ID + 1).poll_offset == STAGGER_STEP
+
+    async def test_concurrent_fetches_shared(self, hass):
+        """Fetches for the same account made at the same time should result in a single request"""
+        hub = AerogardenHub(hass, HOST)
+        released = asyncio.Event()
+
+        async def fetch():
+            await released.wait()
+            return DEVICES
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        first = asyncio.create_task(hub.async_get_user_devices(USER_ID, fetch_mock))
+        second = asyncio.create_task(hub.async_get_user_devices(USER_ID, fetch_mock))
+        await asyncio.sleep(0)
+        released.set()
+
+        assert await first == DEVICES
+        assert await second == DEVICES
+        fetch_mock.assert_awaited_once()
+        assert hub.get_diagnostics()["shared_fetches"] == 1
+
+    async def test_recent_fetch_reused(self, hass):
+        """A fetch that just completed should be reused by another entry on the same account"""
+        hub = AerogardenHub(hass, HOST)
+        fetch_mock = AsyncMock(return_value=DEVICES)
+
+        await hub.async_get_user_devices(USER_ID, fetch_mock)
+        result = await hub.async_get_user_devices(USER_ID, fetch_mock)
+
+        assert result == DEVICES
+        fetch_mock.assert_awaited_once()
+
+    async def test_fetches_not_shared_between_accounts(self, hass):
+        """Each account should fetch its own devices"""
+        hub = AerogardenHub(hass, HOST)
+        fetch_mock = AsyncMock(return_value=DEVICES)
+
+        await hub.async_get_user_devices(USER_ID, fetch_mock)
+        await hub.async_get_user_devices(USER_ID + 1, fetch_mock)
+
+        assert fetch_mock.await_count == 2
+
+    async def test_fetch_not_reused_after_write(self, hass):
+        """A write should stop a recent fetch from being reused, so the refresh after it sees the written state"""
+        hub = AerogardenHub(hass, HOST)
+        fetch_mock = AsyncMock(return_value=DEVICES)
+
+        await hub.async_get_user_devices(USER_ID, fetch_mock)
+        hub.invalidate_user_devices(USER_ID)
+        await hub.async_get_user_devices(USER_ID, fetch_mock)
+
+        assert fetch_mock.await_count == 2
+
+    async def test_fetch_in_flight_not_shared_after_write(self, hass):
+        """A fetch that started before a write should neither be joined nor reused after it"""
+        hub = AerogardenHub(hass, HOST)
+        released = asyncio.Event()
+
+        async def fetch():
+            await released.wait()
+            return DEVICES
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        before = asyncio.create_task(hub.async_get_user_devices(USER_ID, fetch_mock))
+        await asyncio.sleep(0)
+        hub.invalidate_user_devices(USER_ID)
+        after = asyncio.create_task(hub.async_get_user_devices(USER_ID, fetch_mock))
+        await asyncio.sleep(0)
+        released.set()
+
+        assert await before == DEVICES
+        assert await after == DEVICES
+        await hub.async_get_user_devices(USER_ID, fetch_mock)
+        assert fetch_mock.await_count == 2
+
+    async def test_failed_fetch_not_reused(self, hass):
+        """A failed fetch should be raised, and not reused by later fetches"""
+        hub = AerogardenHub(hass, HOST)
+        fetch_mock = AsyncMock(side_effect=[AerogardenApiConnectError(), DEVICES])
+
+        with pytest.raises(AerogardenApiConnectError):
+            await hub.async_get_user_devices(USER_ID, fetch_mock)
+
+        assert await hub.async_get_user_devices(USER_ID, fetch_mock) == DEVICES
+
+
+@pytest.mark.asyncio
+class TestRefreshSlot:
+    async def test_refreshes_limited_across_entries(self, hass):
+        """No more than the maximum number of entries should refresh at once"""
+        hub = AerogardenHub(hass, HOST)
+        slots = [
+            hub.register(f"entry{index}", USER_ID + index)
+            for index in range(MAX_CONCURRENT_REFRESHES + 2)
+        ]
+        released = asyncio.Event()
+        running = 0
+        max_running = 0
+
+        async def refresh(slot: RefreshSlot):
+            nonlocal running, max_running
+            async with slot.async_acquire():
+                running += 1
+                max_running = max(max_running, running)
+                await released.wait()
+                running -= 1
+
+        tasks = [asyncio.create_task(refresh(slot)) for slot in slots]
+        await asyncio.sleep(0)
+        released.set()
+        await asyncio.gather(*tasks)
+
+        assert max_running == MAX_CONCURRENT_REFRESHES
+
+    async def test_refresh_timings_recorded(self):
+        """Refresh waits and latencies should be recorded for diagnostics"""
+        slot = RefreshSlot(asyncio.Semaphore(1), 5)
+
+        async with slot.async_acquire():
+            pass
+        async with slot.async_acquire():
+            pass
+
+        diagnostics = slot.get_diagnostics()
+        assert diagnostics["poll_offset"] == 5
+        assert diagnostics["refreshes"] == 2
+        assert diagnostics["average_latency"] is not None
+
+    async def test_refresh_timings_recorded_on_failure(self):
+        """Failed refreshes should still be recorded"""
+        slot = RefreshSlot(asyncio.Semaphore(1), 0)
+
+        with pytest.raises(AerogardenApiConnectError):
+            async with slot.async_acquire():
+                raise AerogardenApiConnectError()
+
+        assert slot.refreshes == 1
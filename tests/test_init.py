@@ -1,19 +1,41 @@
+import asyncio
+import importlib
+import pkgutil
 from asyncio import Future
+from datetime import timedelta
+from unittest.mock import AsyncMock
 
 import pytest
 from homeassistant.config_entries import ConfigEntries, ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_HOST, CONF_PASSWORD
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from pytest_mock import MockFixture
+from pytest_mock.plugin import MockType
 
+import custom_components.aerogarden
 from custom_components.aerogarden import (
     AerogardenDataUpdateCoordinator,
     async_setup_entry,
     async_unload_entry,
 )
 from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.client import (
+    AerogardenApiAuthError,
+    AerogardenApiCircuitOpenError,
+    AerogardenApiCredentialsError,
+    AerogardenClient,
+)
 from custom_components.aerogarden.const import DOMAIN, PLATFORMS
+from custom_components.aerogarden.const import HOST as API_HOST
+from custom_components.aerogarden.hub import (
+    DATA_HUBS,
+    RefreshSlot,
+    async_cache_validated_login,
+    async_get_hub,
+)
+from custom_components.aerogarden.schedule import PollingTier
 
 HOST = "https://unittest.abcxyz"
 EMAIL = "myemail@unittest.com"
@@ -21,6 +43,20 @@ PASSWORD = "hunter2"
 ENTRY_ID = f"aerogarden-{EMAIL}"
 
 
+@pytest.mark.parametrize(
+    "module",
+    [
+        module.name
+        for module in pkgutil.iter_modules(
+            custom_components.aerogarden.__path__, "custom_components.aerogarden."
+        )
+    ],
+)
+def test_module_imports(module):
+    """Every module of the integration should import against Home Assistant itself, with nothing patched"""
+    importlib.import_module(module)
+
+
 @pytest.fixture
 def setup(mocker: MockFixture):
     future: Future = Future()
@@ -30,6 +66,12 @@ def setup(mocker: MockFixture):
     bool_future.set_result(True)
 
     mocker.patch.object(Aerogarden, "update", return_value=future)
+    mocker.patch.object(Aerogarden, "close", return_value=future)
+    mocker.patch.object(Aerogarden, "async_restore", return_value=future)
+    mocker.patch("custom_components.aerogarden.AerogardenStore")
+    mocker.patch("custom_components.aerogarden.hub.async_get_clientsession")
+    mocker.patch("custom_components.aerogarden.async_setup_services")
+    mocker.patch("custom_components.aerogarden.async_unload_services")
     mocker.patch.object(HomeAssistant, "__init__", return_value=None)
     mocker.patch.object(ConfigEntries, "__init__", return_value=None)
     mocker.patch.object(
@@ -46,6 +88,7 @@ def setup(mocker: MockFixture):
         minor_version=0,
         source="",
         title="",
+        unique_id=ENTRY_ID,
         version=0,
     )
 
@@ -67,6 +110,116 @@ class TestInit:
 
         assert hass.data[DOMAIN][ENTRY_ID] is not None
 
+    async def test_async_setup_entry_registered_with_hub(self, setup):
+        """when setting up, the entry should be registered with the hub shared by entries for the same host"""
+        (hass, config_entry) = setup
+
+        await async_setup_entry(hass, config_entry)
+
+        assert hass.data[DOMAIN][DATA_HUBS][API_HOST].entry_count == 1
+
+    async def test_async_setup_entry_registered_with_account_after_login(
+        self, mocker: MockFixture, setup
+    ):
+        """an entry set up without a session should poll with other entries on its account once it logged in"""
+        (hass, config_entry) = setup
+        other = async_get_hub(hass, API_HOST).register("other", 42)
+        mocker.patch.object(
+            Aerogarden,
+            "user_id",
+            new_callable=mocker.PropertyMock,
+            side_effect=[0, 42],
+        )
+
+        await async_setup_entry(hass, config_entry)
+
+        refresh_slot = hass.data[DOMAIN][ENTRY_ID].refresh_slot
+        assert refresh_slot.poll_offset == other.poll_offset
+
+    async def test_async_setup_entry_session_restored(self, mocker: MockFixture, setup):
+        """when setting up, any persisted session should be restored before the first refresh"""
+        (hass, config_entry) = setup
+        mock_restore: MockType = mocker.patch.object(Aerogarden, "async_restore")
+
+        await async_setup_entry(hass, config_entry)
+
+        mock_restore.assert_called()
+
+    async def test_async_setup_entry_warm_start_from_snapshot(
+        self, mocker: MockFixture, setup
+    ):
+        """when a snapshot was restored, setup should not wait on the first refresh and refresh in the background instead"""
+        (hass, config_entry) = setup
+        mocker.patch.object(Aerogarden, "get_garden_config_ids", return_value=[1])
+        first_refresh = mocker.patch.object(
+            AerogardenDataUpdateCoordinator, "async_config_entry_first_refresh"
+        )
+        set_updated_data = mocker.patch.object(
+            AerogardenDataUpdateCoordinator, "async_set_updated_data"
+        )
+        mocker.patch("custom_components.aerogarden.async_refresh_and_register")
+        background_task = mocker.patch.object(
+            ConfigEntry, "async_create_background_task"
+        )
+
+        result = await async_setup_entry(hass, config_entry)
+
+        assert result
+        first_refresh.assert_not_called()
+        set_updated_data.assert_called()
+        background_task.assert_called()
+
+    async def test_async_setup_entry_seeded_from_config_flow(
+        self, mocker: MockFixture, setup
+    ):
+        """when the config flow just validated the account, setup should use its login and devices instead of
+        fetching them again"""
+        (hass, config_entry) = setup
+        store = mocker.patch("custom_components.aerogarden.AerogardenStore")
+        store.return_value.async_save_session = AsyncMock()
+        mock_login = mocker.patch.object(AerogardenClient, "login")
+        first_refresh = mocker.patch.object(
+            AerogardenDataUpdateCoordinator, "async_config_entry_first_refresh"
+        )
+        set_updated_data = mocker.patch.object(
+            AerogardenDataUpdateCoordinator, "async_set_updated_data"
+        )
+        background_task = mocker.patch.object(
+            ConfigEntry, "async_create_background_task"
+        )
+        async_cache_validated_login(hass, ENTRY_ID, 42, [{"configID": 1}])
+
+        result = await async_setup_entry(hass, config_entry)
+
+        assert result
+        coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][ENTRY_ID]
+        assert coordinator.aerogarden.user_id == 42
+        assert list(coordinator.aerogarden.get_garden_config_ids()) == [1]
+        store.return_value.async_save_session.assert_awaited_with(42)
+        mock_login.assert_not_called()
+        first_refresh.assert_not_called()
+        set_updated_data.assert_called()
+        background_task.assert_not_called()
+
+    async def test_async_setup_entry_failed_first_refresh_releases_entry(
+        self, mocker: MockFixture, setup
+    ):
+        """when the first refresh fails, setup should release the coordinator and hub registration it made"""
+        (hass, config_entry) = setup
+        mocker.patch.object(
+            AerogardenDataUpdateCoordinator,
+            "async_config_entry_first_refresh",
+            side_effect=ConfigEntryAuthFailed("unit test"),
+        )
+        mock_close: MockType = mocker.patch.object(Aerogarden, "close")
+
+        with pytest.raises(ConfigEntryAuthFailed):
+            await async_setup_entry(hass, config_entry)
+
+        assert ENTRY_ID not in hass.data[DOMAIN]
+        assert API_HOST not in hass.data[DOMAIN][DATA_HUBS]
+        mock_close.assert_called()
+
     async def test_async_setup_entry_platforms_initialized(self, setup):
         """When setting up, all platforms should be initialized"""
         hass: HomeAssistant
@@ -80,19 +233,37 @@ class TestInit:
             config_entry, PLATFORMS
         )
 
-    async def test_async_unload_entry(self, setup):
+    async def test_async_unload_entry(self, mocker: MockFixture, setup):
         """When unloading, all platforms should be unloaded"""
         hass: HomeAssistant
         (hass, config_entry) = setup
-        hass.data = {DOMAIN: {ENTRY_ID: Aerogarden(HOST, EMAIL, PASSWORD)}}
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        mock_close: MockType = mocker.patch.object(aerogarden, "close")
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
+        hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
         result = await async_unload_entry(hass, config_entry)
 
         assert result
+        assert ENTRY_ID not in hass.data[DOMAIN]
+        mock_close.assert_called()
 
         hass.config_entries.async_unload_platforms.sassert_called_with(
             config_entry, PLATFORMS
         )
 
+    async def test_async_unload_entry_releases_hub(self, setup):
+        """When the last entry for a host is unloaded, its hub should be discarded"""
+        hass: HomeAssistant
+        (hass, config_entry) = setup
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
+        hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
+        async_get_hub(hass, API_HOST).register(ENTRY_ID, 0)
+
+        await async_unload_entry(hass, config_entry)
+
+        assert API_HOST not in hass.data[DOMAIN][DATA_HUBS]
+
     async def test_update_update_failed_thrown(self, mocker: MockFixture, setup):
         (hass, _) = setup
 
@@ -101,3 +272,220 @@ class TestInit:
         coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
         with pytest.raises(UpdateFailed):
             await coordinator._async_update_data()
+
+    async def test_update_auth_failed_on_rejected_credentials(
+        self, mocker: MockFixture, setup
+    ):
+        """rejected credentials should stop polling and start reauthentication, rather than fail the update"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        error = UpdateFailed("unit test")
+        error.__cause__ = AerogardenApiCredentialsError("unit test")
+        mocker.patch.object(aerogarden, "update", side_effect=error)
+        mocker.patch.object(
+            Aerogarden,
+            "credentials_rejected",
+            new_callable=mocker.PropertyMock,
+            return_value=True,
+        )
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
+        with pytest.raises(ConfigEntryAuthFailed):
+            await coordinator._async_update_data()
+
+    async def test_update_failed_on_auth_error_without_rejected_credentials(
+        self, mocker: MockFixture, setup
+    ):
+        """a login failing for another reason than rejected credentials shouldn't start reauthentication"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        error = UpdateFailed("unit test")
+        error.__cause__ = AerogardenApiAuthError("unit test")
+        mocker.patch.object(aerogarden, "update", side_effect=error)
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 10)
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+    async def test_update_waits_for_open_circuit(self, mocker: MockFixture, setup):
+        """while the api circuit is open, the next poll should wait until a trial request is allowed"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        error = UpdateFailed("unit test")
+        error.__cause__ = AerogardenApiCircuitOpenError("unit test")
+        mocker.patch.object(aerogarden, "update", side_effect=error)
+        mocker.patch.object(
+            Aerogarden, "retry_after", new_callable=mocker.PropertyMock, return_value=90
+        )
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30, 300)
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+        assert coordinator.update_interval == timedelta(seconds=90)
+
+    async def test_update_schedules_next_refresh_from_garden_cycles(self, setup):
+        """after a refresh, the next poll should land shortly after the next predicted transition"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(
+            [{"configID": 1, "pumpCycle": "00050019", "clock": "0a0100"}]
+        )
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30, 300)
+        await coordinator._async_update_data()
+
+        assert coordinator.update_interval == timedelta(seconds=245)
+
+    async def test_update_backs_off_to_idle_interval_when_all_gardens_idle(
+        self, mocker: MockFixture, setup
+    ):
+        """once every garden is idle and unchanged, polling should back off to the idle interval"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(
+            [
+                {"configID": 1, "pumpCycle": "00050019", "vacationMode": 1},
+                {"configID": 2, "plantedDay": 120, "totalDay": 120},
+            ]
+        )
+        mocker.patch.object(aerogarden, "get_seconds_since_change", return_value=None)
+        coordinator = AerogardenDataUpdateCoordinator(
+            hass, aerogarden, 30, 300, idle_polling_interval=1800
+        )
+        await coordinator._async_update_data()
+
+        assert coordinator.update_interval == timedelta(seconds=1800)
+        assert coordinator.polling_tiers == {1: PollingTier.IDLE, 2: PollingTier.IDLE}
+
+    async def test_update_polls_for_active_gardens_alongside_idle_ones(
+        self, mocker: MockFixture, setup
+    ):
+        """idle gardens should not slow down polling for an active garden on the same account"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(
+            [
+                {"configID": 1, "pumpCycle": "00050019", "clock": "0a0100"},
+                {"configID": 2, "pumpCycle": "00050019", "vacationMode": 1},
+            ]
+        )
+        mocker.patch.object(aerogarden, "get_seconds_since_change", return_value=None)
+        coordinator = AerogardenDataUpdateCoordinator(
+            hass, aerogarden, 30, 300, idle_polling_interval=1800
+        )
+        await coordinator._async_update_data()
+
+        assert coordinator.update_interval == timedelta(seconds=245)
+        assert coordinator.polling_tiers == {
+            1: PollingTier.ACTIVE,
+            2: PollingTier.IDLE,
+        }
+
+    async def test_update_staggered_by_poll_offset(self, setup):
+        """an entry's poll offset should shift its first poll, and every poll following a predicted transition"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        aerogarden._set_devices(
+            [{"configID": 1, "pumpCycle": "00050019", "clock": "0a0100"}]
+        )
+        refresh_slot = RefreshSlot(asyncio.Semaphore(1), 5)
+        coordinator = AerogardenDataUpdateCoordinator(
+            hass, aerogarden, 30, 300, refresh_slot
+        )
+        await coordinator._async_update_data()
+        assert coordinator.update_interval == timedelta(seconds=255)
+
+        await coordinator._async_update_data()
+        assert coordinator.update_interval == timedelta(seconds=250)
+        assert refresh_slot.refreshes == 2
+
+    async def test_update_listeners_skipped_when_unchanged(
+        self, mocker: MockFixture, setup
+    ):
+        """entities should not be notified of a refresh that returned nothing new"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        mocker.patch.object(
+            Aerogarden,
+            "last_update_changed",
+            new_callable=mocker.PropertyMock,
+            return_value=False,
+        )
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30)
+        listener = mocker.MagicMock()
+        coordinator._listeners = {listener: (listener, None)}
+
+        await coordinator._async_update_data()
+        coordinator.async_update_listeners()
+
+        listener.assert_not_called()
+
+    async def test_diagnostic_listeners_notified_when_unchanged(
+        self, mocker: MockFixture, setup
+    ):
+        """diagnostic entities should be notified of a refresh that returned nothing new, until removed"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        mocker.patch.object(
+            Aerogarden,
+            "last_update_changed",
+            new_callable=mocker.PropertyMock,
+            return_value=False,
+        )
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30)
+        listener = mocker.MagicMock()
+        remove_listener = coordinator.async_add_diagnostic_listener(listener)
+
+        await coordinator._async_update_data()
+        coordinator.async_update_listeners()
+        listener.assert_called_once()
+
+        remove_listener()
+        await coordinator._async_update_data()
+        coordinator.async_update_listeners()
+        listener.assert_called_once()
+
+    async def test_update_listeners_notified_after_write(
+        self, mocker: MockFixture, setup
+    ):
+        """entities should be notified of the refresh following a write, even if nothing changed"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        mocker.patch.object(
+            Aerogarden,
+            "last_update_changed",
+            new_callable=mocker.PropertyMock,
+            return_value=False,
+        )
+        mocker.patch.object(AerogardenDataUpdateCoordinator, "async_request_refresh")
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30)
+        listener = mocker.MagicMock()
+        coordinator._listeners = {listener: (listener, None)}
+
+        await coordinator.write_queue._on_written()
+        await coordinator._async_update_data()
+        coordinator.async_update_listeners()
+
+        listener.assert_called_once()
+
+    async def test_set_polling_bounds(self, setup):
+        """changing the polling bounds should poll at the lower bound until the next refresh"""
+        (hass, _) = setup
+
+        aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+        coordinator = AerogardenDataUpdateCoordinator(hass, aerogarden, 30, 300)
+        coordinator.set_polling_bounds(60, 600)
+
+        assert coordinator.update_interval == timedelta(seconds=60)
+        assert coordinator._max_polling_interval == 600
+
+        coordinator.set_polling_bounds(60, 600, 3600)
+
+        assert coordinator._idle_polling_interval == 3600
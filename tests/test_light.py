@@ -0,0 +1,179 @@
+from asyncio import Future
+from typing import Union, cast
+from unittest.mock import AsyncMock, MagicMock, NonCallableMagicMock
+
+import pytest
+from homeassistant.components.light import ColorMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden import (
+    AerogardenDataUpdateCoordinator,
+    AerogardenEntity,
+)
+from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.const import DOMAIN
+from custom_components.aerogarden.light import AerogardenLight, async_setup_entry
+
+MockType = Union[
+    MagicMock,
+    AsyncMock,
+    NonCallableMagicMock,
+]
+CONFIG_ID = 123456
+# noinspection SpellCheckingInspection
+DEVICES = [
+    {
+        "configID": CONFIG_ID,
+        "airGuid": "12:34:56:78:10:AB",
+        "lightCycle": "08000801",
+        "pumpCycle": "00050019",
+        "lightTemp": 1,
+        "lightStat": 0,
+        "clock": "0a0006",
+        "pumpStat": 1,
+        "pumpHydro": 0,
+        "pumpTest": None,
+        "pumpDrain": None,
+        "pumpDrainState": None,
+        "pumpLevel": 1,
+        "pumpRemind4Hour": 0,
+        "gardenType": 5,
+        "plantedType": 10,
+        "plantedName": "KCDNocKwIM2cypYgzaHCsCkgSGVsbG8gdGhlcmU=",
+        "totalDay": 120,
+        "plantedDay": 43,
+        "nutriCycle": 7,
+        "nutriRemindDay": 6,
+        "nutriStatus": 0,
+        "alarmAllow": 0,
+        "plantedDate": None,
+        "nutrientDate": None,
+        "updateDate": "2023-08-25T00:27:24",
+        "createDate": None,
+        "swVersion": "MFW-V0.37",
+        "hwVersion": "SW-V1.01",
+        "bwVersion": "HW-V5.0",
+        "oldPlantedDay": 43,
+        "deviceID": "123456789ABCEFG",
+        "deviceIP": "http://10.10.2.20",
+        "chooseGarden": 0,
+        "oldlightCycle": "",
+        "vacationMode": 0,
+        "bwConnectedSsid": "Pretty Fly for a Wifi",
+        "nutriStatusFlag": "0",
+        "nutriStatusDate": "2023-08-23T14:05:02",
+        "remark": None,
+        "imgUrl": None,
+        "timezone": "0",
+        "audioAlarmStat": 0,
+        "audioAlarmCycle": "08001400",
+        "audioAlarmCycleSet": 0,
+        "clientIP": "555.55.55.5",
+        "latlng": None,
+        "lightDimming": 0,
+        "sunRise": 0,
+        "sunSet": 0,
+        "sunFunStatus": 0,
+        "sunFunSwitch": 0,
+        "pumpSafetyMode": 0,
+    }
+]
+HOST = "https://unittest.abcxyz"
+EMAIL = "myemail@unittest.com"
+PASSWORD = "hunter2"
+ENTRY_ID = f"aerogarden-{EMAIL}"
+
+
+class EntitiesTracker:
+    def __init__(self) -> None:
+        self._added_entities: list[AerogardenEntity] = []
+
+    def add_entities_callback(
+        self,
+        new_entities: list[AerogardenEntity],
+    ):
+        self._added_entities = new_entities
+
+
+@pytest.fixture
+def setup(mocker: MockFixture):
+    future: Future = Future()
+    future.set_result(None)
+
+    mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+    write_ha_mock = mocker.patch.object(
+        Entity, "async_write_ha_state", return_value=None
+    )
+
+    ag_service = Aerogarden(HOST, EMAIL, PASSWORD)
+    mocker.patch.object(ag_service, "update", return_value=future)
+
+    ag_service._set_devices(DEVICES)
+
+    hass = HomeAssistant("/path")
+    coordinator = AerogardenDataUpdateCoordinator(hass, ag_service, 10)
+    write_mock = mocker.patch.object(
+        coordinator.write_queue, "async_update", new_callable=AsyncMock
+    )
+
+    hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
+
+    config_entry = ConfigEntry(
+        entry_id=ENTRY_ID,
+        data={CONF_EMAIL: "unittest@ha.com"},
+        domain=DOMAIN,
+        minor_version=0,
+        source="",
+        title="",
+        version=0,
+    )
+
+    entities = EntitiesTracker()
+
+    return hass, config_entry, entities, write_ha_mock, write_mock
+
+
+@pytest.mark.asyncio
+class TestLight:
+    @staticmethod
+    async def __execute_and_get_light(setup) -> AerogardenLight:
+        entities: EntitiesTracker
+        (hass, configEntry, entities, _, _) = setup
+
+        await async_setup_entry(hass, configEntry, entities.add_entities_callback)
+
+        assert len(entities._added_entities) == 1
+        return cast(AerogardenLight, entities._added_entities[0])
+
+    async def test_async_setup_entry_grow_light_created(self, setup):
+        """Light for switching the grow light is created on setup"""
+
+        light = await self.__execute_and_get_light(setup)
+
+        assert light.entity_description.translation_key == "grow_light"
+        assert light.entity_description.icon == "mdi:lightbulb"
+        assert light.color_mode == ColorMode.ONOFF
+        assert light.device_info is not None
+        assert light.is_on is False
+
+    @pytest.mark.parametrize("on, value", [(True, 1), (False, 0)])
+    async def test_turn_on_off_writes_patch_optimistically(self, setup, on, value):
+        """Switching the light should show the new state immediately and queue a patch for the garden"""
+
+        write_mock: MockType
+        (_, _, _, _, write_mock) = setup
+        light = await self.__execute_and_get_light(setup)
+
+        if on:
+            await light.async_turn_on()
+        else:
+            await light.async_turn_off()
+
+        write_mock.assert_awaited_once_with(
+            "12:34:56:78:10:AB", 0, {"lightStat": value}
+        )
+        assert light.is_on is on
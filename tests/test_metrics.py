@@ -0,0 +1,79 @@
+import pytest
+
+from custom_components.aerogarden.metrics import (
+    LATENCY_SAMPLES,
+    ApiMetrics,
+    EndpointMetrics,
+)
+
+
+class TestEndpointMetrics:
+    def test_percentile_none_without_requests(self):
+        """No latency should be reported before any request is recorded"""
+
+        metrics = EndpointMetrics()
+
+        assert metrics.get_percentile(95) is None
+        assert metrics.get_max() is None
+
+    @pytest.mark.parametrize("percentile,expected", [(50, 0.5), (95, 0.95), (100, 1.0)])
+    def test_percentile_nearest_rank(self, percentile, expected):
+        """Percentiles should use the nearest rank of recorded latencies"""
+
+        metrics = EndpointMetrics()
+        for latency in range(100, 0, -1):
+            metrics.record_request(latency / 100, 200)
+
+        assert metrics.get_percentile(percentile) == expected
+
+    def test_latencies_limited_to_recent_samples(self):
+        """Only the most recent latencies should be kept"""
+
+        metrics = EndpointMetrics()
+        metrics.record_request(10.0, 200)
+        for _ in range(LATENCY_SAMPLES):
+            metrics.record_request(0.1, 200)
+
+        assert metrics.get_max() == 0.1
+        assert metrics.requests == LATENCY_SAMPLES + 1
+
+    def test_errors_counted_by_type(self):
+        """Failed requests should be counted by status and error type"""
+
+        metrics = EndpointMetrics()
+        metrics.record_request(0.1, 200)
+        metrics.record_request(0.1, 503, "HTTP 503")
+        metrics.record_request(0.1, None, "ClientConnectorError")
+        metrics.record_api_code(-1)
+
+        diagnostics = metrics.get_diagnostics()
+
+        assert diagnostics["requests"] == 3
+        assert diagnostics["errors"] == 2
+        assert diagnostics["status_codes"] == {"200": 1, "503": 1}
+        assert diagnostics["error_types"] == {
+            "HTTP 503": 1,
+            "ClientConnectorError": 1,
+        }
+        assert diagnostics["api_codes"] == {"-1": 1}
+
+
+class TestApiMetrics:
+    def test_get_none_for_unused_endpoint(self):
+        """Endpoints should only be reported once they have been called"""
+
+        metrics = ApiMetrics()
+
+        assert metrics.get("Login") is None
+        assert metrics.get_diagnostics() == {}
+
+    def test_errors_totalled_across_endpoints(self):
+        """Errors should be summed across every endpoint"""
+
+        metrics = ApiMetrics()
+        metrics.get_or_create("Login").record_request(0.1, 500, "HTTP 500")
+        metrics.get_or_create("QueryUserDevice").record_request(0.1, None, "Timeout")
+        metrics.get_or_create("QueryUserDevice").record_request(0.1, 200)
+
+        assert metrics.errors == 2
+        assert set(metrics.get_diagnostics()) == {"Login", "QueryUserDevice"}
@@ -0,0 +1,84 @@
+import pytest
+
+from custom_components.aerogarden.const import (
+    GARDEN_KEY_CONFIG_ID,
+    GARDEN_KEY_PLANTED_DAY,
+)
+from custom_components.aerogarden.models import (
+    GardenNameCache,
+    GardenState,
+    decode_garden_name,
+    get_device_model_by_garden_type,
+)
+
+CONFIG_ID = 123456
+DEVICE = {
+    "configID": CONFIG_ID,
+    "airGuid": "12:34:56:78:10:AB",
+    "plantedName": "VW5pdCBUZXN0IEdhcmRlbg==",
+    "chooseGarden": 0,
+    "gardenType": 5,
+    "plantedDay": 43,
+    "bwConnectedSsid": "Pretty Fly for a Wifi",
+}
+
+
+class TestModels:
+    def test_garden_state_retains_used_fields(self):
+        """fields read by the integration should be parsed from the payload"""
+        garden = GardenState(DEVICE)
+
+        assert garden.config_id == CONFIG_ID
+        assert garden.planted_day == 43
+        assert garden.get(GARDEN_KEY_CONFIG_ID) == CONFIG_ID
+        assert garden.get(GARDEN_KEY_PLANTED_DAY) == 43
+
+    def test_garden_state_discards_unused_fields(self):
+        """fields not read by the integration should not be retained"""
+        garden = GardenState(DEVICE)
+
+        assert garden.get("bwConnectedSsid") is None
+        assert not hasattr(garden, "__dict__")
+
+    def test_garden_state_missing_fields_are_none(self):
+        """fields missing from the payload should be None instead of raising"""
+        garden = GardenState({"configID": CONFIG_ID})
+
+        assert garden.pump_level is None
+        assert garden.name is None
+
+    def test_decode_garden_name(self):
+        """planted names are base64 encoded by the api"""
+        assert decode_garden_name("VW5pdCBUZXN0IEdhcmRlbg==") == "Unit Test Garden"
+
+    @pytest.mark.parametrize(
+        "garden_type,expected_model",
+        [(5, "Aerogarden Bounty"), (3, "Aerogarden Type 3")],
+    )
+    def test_get_device_model_by_garden_type(self, garden_type, expected_model):
+        """known garden types should resolve to a friendly model name"""
+        assert get_device_model_by_garden_type(garden_type) == expected_model
+
+    def test_name_cache_decodes_once_per_name(self):
+        """a name should only be decoded again when the raw planted name changes"""
+        cache = GardenNameCache()
+
+        assert cache.get(CONFIG_ID, "VW5pdCBUZXN0IEdhcmRlbg==") == "Unit Test Garden"
+        assert cache.get(CONFIG_ID, "VW5pdCBUZXN0IEdhcmRlbg==") == "Unit Test Garden"
+        assert cache.get(CONFIG_ID, "VGhpcyBUZXN0IFNoYWxsIFBhc3M=") == (
+            "This Test Shall Pass"
+        )
+
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    def test_name_cache_retain_forgets_removed_gardens(self):
+        """names for gardens no longer on the account should be evicted"""
+        cache = GardenNameCache()
+        cache.get(CONFIG_ID, "VW5pdCBUZXN0IEdhcmRlbg==")
+        cache.get(CONFIG_ID + 1, "VW5pdCBUZXN0IEdhcmRlbg==")
+
+        cache.retain([CONFIG_ID])
+        cache.get(CONFIG_ID + 1, "VW5pdCBUZXN0IEdhcmRlbg==")
+
+        assert cache.misses == 3
@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.aerogarden.models import GardenState
+from custom_components.aerogarden.schedule import (
+    RECENT_CHANGE_WINDOW,
+    TRANSITION_MARGIN,
+    GardenSchedule,
+    PollingTier,
+    get_adaptive_polling_interval,
+    get_polling_tier,
+    parse_clock,
+    parse_light_cycle,
+    parse_pump_cycle,
+)
+
+NOW = datetime(2023, 8, 25, 0, 27, 24, tzinfo=timezone.utc)
+
+
+def garden(
+    light_cycle="08001000",
+    pump_cycle="00050019",
+    clock="0a0006",
+    tz="0",
+    config_id=123456,
+    **fields,
+):
+    return GardenState(
+        {
+            "configID": config_id,
+            "lightCycle": light_cycle,
+            "pumpCycle": pump_cycle,
+            "clock": clock,
+            "timezone": tz,
+            **fields,
+        }
+    )
+
+
+class TestSchedule:
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("08000801", (8 * 3600, 8 * 3600 + 60)),
+            ("06001000", (6 * 3600, 16 * 3600)),
+            ("", None),
+            (None, None),
+            ("0800", None),
+            ("zz000801", None),
+            ("30000801", None),
+        ],
+    )
+    def test_parse_light_cycle(self, value, expected):
+        """light cycles are decoded into the on and off second of day"""
+        assert parse_light_cycle(value) == expected
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [("00050019", (5 * 60, 25 * 60)), ("0005", None), (None, None)],
+    )
+    def test_parse_pump_cycle(self, value, expected):
+        """pump cycles are decoded into running and resting seconds"""
+        assert parse_pump_cycle(value) == expected
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [("0a0006", 10 * 3600 + 6), ("000000", 0), ("ff0000", None), (None, None)],
+    )
+    def test_parse_clock(self, value, expected):
+        """garden clocks are decoded into the second of day"""
+        assert parse_clock(value) == expected
+
+    def test_next_light_transition_turns_off(self):
+        """while the light is on, the next transition turns it off"""
+        schedule = GardenSchedule.from_garden(garden(), NOW)
+
+        assert schedule.next_light_transition() == (6 * 3600 - 6, False)
+
+    def test_next_light_transition_turns_on(self):
+        """while the light is off, the next transition turns it on"""
+        schedule = GardenSchedule.from_garden(garden(clock="110000"), NOW)
+
+        assert schedule.next_light_transition() == (15 * 3600, True)
+
+    def test_next_light_transition_accounts_for_elapsed_time(self):
+        """time elapsed since the garden was polled brings the transition closer"""
+        schedule = GardenSchedule.from_garden(garden(), NOW)
+
+        assert schedule.next_light_transition(3600) == (5 * 3600 - 6, False)
+
+    def test_next_pump_transition(self):
+        """the pump alternates between running and resting"""
+        schedule = GardenSchedule.from_garden(garden(clock="0a0100"), NOW)
+
+        # 10:01:00 is 60 seconds into a 30 minute cycle, while the pump runs for the first 5 minutes
+        assert schedule.next_pump_transition() == (240, False)
+        assert schedule.next_pump_transition(300) == (1500 - 60, True)
+
+    def test_clock_falls_back_to_timezone(self):
+        """when the garden clock can't be decoded, utc time plus the garden timezone is used"""
+        schedule = GardenSchedule.from_garden(
+            garden(clock=None, tz="-5", pump_cycle=None), NOW
+        )
+
+        # 00:27:24 UTC is 19:27:24 at UTC-5, so the light turns on at 08:00 the next day
+        assert schedule.next_light_transition() == (12 * 3600 + 32 * 60 + 36, True)
+
+    def test_next_transition_none_without_schedule(self):
+        """gardens without a decodable schedule don't predict transitions"""
+        schedule = GardenSchedule.from_garden(garden(None, None), NOW)
+
+        assert schedule.next_transition() is None
+
+    def test_adaptive_interval_lands_after_transition(self):
+        """polling should happen shortly after the soonest predicted transition"""
+        interval = get_adaptive_polling_interval([garden(clock="0a0100")], 30, 300, NOW)
+
+        assert interval == 240 + TRANSITION_MARGIN
+
+    def test_adaptive_interval_clamped_to_bounds(self):
+        """polling intervals should stay within the configured bounds"""
+        soon = garden(clock="0a0437")
+        assert get_adaptive_polling_interval([soon], 30, 300, NOW) == 30
+
+        steady = garden(pump_cycle=None)
+        assert get_adaptive_polling_interval([steady], 30, 300, NOW) == 300
+
+    def test_adaptive_interval_without_schedule_uses_lower_bound(self):
+        """without anything to predict from, poll at the configured rate"""
+        assert get_adaptive_polling_interval([garden(None, None)], 30, 300, NOW) == 30
+        assert get_adaptive_polling_interval([], 30, 300, NOW) == 30
+
+    @pytest.mark.parametrize(
+        "fields,expected",
+        [
+            ({}, PollingTier.ACTIVE),
+            ({"vacationMode": 1}, PollingTier.IDLE),
+            ({"plantedDay": 120, "totalDay": 120}, PollingTier.IDLE),
+            ({"plantedDay": 43, "totalDay": 120}, PollingTier.ACTIVE),
+            ({"lightCycle": None, "pumpCycle": None}, PollingTier.ACTIVE),
+            ({"lightCycle": "zz", "pumpCycle": "00000000"}, PollingTier.ACTIVE),
+        ],
+    )
+    def test_polling_tier_derived_from_garden(self, fields, expected):
+        """gardens on vacation or at the end of their grow are idle, even without a schedule to predict from"""
+        assert get_polling_tier(garden(**fields), None) == expected
+
+    def test_polling_tier_active_after_recent_change(self):
+        """a garden that changed recently is active, even if it would otherwise be idle"""
+        idle = garden(vacationMode=1)
+
+        assert get_polling_tier(idle, 60) == PollingTier.ACTIVE
+        assert get_polling_tier(idle, RECENT_CHANGE_WINDOW) == PollingTier.IDLE
+
+    def test_adaptive_interval_ignores_idle_gardens(self):
+        """idle gardens shouldn't pull polling towards their transitions"""
+        soon = garden(clock="0a0437", config_id=1)
+        steady = garden(pump_cycle=None, config_id=2)
+        tiers = {1: PollingTier.IDLE, 2: PollingTier.ACTIVE}
+
+        interval = get_adaptive_polling_interval(
+            [soon, steady], 30, 300, NOW, tiers=tiers, idle_interval=1800
+        )
+
+        assert interval == 300
+
+    def test_adaptive_interval_uses_idle_interval_when_all_idle(self):
+        """once every garden is idle, polling backs off to the idle interval"""
+        gardens = [garden(config_id=1), garden(config_id=2)]
+        tiers = {1: PollingTier.IDLE, 2: PollingTier.IDLE}
+
+        interval = get_adaptive_polling_interval(
+            gardens, 30, 300, NOW, tiers=tiers, idle_interval=1800
+        )
+
+        assert interval == 1800
@@ -1,11 +1,12 @@
+import asyncio
 from asyncio import Future
 from typing import Union, cast
 from unittest.mock import AsyncMock, MagicMock, NonCallableMagicMock
 
 import pytest
-from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_EMAIL, UnitOfTime
+from homeassistant.const import CONF_EMAIL, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import Entity
 from pytest_mock import MockFixture
@@ -22,6 +23,8 @@ from custom_components.aerogarden.const import (
     GARDEN_KEY_PUMP_LEVEL,
 )
 from custom_components.aerogarden.sensor import (
+    DIAGNOSTIC_SENSOR_DESCRIPTIONS,
+    SENSOR_DESCRIPTIONS,
     AerogardenSensor,
     async_setup_entry,
 )
@@ -120,7 +123,7 @@ def setup(mocker: MockFixture):
     ag_service = Aerogarden(HOST, EMAIL, PASSWORD)
     mocker.patch.object(ag_service, "update", return_value=future)
 
-    ag_service._data = {CONFIG_ID: DEVICES[0]}
+    ag_service._set_devices(DEVICES)
 
     hass = HomeAssistant("/path")
     coordinator = AerogardenDataUpdateCoordinator(hass, ag_service, 10)
@@ -167,7 +170,29 @@ class TestSensor:
 
         await async_setup_entry(hass, configEntry, entities.add_entities_callback)
 
-        assert len(entities._added_entities) == 3
+        assert len(entities._added_entities) == 8
+
+    async def test_async_setup_diagnostic_sensors_created_once_per_entry(self, setup):
+        """Diagnostic sensors report on the account, so they should be created once however many gardens it has"""
+        entities: EntitiesTracker
+        (hass, configEntry, entities, _) = setup
+        coordinator: AerogardenDataUpdateCoordinator = hass.data[DOMAIN][ENTRY_ID]
+        coordinator.aerogarden._set_devices(
+            [DEVICES[0], {**DEVICES[0], "configID": CONFIG_ID + 1}]
+        )
+
+        await async_setup_entry(hass, configEntry, entities.add_entities_callback)
+
+        expected = len(SENSOR_DESCRIPTIONS) * 2 + len(DIAGNOSTIC_SENSOR_DESCRIPTIONS)
+        assert len(entities._added_entities) == expected
+        diagnostic = [
+            sensor
+            for sensor in entities._added_entities
+            if "api_circuit_state" in sensor.unique_id
+        ]
+        assert len(diagnostic) == 1
+        assert diagnostic[0].unique_id == f"{DOMAIN}-{ENTRY_ID}-api_circuit_state"
+        assert (DOMAIN, ENTRY_ID) in diagnostic[0].device_info["identifiers"]
 
     async def test_async_setup_entry_planted_day_created(self, setup):
         """Sensor for how many days since the garden was first planted is created on setup"""
@@ -207,6 +232,89 @@ class TestSensor:
         assert sensor.aerogarden is not None
         assert sensor.native_value == "Medium"
 
+    async def test_async_setup_entry_api_circuit_state_created(self, setup):
+        """Diagnostic sensor for the state of the connection to the Aerogarden API is created on setup"""
+
+        sensor = await self.__execute_and_get_sensor(setup, "api_circuit_state")
+
+        assert sensor.entity_description.translation_key == "api_circuit_state"
+        assert sensor.entity_description.icon == "mdi:cloud-alert"
+        assert sensor.entity_description.device_class == SensorDeviceClass.ENUM
+        assert sensor.entity_description.entity_category == EntityCategory.DIAGNOSTIC
+        assert sensor.device_info is not None
+        assert sensor.native_value == "closed"
+
+    async def test_async_setup_entry_api_errors_created(self, setup):
+        """Diagnostic sensor for the number of failed requests to the Aerogarden API is created on setup"""
+
+        sensor = await self.__execute_and_get_sensor(setup, "api_errors")
+        sensor.aerogarden.api_metrics.get_or_create("Login").record_request(
+            0.1, 500, "HTTP 500"
+        )
+
+        assert sensor.entity_description.translation_key == "api_errors"
+        assert (
+            sensor.entity_description.state_class == SensorStateClass.TOTAL_INCREASING
+        )
+        assert sensor.entity_description.entity_category == EntityCategory.DIAGNOSTIC
+        assert sensor.native_value == 1
+
+    async def test_async_setup_entry_query_latency_created(self, setup):
+        """Disabled diagnostic sensor for the 95th percentile latency of device queries is created on setup"""
+
+        sensor = await self.__execute_and_get_sensor(setup, "query_latency")
+
+        assert sensor.entity_description.translation_key == "query_latency"
+        assert sensor.entity_description.device_class == SensorDeviceClass.DURATION
+        assert (
+            sensor.entity_description.native_unit_of_measurement
+            == UnitOfTime.MILLISECONDS
+        )
+        assert sensor.entity_description.entity_category == EntityCategory.DIAGNOSTIC
+        assert not sensor.entity_description.entity_registry_enabled_default
+        assert sensor.native_value is None
+
+        metrics = sensor.aerogarden.api_metrics.get_or_create("QueryUserDevice")
+        for latency in (0.1, 0.2, 1.5):
+            metrics.record_request(latency, 200)
+
+        assert sensor.native_value == 1500
+
+    async def test_api_circuit_state_available_when_update_failed(self, setup):
+        """Diagnostic sensor should remain available and be written when refreshes fail"""
+
+        write_ha_mock: MockType
+        (_, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, "api_circuit_state")
+        sensor.coordinator.last_update_success = False
+        sensor._handle_coordinator_update()
+
+        assert sensor.available
+        write_ha_mock.assert_called()
+
+    async def test_diagnostic_sensor_written_when_gardens_unchanged(
+        self, mocker: MockFixture, setup
+    ):
+        """Diagnostic sensors should be written after refreshes that entities are skipped for"""
+
+        write_ha_mock: MockType
+        (hass, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, "api_errors")
+        sensor.hass = hass
+        hass.loop = asyncio.get_running_loop()
+        mocker.patch.object(
+            Aerogarden,
+            "last_update_changed",
+            new_callable=mocker.PropertyMock,
+            return_value=False,
+        )
+        await sensor.async_added_to_hass()
+
+        await sensor.coordinator._async_update_data()
+        sensor.coordinator.async_update_listeners()
+
+        write_ha_mock.assert_called_once()
+
     @pytest.mark.parametrize(
         "field",
         [
@@ -224,3 +332,40 @@ class TestSensor:
         sensor._handle_coordinator_update()
 
         write_ha_mock.assert_called()
+
+    async def test_async_handle_coordinator_update_skipped_when_unchanged(self, setup):
+        """State should not be written when the fields backing a sensor did not change"""
+
+        write_ha_mock: MockType
+        (_, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PLANTED_DAY)
+        sensor.aerogarden._set_devices(DEVICES)
+        sensor._handle_coordinator_update()
+
+        write_ha_mock.assert_not_called()
+
+    async def test_async_handle_coordinator_update_written_when_changed(self, setup):
+        """State should be written when a field backing a sensor changed"""
+
+        write_ha_mock: MockType
+        (_, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PLANTED_DAY)
+        sensor.aerogarden._set_devices([{**DEVICES[0], GARDEN_KEY_PLANTED_DAY: 44}])
+        sensor._handle_coordinator_update()
+
+        write_ha_mock.assert_called()
+        assert sensor.native_value == 44
+
+    async def test_async_handle_coordinator_update_written_when_unavailable(
+        self, setup
+    ):
+        """State should be written when availability changes, even if no fields changed"""
+
+        write_ha_mock: MockType
+        (_, _, _, write_ha_mock) = setup
+        sensor = await self.__execute_and_get_sensor(setup, GARDEN_KEY_PLANTED_DAY)
+        sensor.aerogarden._set_devices(DEVICES)
+        sensor.coordinator.last_update_success = False
+        sensor._handle_coordinator_update()
+
+        write_ha_mock.assert_called()
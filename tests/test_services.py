@@ -0,0 +1,110 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden.const import DOMAIN, SERVICE_DUMP_PAYLOAD
+from custom_components.aerogarden.services import (
+    async_setup_services,
+    async_unload_services,
+)
+
+ENTRY_ID = "aerogarden-unittest"
+RAW_DEVICES = [
+    {
+        "configID": 123456,
+        "plantedDay": 43,
+        "clientIP": "555.55.55.5",
+        "bwConnectedSsid": "Pretty Fly for a Wifi",
+        "deviceIP": "http://10.10.2.20",
+    }
+]
+
+
+@pytest.fixture
+def setup(mocker: MockFixture):
+    mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+
+    config_entry = ConfigEntry(
+        entry_id=ENTRY_ID,
+        data={},
+        domain=DOMAIN,
+        minor_version=0,
+        source="",
+        title="",
+        version=0,
+    )
+
+    coordinator = MagicMock()
+    coordinator.aerogarden.get_raw_devices = AsyncMock(return_value=RAW_DEVICES)
+
+    hass = HomeAssistant("/path")
+    hass.data = {DOMAIN: {ENTRY_ID: coordinator}}
+    hass.services = MagicMock()
+    hass.services.has_service.return_value = False
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_entries.return_value = [config_entry]
+
+    return hass, coordinator
+
+
+def get_registered_handler(hass: HomeAssistant):
+    return hass.services.async_register.call_args[0][2]
+
+
+def service_call(data: dict) -> ServiceCall:
+    call = MagicMock(spec=ServiceCall)
+    call.data = data
+    return call
+
+
+@pytest.mark.asyncio
+class TestServices:
+    async def test_dump_payload_registered_once(self, setup):
+        """The service should only be registered by the first config entry to load"""
+        (hass, _) = setup
+
+        async_setup_services(hass)
+        hass.services.has_service.return_value = True
+        async_setup_services(hass)
+
+        hass.services.async_register.assert_called_once()
+        assert hass.services.async_register.call_args[0][1] == SERVICE_DUMP_PAYLOAD
+
+    async def test_dump_payload_redacts_secrets(self, setup):
+        """The dumped payload should contain every field, except secrets which are redacted"""
+        (hass, coordinator) = setup
+        async_setup_services(hass)
+
+        result = await get_registered_handler(hass)(service_call({}))
+
+        device = result["payloads"][ENTRY_ID][0]
+        assert device["plantedDay"] == 43
+        assert device["deviceIP"] == "http://10.10.2.20"
+        assert device["clientIP"] == "**REDACTED**"
+        assert device["bwConnectedSsid"] == "**REDACTED**"
+        coordinator.aerogarden.get_raw_devices.assert_awaited_once()
+
+    async def test_dump_payload_unknown_entry(self, setup):
+        """Dumping an account that isn't loaded should raise an error"""
+        (hass, _) = setup
+        async_setup_services(hass)
+
+        with pytest.raises(HomeAssistantError):
+            await get_registered_handler(hass)(
+                service_call({"config_entry_id": "unknown"})
+            )
+
+    async def test_unload_services_after_last_entry(self, setup):
+        """The service should be removed once no config entries remain loaded"""
+        (hass, _) = setup
+
+        async_unload_services(hass)
+        hass.services.async_remove.assert_not_called()
+
+        hass.data[DOMAIN] = {}
+        async_unload_services(hass)
+        hass.services.async_remove.assert_called_with(DOMAIN, SERVICE_DUMP_PAYLOAD)
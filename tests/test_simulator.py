@@ -0,0 +1,100 @@
+import pytest
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.client import (
+    MAX_RETRIES,
+    AerogardenApiAuthError,
+    AerogardenApiConnectError,
+    AerogardenClient,
+)
+from custom_components.aerogarden.const import GARDEN_KEY_LIGHT_TEMP
+from tests.simulator import (
+    SIMULATOR_EMAIL,
+    SIMULATOR_PASSWORD,
+    SIMULATOR_USER_ID,
+    AerogardenSimulator,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(mocker: MockFixture):
+    mocker.patch("custom_components.aerogarden.client.RETRY_BASE_DELAY", 0)
+
+
+@pytest.mark.asyncio
+class TestSimulator:
+    async def test_client_fetches_generated_devices(self):
+        """The real client should log in and fetch every generated garden over http"""
+
+        async with AerogardenSimulator(device_count=25) as simulator:
+            client = AerogardenClient(
+                simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD
+            )
+            await client.login()
+            devices = await client.get_user_devices()
+            await client.close()
+
+        assert client.user_id == SIMULATOR_USER_ID
+        assert len(devices) == 25
+        assert len({device["configID"] for device in devices}) == 25
+        assert simulator.requests == {"Login": 1, "QueryUserDevice": 1}
+
+    async def test_client_auth_error_on_wrong_password(self):
+        """Invalid credentials should be rejected the way the api rejects them"""
+
+        async with AerogardenSimulator() as simulator:
+            client = AerogardenClient(simulator.host, SIMULATOR_EMAIL, "wrong")
+            with pytest.raises(AerogardenApiAuthError):
+                await client.login()
+            await client.close()
+
+    async def test_client_connect_error_at_full_error_rate(self):
+        """Failing requests should be retried, then surface as connect errors"""
+
+        async with AerogardenSimulator(error_rate=1) as simulator:
+            client = AerogardenClient(
+                simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD
+            )
+            with pytest.raises(AerogardenApiConnectError):
+                await client.login()
+            await client.close()
+
+        assert simulator.requests["Login"] == 1 + MAX_RETRIES
+
+    async def test_update_unchanged_when_only_clock_advances(self):
+        """Refreshes of gardens that only advanced their clock should be detected as unchanged"""
+
+        async with AerogardenSimulator(device_count=3) as simulator:
+            aerogarden = Aerogarden(simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+            await aerogarden.update()
+            await aerogarden.update()
+            await aerogarden.close()
+
+        assert len(aerogarden.get_garden_config_ids()) == 3
+        assert not aerogarden.last_update_changed
+
+    async def test_update_changed_when_fields_change(self):
+        """Refreshes should be detected as changed when the simulator toggles garden fields"""
+
+        async with AerogardenSimulator(device_count=3, change_rate=1) as simulator:
+            aerogarden = Aerogarden(simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+            await aerogarden.update()
+            await aerogarden.update()
+            await aerogarden.close()
+
+        assert aerogarden.last_update_changed
+
+    async def test_update_device_config_applied(self):
+        """Config patches should be applied to the simulated garden"""
+
+        async with AerogardenSimulator(device_count=2) as simulator:
+            aerogarden = Aerogarden(simulator.host, SIMULATOR_EMAIL, SIMULATOR_PASSWORD)
+            device = simulator.devices[1]
+            await aerogarden.update_device_config(
+                device["airGuid"], device["chooseGarden"], {GARDEN_KEY_LIGHT_TEMP: 0}
+            )
+            await aerogarden.close()
+
+        assert device[GARDEN_KEY_LIGHT_TEMP] == 0
+        assert simulator.devices[0][GARDEN_KEY_LIGHT_TEMP] == 1
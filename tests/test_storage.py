@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden.storage import (
+    SNAPSHOT_VERSION,
+    STORAGE_KEY_LOGIN_TIME,
+    STORAGE_KEY_SESSION,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_KEY_SNAPSHOT_DEVICES,
+    STORAGE_KEY_SNAPSHOT_VERSION,
+    STORAGE_KEY_USER_ID,
+    AerogardenStore,
+)
+
+ENTRY_ID = "aerogarden-myemail@unittest.com"
+USER_ID = 123456
+DEVICES = [
+    {
+        "configID": 987654,
+        "airGuid": "12:34:56:78:10:AB",
+        "plantedName": "VW5pdCBUZXN0IEdhcmRlbg==",
+        "chooseGarden": 0,
+        "bwConnectedSsid": "Pretty Fly for a Wifi",
+        "clientIP": "555.55.55.5",
+    }
+]
+
+
+@pytest.fixture
+def store(mocker: MockFixture):
+    ha_store = MagicMock()
+    ha_store.async_load = AsyncMock(return_value=None)
+    ha_store.async_save = AsyncMock()
+    ha_store.async_remove = AsyncMock()
+    mocker.patch("custom_components.aerogarden.storage.Store", return_value=ha_store)
+
+    return AerogardenStore(MagicMock(), ENTRY_ID), ha_store
+
+
+@pytest.mark.asyncio
+class TestStorage:
+    async def test_get_user_id_returns_zero_when_nothing_persisted(self, store):
+        """when nothing has been persisted yet, there should be no user id to restore"""
+        (aerogarden_store, _) = store
+
+        await aerogarden_store.async_load()
+
+        assert aerogarden_store.get_user_id() == 0
+
+    async def test_get_user_id_returns_persisted_user_id(self, store):
+        """a previously persisted session should be loaded from disk"""
+        (aerogarden_store, ha_store) = store
+        ha_store.async_load.return_value = {
+            STORAGE_KEY_SESSION: {
+                STORAGE_KEY_USER_ID: USER_ID,
+                STORAGE_KEY_LOGIN_TIME: 1700000000.0,
+            }
+        }
+
+        await aerogarden_store.async_load()
+
+        assert aerogarden_store.get_user_id() == USER_ID
+
+    async def test_async_save_session_persists_user_id(self, store):
+        """saving a session should write the user id and login time to disk"""
+        (aerogarden_store, ha_store) = store
+
+        await aerogarden_store.async_save_session(USER_ID)
+
+        ha_store.async_save.assert_called()
+        saved = ha_store.async_save.call_args[0][0]
+        assert saved[STORAGE_KEY_SESSION][STORAGE_KEY_USER_ID] == USER_ID
+        assert saved[STORAGE_KEY_SESSION][STORAGE_KEY_LOGIN_TIME] > 0
+
+    async def test_async_clear_session_forgets_user_id(self, store):
+        """clearing a session should remove it from disk"""
+        (aerogarden_store, _) = store
+        await aerogarden_store.async_save_session(USER_ID)
+
+        await aerogarden_store.async_clear_session()
+
+        assert aerogarden_store.get_user_id() == 0
+
+    async def test_save_devices_retains_only_used_fields(self, store):
+        """snapshots should be versioned and only persist fields read by the integration"""
+        (aerogarden_store, ha_store) = store
+
+        aerogarden_store.save_devices(DEVICES)
+
+        ha_store.async_delay_save.assert_called()
+        devices = aerogarden_store.get_devices()
+        assert len(devices) == 1
+        assert devices[0]["configID"] == 987654
+        assert "bwConnectedSsid" not in devices[0]
+        assert "clientIP" not in devices[0]
+
+    async def test_get_devices_ignores_outdated_snapshot(self, store):
+        """a snapshot written with a different schema version should not be restored"""
+        (aerogarden_store, ha_store) = store
+        ha_store.async_load.return_value = {
+            STORAGE_KEY_SNAPSHOT: {
+                STORAGE_KEY_SNAPSHOT_VERSION: SNAPSHOT_VERSION + 1,
+                STORAGE_KEY_SNAPSHOT_DEVICES: DEVICES,
+            }
+        }
+
+        await aerogarden_store.async_load()
+
+        assert aerogarden_store.get_devices() == []
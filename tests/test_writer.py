@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from homeassistant.core import HomeAssistant
+from pytest_mock import MockFixture
+
+from custom_components.aerogarden.aerogarden import Aerogarden
+from custom_components.aerogarden.client import AerogardenApiError
+from custom_components.aerogarden.writer import AerogardenWriteQueue
+
+HOST = "https://unittest.abcxyz"
+EMAIL = "myemail@unittest.com"
+PASSWORD = "hunter2"
+
+AIR_GUID = "12:34:56:78:10:AB"
+
+
+@pytest_asyncio.fixture
+async def setup(mocker: MockFixture):
+    mocker.patch.object(HomeAssistant, "__init__", return_value=None)
+    call_later = mocker.patch(
+        "custom_components.aerogarden.writer.async_call_later",
+        return_value=MagicMock(),
+    )
+
+    hass = HomeAssistant("/path")
+    hass.loop = asyncio.get_running_loop()
+
+    aerogarden = Aerogarden(HOST, EMAIL, PASSWORD)
+    update_device_config = mocker.patch.object(
+        aerogarden, "update_device_config", new_callable=AsyncMock
+    )
+    on_written = AsyncMock()
+
+    queue = AerogardenWriteQueue(hass, aerogarden, on_written)
+
+    return queue, update_device_config, on_written, call_later
+
+
+async def queue_updates(queue: AerogardenWriteQueue, *updates):
+    tasks = [asyncio.create_task(queue.async_update(*update)) for update in updates]
+    await asyncio.sleep(0)
+    return tasks
+
+
+@pytest.mark.asyncio
+class TestWriteQueue:
+    async def test_patches_for_a_garden_merged(self, setup):
+        """Patches made to the same garden within the window should be written with a single request"""
+        (queue, update_device_config, on_written, call_later) = setup
+
+        tasks = await queue_updates(
+            queue,
+            (AIR_GUID, 0, {"lightTemp": 1}),
+            (AIR_GUID, 0, {"lightDimming": 50}),
+            (AIR_GUID, 0, {"lightTemp": 0}),
+        )
+        assert queue.pending_count == 1
+        call_later.assert_called_once()
+
+        await queue.async_flush()
+        await asyncio.gather(*tasks)
+
+        update_device_config.assert_awaited_once_with(
+            AIR_GUID, 0, {"lightTemp": 0, "lightDimming": 50}
+        )
+        on_written.assert_awaited_once()
+        assert queue.pending_count == 0
+
+    async def test_patches_for_each_garden_written_separately(self, setup):
+        """Each half of a multi-garden should receive its own request, followed by a single refresh"""
+        (queue, update_device_config, on_written, _) = setup
+
+        tasks = await queue_updates(
+            queue,
+            (AIR_GUID, 0, {"lightTemp": 1}),
+            (AIR_GUID, 1, {"lightTemp": 0}),
+        )
+        await queue.async_flush()
+        await asyncio.gather(*tasks)
+
+        assert update_device_config.await_count == 2
+        update_device_config.assert_any_await(AIR_GUID, 0, {"lightTemp": 1})
+        update_device_config.assert_any_await(AIR_GUID, 1, {"lightTemp": 0})
+        on_written.assert_awaited_once()
+
+    async def test_failed_write_raised_to_callers(self, setup):
+        """When a write fails, every caller whose patch was part of it should receive the error"""
+        (queue, update_device_config, on_written, _) = setup
+        update_device_config.side_effect = AerogardenApiError("unit test")
+
+        tasks = await queue_updates(
+            queue,
+            (AIR_GUID, 0, {"lightTemp": 1}),
+            (AIR_GUID, 0, {"lightDimming": 50}),
+        )
+        await queue.async_flush()
+
+        for task in tasks:
+            with pytest.raises(AerogardenApiError):
+                await task
+        on_written.assert_not_awaited()
+
+    async def test_flush_without_pending_patches(self, setup):
+        """Flushing an empty queue should not write or refresh"""
+        (queue, update_device_config, on_written, _) = setup
+
+        await queue.async_flush()
+
+        update_device_config.assert_not_awaited()
+        on_written.assert_not_awaited()